@@ -0,0 +1,40 @@
+from itertools import product
+
+import pandas as pd
+
+from benchmark_formulations import run_benchmark
+from constants import Case, Formulation, AbsoluteValue, Weight
+
+if __name__ == "__main__":
+    # Compara la cota de la relajación lineal y la del nodo raíz con CBC, con las
+    # restricciones de profesores coincidentes y de UCs del mismo semestre de a
+    # pares y agrupadas en cliques
+    cases = [Case.large_1s1p, Case.large_2s2p]
+    alpha, beta = Weight.WEIGHT_2, Weight.WEIGHT_2
+    time_limit_minutes = 5
+    columns = [
+        "case",
+        "cliques",
+        "rows",
+        "nnz",
+        "lp_bound",
+        "root_bound",
+        "objective",
+        "root_gap",
+    ]
+
+    results = []
+    for case, cliques in product(cases, [False, True]):
+        result = run_benchmark(
+            case,
+            Formulation.PIECEWISE,
+            alpha,
+            beta,
+            time_limit_minutes,
+            gaps=[],
+            absolute_value=AbsoluteValue.BIG_M,
+            cliques=cliques,
+        )
+        results.append({"case": case, **result})
+
+    print(pd.DataFrame(results)[columns].to_string(index=False))
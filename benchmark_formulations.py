@@ -0,0 +1,158 @@
+import os
+import re
+import tempfile
+from itertools import product
+from timeit import default_timer as timer
+
+import pulp as pl
+
+from constants import Case, Formulation, AbsoluteValue, Weight, MINUTES
+from csv_data_to_model_data import load_calendar_data, PairPruning
+from matrix_model import build_matrix_model, solve_matrix_model
+
+# Líneas del log de CBC con la mejor solución y la mejor cota hasta el momento
+CBC_NODES = re.compile(
+    r"Cbc0010I After \d+ nodes, \d+ on tree, (\S+) best solution, best possible (\S+) \((\S+) seconds\)"
+)
+CBC_SOLUTION = re.compile(r"Cbc00(?:04|12)I Integer solution of (\S+) found .*\((\S+) seconds\)")
+CBC_LP = re.compile(r"Continuous objective value is (\S+)")
+CBC_ROOT = re.compile(r"Cbc0013I At root node, .* objective from (\S+) to (\S+) in")
+CBC_NO_SOLUTION = 1e50
+
+
+def read_cbc_progress(log_path):
+    """
+    Lee la evolución de la búsqueda de un log de CBC.
+
+    Returns:
+        tuple: Cota de la relajación lineal, cota del nodo raíz luego de los cortes
+        (None si no se llegaron a calcular) y lista de tuplas (segundos, mejor solución, mejor cota), en orden de
+        aparición. La mejor solución es None mientras no se encontró ninguna.
+    """
+    lp_bound, root_bound = None, None
+    progress = []
+    best_solution, best_bound = None, None
+
+    with open(log_path) as f:
+        for line in f:
+            if match := CBC_NODES.search(line):
+                if float(match[1]) < CBC_NO_SOLUTION:
+                    best_solution = float(match[1])
+                best_bound = float(match[2])
+                progress.append((float(match[3]), best_solution, best_bound))
+            elif match := CBC_SOLUTION.search(line):
+                best_solution = float(match[1])
+                progress.append((float(match[2]), best_solution, best_bound))
+            elif match := CBC_ROOT.search(line):
+                root_bound = best_bound = float(match[2])
+            elif match := CBC_LP.search(line):
+                lp_bound = float(match[1])
+
+    return lp_bound, root_bound, progress
+
+
+def time_to_gap(progress, gap):
+    """
+    Primer instante del log en que la brecha relativa entre la mejor solución y la
+    mejor cota es a lo sumo gap, o None si no se alcanza.
+    """
+    for seconds, best_solution, best_bound in progress:
+        if best_solution is None or best_bound is None:
+            continue
+        if (best_solution - best_bound) / abs(best_solution) <= gap:
+            return seconds
+    return None
+
+
+def run_benchmark(
+    case,
+    formulation,
+    alpha,
+    beta,
+    time_limit_minutes,
+    gaps,
+    pair_pruning=None,
+    absolute_value=AbsoluteValue.BIG_M,
+    cliques=False,
+):
+    datos = load_calendar_data(case, pair_pruning=pair_pruning, cliques=cliques)
+
+    start_time = timer()
+    model = build_matrix_model(datos, alpha, beta, formulation, absolute_value)
+    build_time = timer() - start_time
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, "cbc.log")
+        solver = pl.PULP_CBC_CMD(
+            msg=0,
+            threads=os.cpu_count() or 8,
+            timeLimit=time_limit_minutes * MINUTES,
+            logPath=log_path,
+        )
+
+        start_time = timer()
+        status, _ = solve_matrix_model(model, solver)
+        solve_time = timer() - start_time
+
+        lp_bound, root_bound, progress = read_cbc_progress(log_path)
+
+    best_solution = progress[-1][1] if progress else None
+
+    return {
+        "formulation": formulation,
+        "absolute_value": absolute_value,
+        "cliques": cliques,
+        "binaries": int(model.col_integer.sum()),
+        "columns": model.num_cols,
+        "rows": model.num_rows,
+        "nnz": model.nnz,
+        "build_time": build_time,
+        "solve_time": solve_time,
+        "status": status,
+        "objective": best_solution,
+        "lp_bound": lp_bound,
+        "root_bound": root_bound,
+        "root_gap": (
+            (best_solution - root_bound) / abs(best_solution)
+            if best_solution is not None and root_bound is not None
+            else None
+        ),
+        "bound": progress[-1][2] if progress else root_bound,
+        **{f"time_to_gap_{gap}": time_to_gap(progress, gap) for gap in gaps},
+    }
+
+
+if __name__ == "__main__":
+    # Compara el tiempo hasta alcanzar cada brecha con CBC, para cada formulación
+    # de la distancia entre pares de UCs
+    case = Case.large_1s1p
+    alpha, beta = Weight.WEIGHT_2, Weight.WEIGHT_2
+    time_limit_minutes = 10
+    gaps = [0.5, 0.25, 0.1]
+
+    formulations = [Formulation.FULL, Formulation.PIECEWISE]
+    absolute_values = [AbsoluteValue.BIG_M, AbsoluteValue.SLOTS]
+    pair_prunings = [None, PairPruning()]
+
+    for formulation, absolute_value, pair_pruning in product(
+        formulations, absolute_values, pair_prunings
+    ):
+        result = run_benchmark(
+            case,
+            formulation,
+            alpha,
+            beta,
+            time_limit_minutes,
+            gaps,
+            pair_pruning,
+            absolute_value,
+        )
+
+        print(f"\n{'='*80}")
+        print(
+            f"Formulación: {formulation}, valor absoluto: {absolute_value},"
+            f" poda de pares: {pair_pruning}"
+        )
+        print(f"{'='*80}")
+        for key, value in result.items():
+            print(f"{key}: {value}")
@@ -0,0 +1,288 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+import pulp as pl
+
+from benchmark_formulations import read_cbc_progress
+from constants import Case, Formulation, AbsoluteValue, Weight, MINUTES
+from csv_data_to_model_data import load_calendar_data
+from matrix_model import build_matrix_model, solve_matrix_model
+from metrics import MetricsEngine
+from profiling import SolveProfile, profile_stage
+
+DATA_PATH = "data"
+
+# Historial de corridas de la suite: una línea JSON por caso y corrida
+HISTORY_FILE = "benchmarks/history.jsonl"
+
+# Configuración fija de la suite, para que las corridas sean comparables. CBC
+# corre con un solo hilo, ya que con varios no es determinista aunque se fije la
+# semilla.
+SUITE = {
+    "cases": [value for name, value in vars(Case).items() if not name.startswith("_")],
+    "alpha": Weight.WEIGHT_2,
+    "beta": Weight.WEIGHT_2,
+    "formulation": Formulation.PIECEWISE,
+    "absolute_value": AbsoluteValue.BIG_M,
+    "time_limit_minutes": 10,
+    # Segundos en los que se registra la mejor solución, la cota y la brecha
+    "checkpoints": [60, 300, 600],
+    "seed": 1234,
+    "threads": 1,
+}
+
+# Columnas que se comparan entre dos corridas, y si un valor mayor es mejor
+COMPARED = {
+    "load_time": False,
+    "build_time": False,
+    "time_to_first": False,
+    "objective": False,
+    "bound": True,
+    "gap": False,
+    "m_curricula": True,
+    "m_coincidencia": True,
+    "m_estudiantes": False,
+    "m_previas": True,
+}
+
+
+def git_commit():
+    """
+    Commit del código con el que se corre la suite, o None fuera de un
+    repositorio.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return result.stdout.strip()
+
+
+def gap(best_solution, best_bound):
+    if best_solution is None or best_bound is None:
+        return None
+    return (best_solution - best_bound) / abs(best_solution)
+
+
+def checkpoint_values(progress, seconds):
+    """
+    Mejor solución y mejor cota del log de CBC hasta un instante.
+
+    Returns:
+        tuple: Mejor solución, mejor cota y brecha (None si no hay todavía)
+    """
+    best_solution, best_bound = None, None
+    for time, solution, bound in progress:
+        if time > seconds:
+            break
+        best_solution, best_bound = solution, bound
+
+    return best_solution, best_bound, gap(best_solution, best_bound)
+
+
+def run_case(case, suite=SUITE):
+    """
+    Resuelve un caso con CBC según la configuración de la suite.
+
+    Returns:
+        dict: Tiempos de carga y construcción, tamaño del modelo, tiempo hasta
+        la primera solución, mejor solución, cota y brecha al final y en cada
+        checkpoint, y las cuatro métricas de la mejor solución. None si los
+        datos del caso no se pueden cargar (por ejemplo, si les faltan columnas).
+    """
+    row = {"case": case}
+    profile = SolveProfile()
+
+    with profile_stage(profile, "carga"):
+        try:
+            datos = load_calendar_data(case)
+        except Exception as e:
+            print(f"Advertencia: se omite {case}, no se pueden cargar sus datos")
+            print(f"  {e}")
+            return None
+
+    with profile_stage(profile, "construccion"):
+        model = build_matrix_model(
+            datos,
+            suite["alpha"],
+            suite["beta"],
+            suite["formulation"],
+            suite["absolute_value"],
+        )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, "cbc.log")
+        solver = pl.PULP_CBC_CMD(
+            msg=0,
+            threads=suite["threads"],
+            timeLimit=suite["time_limit_minutes"] * MINUTES,
+            logPath=log_path,
+            options=[f"randomSeed {suite['seed']}", f"randomCbcSeed {suite['seed']}"],
+        )
+        status, values = solve_matrix_model(model, solver, profile=profile)
+        lp_bound, root_bound, progress = read_cbc_progress(log_path)
+
+    stage_time = {stage.name: stage.time for stage in profile.stages}
+    first = next((time for time, solution, _ in progress if solution is not None), None)
+    best_solution, best_bound, final_gap = checkpoint_values(progress, float("inf"))
+
+    row.update(
+        {
+            "status": status,
+            "load_time": stage_time["carga"],
+            "build_time": stage_time["construccion"],
+            "solve_time": stage_time.get("solver"),
+            "columns": model.num_cols,
+            "rows": model.num_rows,
+            "nnz": model.nnz,
+            "lp_bound": lp_bound,
+            "root_bound": root_bound,
+            "time_to_first": first,
+            "objective": best_solution,
+            "bound": best_bound if best_bound is not None else root_bound,
+            "gap": final_gap,
+        }
+    )
+    for seconds in suite["checkpoints"]:
+        solution, bound, checkpoint_gap = checkpoint_values(progress, seconds)
+        row[f"objective_{seconds}s"] = solution
+        row[f"bound_{seconds}s"] = bound
+        row[f"gap_{seconds}s"] = checkpoint_gap
+
+    # Métricas del calendario de la mejor solución
+    if values is not None and best_solution is not None:
+        assignment = model.assignment(values)
+        engine = MetricsEngine.from_files(
+            list(assignment),
+            f"{case}/coincidencia.csv",
+            f"{DATA_PATH}/previas.csv",
+            f"{case}/trayectoria_sugerida.csv",
+        )
+        row.update(engine.evaluate({uc: day for uc, (day, _) in assignment.items()}))
+
+    return row
+
+
+def run_suite(history_file=HISTORY_FILE, suite=SUITE):
+    """
+    Corre la suite en todos sus casos y agrega una línea por caso al
+    historial. Los casos que no se pueden cargar se omiten con una advertencia,
+    y los que no se pueden resolver quedan registrados con su error.
+
+    Returns:
+        str: Identificador de la corrida
+    """
+    run = datetime.now().isoformat(timespec="seconds")
+    commit = git_commit()
+    config = {key: value for key, value in suite.items() if key != "cases"}
+
+    os.makedirs(os.path.dirname(history_file) or ".", exist_ok=True)
+    for case in suite["cases"]:
+        print(f"{case}...")
+        try:
+            row = run_case(case, suite)
+        except Exception as e:
+            row = {"case": case, "error": str(e)}
+        if row is None:
+            continue
+
+        with open(history_file, "a") as f:
+            record = {"run": run, "commit": commit, **config, **row}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    return run
+
+
+def load_history(history_file=HISTORY_FILE):
+    return pd.read_json(history_file, lines=True, dtype={"commit": str})
+
+
+def compare_runs(history_file=HISTORY_FILE, base=None, new=None):
+    """
+    Compara dos corridas del historial caso por caso. Por defecto, las dos
+    últimas.
+
+    Returns:
+        pd.DataFrame: Una fila por caso y columna comparada, con el valor de
+        cada corrida, la diferencia y si la nueva es mejor, peor o igual
+    """
+    history = load_history(history_file)
+    runs = list(dict.fromkeys(history["run"]))
+    if len(runs) < 2 and (base is None or new is None):
+        raise ValueError("El historial necesita al menos dos corridas para comparar")
+
+    base = base if base is not None else runs[-2]
+    new = new if new is not None else runs[-1]
+    base_rows = history[history["run"] == base].set_index("case")
+    new_rows = history[history["run"] == new].set_index("case")
+
+    rows = []
+    for case in new_rows.index.intersection(base_rows.index):
+        for column, higher_is_better in COMPARED.items():
+            before = base_rows.at[case, column] if column in base_rows else None
+            after = new_rows.at[case, column] if column in new_rows else None
+            if pd.isna(before) or pd.isna(after):
+                change = "-"
+            elif after == before:
+                change = "igual"
+            else:
+                change = "mejor" if (after > before) == higher_is_better else "peor"
+
+            rows.append(
+                {
+                    "case": case,
+                    "columna": column,
+                    base: before,
+                    new: after,
+                    "diferencia": (
+                        after - before
+                        if not (pd.isna(before) or pd.isna(after))
+                        else None
+                    ),
+                    "cambio": change,
+                }
+            )
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    # Uso:
+    #   python benchmark_suite.py run [minutos] [historial]
+    #   python benchmark_suite.py compare [corrida_base] [corrida_nueva] [historial]
+    command = sys.argv[1] if len(sys.argv) > 1 else "run"
+
+    match command:
+        case "run":
+            suite = dict(SUITE)
+            if len(sys.argv) > 2:
+                suite["time_limit_minutes"] = float(sys.argv[2])
+                suite["checkpoints"] = [
+                    seconds
+                    for seconds in SUITE["checkpoints"]
+                    if seconds <= suite["time_limit_minutes"] * MINUTES
+                ]
+            history_file = sys.argv[3] if len(sys.argv) > 3 else HISTORY_FILE
+
+            run = run_suite(history_file, suite)
+            print(f"Corrida {run} agregada a {history_file}")
+        case "compare":
+            # Una corrida vacía ("") toma el valor por defecto
+            base = (sys.argv[2] or None) if len(sys.argv) > 2 else None
+            new = (sys.argv[3] or None) if len(sys.argv) > 3 else None
+            history_file = sys.argv[4] if len(sys.argv) > 4 else HISTORY_FILE
+
+            print(compare_runs(history_file, base, new).to_string(index=False))
+        case _:
+            raise ValueError(f"Comando {command} no soportado")
@@ -0,0 +1,128 @@
+from timeit import default_timer as timer
+
+import pulp as pl
+
+from constants import Solver, Formulation, AbsoluteValue
+from csv_data_to_model_data import load_calendar_data, PairPruning
+from matrix_model import build_matrix_model, solve_matrix_model
+from solve import (
+    get_solver,
+    print_domain_report,
+    print_pruning_report,
+    print_symmetry_report,
+)
+from warm_start import load_assignment, start_values
+
+
+class CalendarModel:
+    """
+    Modelo de calendario construido una sola vez, para resolverlo varias veces
+    con distintos pesos alpha y beta en el objetivo.
+
+    Las variables y restricciones no dependen de alpha ni de beta, así que entre
+    una resolución y la siguiente solo se cambia el objetivo. Cada resolución
+    parte de la última solución encontrada, que sigue siendo factible.
+
+    Ejemplo:
+        model = CalendarModel.from_case(Case.large_1s1p, Solver.GUROBI_CMD, 60)
+        for alpha, beta in product(alpha_values, beta_values):
+            model.set_weights(alpha, beta)
+            value, time, status, variables, assignment = model.solve()
+    """
+
+    def __init__(
+        self,
+        datos: dict,
+        solver_name: Solver,
+        time_limit_minutes=15,
+        formulation: Formulation = Formulation.FULL,
+        absolute_value: AbsoluteValue = AbsoluteValue.BIG_M,
+        threads: int | None = None,
+        alpha: float = 0,
+        beta: float = 0,
+    ):
+        self.datos = datos
+        self.formulation = formulation
+        self.absolute_value = absolute_value
+        self.alpha = alpha
+        self.beta = beta
+
+        self.model = build_matrix_model(datos, alpha, beta, formulation, absolute_value)
+        self.solver = get_solver(solver_name, time_limit_minutes, threads)
+
+        # Valores iniciales de la próxima resolución, por nombre de variable
+        self.start = None
+
+    @classmethod
+    def from_case(
+        cls,
+        dir_name: str,
+        solver_name: Solver,
+        time_limit_minutes=15,
+        pair_pruning: PairPruning | None = None,
+        symmetry: bool = False,
+        domains: bool = False,
+        cliques: bool = False,
+        **kwargs,
+    ):
+        datos = load_calendar_data(
+            dir_name,
+            pair_pruning=pair_pruning,
+            domains=domains,
+            cliques=cliques,
+            symmetry=symmetry,
+        )
+        if pair_pruning is not None:
+            print_pruning_report(datos["PODA_PARES"], kwargs.get("alpha", 0))
+        if symmetry:
+            print_symmetry_report(datos["SIMETRIA"])
+        if domains:
+            print_domain_report(datos["FILTRO_DOMINIOS"])
+
+        return cls(datos, solver_name, time_limit_minutes, **kwargs)
+
+    def set_weights(self, alpha: float, beta: float):
+        """
+        Cambia los pesos del objetivo para la próxima resolución.
+        """
+        self.alpha = alpha
+        self.beta = beta
+        self.model.set_weights(alpha, beta)
+
+    def set_warm_start(self, warm_start: str | dict):
+        """
+        Usa como solución inicial un calendario CSV, un archivo .sol o un
+        diccionario {uc: (dia, turno)}, como warm_start en solve_model.
+        """
+        assignment = load_assignment(warm_start)
+        self.start = start_values(
+            self.datos, assignment, self.formulation, self.absolute_value
+        )
+
+    def solve(self) -> tuple[float, float, str, list, dict]:
+        """
+        Resuelve el modelo con los pesos actuales.
+
+        Returns:
+            tuple: Valor objetivo, tiempo, estado, variables y asignación, como
+                solve_model
+        """
+        start_time = timer()
+        status, values = solve_matrix_model(self.model, self.solver, self.start)
+        end_time = timer()
+
+        if values is None:
+            return None, end_time - start_time, status, [], {}
+
+        # Con otros pesos la solución sigue siendo factible, así que se usa como
+        # punto de partida de la próxima resolución
+        if status == pl.LpStatus[pl.LpStatusOptimal]:
+            self.start = dict(zip(self.model.col_names, values.tolist()))
+
+        return (
+            self.model.objective_value(values),
+            end_time - start_time,
+            status,
+            self.model.variables(values),
+            self.model.assignment(values),
+        )
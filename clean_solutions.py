@@ -1,22 +1,29 @@
 import sys
 import os
 
+from solution_files import slim_solutions
+
 if __name__ == "__main__":
-    dir_name = sys.argv[1] if len(sys.argv) > 1 else None
+    # Uso: python clean_solutions.py <directorio> [directorio de salida]
+    #          [--gzip] [--remove]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    dir_name = args[0] if len(args) > 0 else None
+    output_dir = args[1] if len(args) > 1 else None
+    compress = "--gzip" in sys.argv
+    remove = "--remove" in sys.argv
 
     if not dir_name or not os.path.exists(dir_name):
         print("Directory not provided or does not exist")
         exit(1)
 
-    # Get all files in the directory
-    files = os.listdir(dir_name)
-
-    for file in files:
-        with open(f"{dir_name}/{file}", "r+") as f:
-            lines = f.readlines()
-            lines = [line.strip() for line in lines if line.startswith("x")]
+    # Cada .sol se reduce a sus x en 1. Por defecto se reescribe en el lugar como
+    # texto; con --gzip se escribe comprimido como .sol.gz, y con --remove se
+    # borran los originales que quedaron en otro archivo.
+    count, size_before, size_after = slim_solutions(
+        dir_name, output_dir, compress=compress, remove=remove
+    )
 
-            # Write to file again only with the lines that start with "x"
-            f.seek(0)
-            f.writelines([f"{line}\n" for line in lines])
-            f.truncate()
+    print(
+        f"{count} soluciones reducidas:"
+        f" {size_before / 1e6:.2f} MB -> {size_after / 1e6:.2f} MB"
+    )
@@ -0,0 +1,115 @@
+def unique_pairs(pairs):
+    """
+    Pares de UCs sin repetir, sin importar el orden (como los de
+    UC_MISMO_SEMESTRE, que tiene cada par en ambos sentidos), en el orden en que
+    aparecen por primera vez.
+
+    Returns:
+        list: Tuplas (c1, c2), una por par
+    """
+    seen = set()
+    result = []
+    for c1, c2 in pairs:
+        key = frozenset((c1, c2))
+        if c1 != c2 and key not in seen:
+            seen.add(key)
+            result.append((c1, c2))
+
+    return result
+
+
+def conflict_graph(pairs):
+    """
+    Returns:
+        dict: Vecinos de cada UC en el grafo de conflictos de los pares,
+        {uc: set(ucs)}
+    """
+    graph = {}
+    for c1, c2 in unique_pairs(pairs):
+        graph.setdefault(c1, set()).add(c2)
+        graph.setdefault(c2, set()).add(c1)
+
+    return graph
+
+
+def maximal_cliques(graph):
+    """
+    Cliques maximales de un grafo, con el algoritmo de Bron-Kerbosch con pivote.
+    Cada arista queda en al menos una clique, así que una restricción "a lo sumo
+    una" por clique equivale a las de todos sus pares, y es más ajustada en la
+    relajación lineal.
+
+    Args:
+        graph (dict): {nodo: set(vecinos)}, como el de conflict_graph
+
+    Returns:
+        list: Conjuntos de nodos, uno por clique
+    """
+    cliques = []
+
+    def expand(clique, candidates, excluded):
+        if not candidates and not excluded:
+            cliques.append(clique)
+            return
+
+        # El pivote es el nodo con más vecinos entre los candidatos: sus vecinos
+        # se alcanzan desde él y no hace falta expandirlos
+        pivot = max(candidates | excluded, key=lambda v: len(graph[v] & candidates))
+        for v in list(candidates - graph[pivot]):
+            expand(clique | {v}, candidates & graph[v], excluded & graph[v])
+            candidates = candidates - {v}
+            excluded = excluded | {v}
+
+    expand(set(), set(graph), set())
+
+    return cliques
+
+
+def conflict_cliques(pairs, C):
+    """
+    Agrupa pares de UCs en conflicto en sus cliques maximales.
+
+    Args:
+        pairs (iterable): Pares (c1, c2) de UCs que no pueden compartir día o
+            turno, en cualquier sentido y con repetidos
+        C (list): UCs del modelo, que definen el orden de las cliques
+
+    Returns:
+        list: Listas de UCs, una por clique, con las UCs en el orden de C y las
+        cliques ordenadas por sus UCs
+    """
+    uc_index = {c: i for i, c in enumerate(C)}
+
+    cliques = [
+        sorted(clique, key=uc_index.get)
+        for clique in maximal_cliques(conflict_graph(pairs))
+    ]
+
+    return sorted(cliques, key=lambda clique: [uc_index[c] for c in clique])
+
+
+def aggregate_conflicts(datos):
+    """
+    Reemplaza las restricciones de a pares de profesores coincidentes (COP) y de
+    UCs del mismo semestre por una por clique maximal de cada grafo de
+    conflictos.
+
+    Los grupos de un mismo semestre y carrera ya son cliques, y las que
+    comparten UCs con otros grupos se extienden hasta ser maximales. Como
+    profesores.csv solo tiene pares de UCs, las cliques de profesores se buscan
+    en el grafo de esos pares.
+
+    Args:
+        datos (dict): Conjuntos y parámetros devueltos por build_model_data
+
+    Returns:
+        dict: Copia de datos con las cliques en CLIQUES_COP y
+        CLIQUES_MISMO_SEMESTRE
+    """
+    C = datos["C"]
+
+    return {
+        **datos,
+        "CLIQUES_COP": conflict_cliques(datos["COP"], C),
+        "CLIQUES_MISMO_SEMESTRE": conflict_cliques(datos["UC_MISMO_SEMESTRE"], C),
+    }
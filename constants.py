@@ -1,5 +1,10 @@
 MINUTES = 60
 
+# Estado de las soluciones de la heurística y de fix_and_optimize: calendarios
+# factibles, sin garantía de optimalidad. No es uno de los estados de
+# pl.LpStatus que devuelven los solvers.
+FEASIBLE = "Feasible"
+
 
 # Definición de un Enum para los diferentes solvers soportados
 class Solver:
@@ -8,6 +13,30 @@ class Solver:
     PULP_CBC_CMD = "PULP_CBC_CMD"
 
 
+# Definición de un Enum para las diferentes formas de construir el modelo
+class Builder:
+    MATRIX = "matrix"  # Matrices dispersas escritas directamente en MPS
+    PULP = "pulp"  # Expresiones de PuLP, útil para casos chicos o depurar el modelo
+
+
+# Definición de un Enum para las diferentes formulaciones de la distancia entre pares de UCs
+class Formulation:
+    FULL = "full"  # Una binaria w por par y por cada distancia posible de DS
+    PIECEWISE = "piecewise"  # Peso lineal por tramos sobre z, sin variables w
+
+
+# Definición de un Enum para las diferentes formas de modelar la distancia entre pares como valor absoluto
+class AbsoluteValue:
+    BIG_M = "big_m"  # z_plus, z_minus y una binaria y por par, con restricciones big-M
+    SLOTS = "slots"  # Cotas por la distancia de cada UC a cada día y turno, sin binarias
+
+
+# Definición de un Enum para las diferentes formas de elegir las UCs de cada subproblema en fix_and_optimize
+class Decomposition:
+    DAYS = "days"  # Las UCs asignadas a una ventana de días consecutivos
+    CLUSTERS = "clusters"  # Una UC y las UCs con las que tiene más coincidencia
+
+
 # Definición de un Enum para los diferentes casos soportados
 class Case:
     small = "casos/caso_sm"
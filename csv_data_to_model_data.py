@@ -1,225 +1,708 @@
 import pandas as pd
+import numpy as np
 import math
 import os
+import hashlib
+import zipfile
+from dataclasses import dataclass
 from itertools import combinations
 
+from conflict_graph import aggregate_conflicts
+from symmetry import break_symmetry
+
+# Archivos CSV que definen un caso
+CASE_FILES = [
+    "dias",
+    "unidades_curriculares",
+    "turnos",
+    "profesores",
+    "turnos_dias",
+    "semestres",
+    "carreras",
+    "trayectoria_sugerida",
+    "preasignaciones",
+    "previas",
+    "capacidad",
+    "datos",
+    "inscriptos",
+    "coincidencia",
+]
+
+# Snapshot compilado de un caso, guardado dentro del directorio del caso
+COMPILED_CACHE_FILE = "modelo_compilado.npz"
+
+# Versión del formato del snapshot. Cambiarla invalida los snapshots existentes.
+COMPILED_CACHE_VERSION = 1
+
+
+def build_semester_index(C, SUG, S):
+    """
+    Construye el índice de semestres sugeridos por (UC, carrera).
+
+    Args:
+        C (list): Unidades curriculares
+        SUG (list): Tuplas (UC, semestre, carrera) de la trayectoria sugerida
+        S (list): Semestres
 
-def load_calendar_data(dir_name):
+    Returns:
+        tuple: Lista de carreras presentes en SUG, matriz |C| x |K| con el primer
+        semestre sugerido de cada UC en cada carrera, y matriz booleana que indica
+        si la UC tiene alguna sugerencia en esa carrera con un semestre de S
     """
-    Carga los conjuntos y parámetros desde archivos CSV para el modelo de calendario
-    de evaluaciones.
+    uc_index = {c: i for i, c in enumerate(C)}
+    careers = list(dict.fromkeys(k for _, _, k in SUG))
+    career_index = {k: j for j, k in enumerate(careers)}
+    semesters = set(S)
+
+    semester = np.zeros((len(C), len(careers)), dtype=np.int64)
+    assigned = np.zeros((len(C), len(careers)), dtype=bool)
+    valid = np.zeros((len(C), len(careers)), dtype=bool)
+
+    for c, s, k in SUG:
+        i, j = uc_index[c], career_index[k]
+
+        # Se usa la primera sugerencia de la UC en la carrera
+        if not assigned[i, j]:
+            semester[i, j] = s
+            assigned[i, j] = True
+
+        if s in semesters:
+            valid[i, j] = True
+
+    return careers, semester, valid
+
+
+def compute_dist_sem_matrix(C, SUG, S):
+    """
+    Calcula la distancia en semestres entre todos los pares de UCs.
+
+    La distancia es la mínima diferencia de semestres sugeridos entre las carreras
+    que ambas UCs tienen en común, o |S| si no comparten ninguna carrera.
+
+    Returns:
+        np.ndarray: Matriz simétrica |C| x |C| de distancias en semestres
+    """
+    careers, semester, valid = build_semester_index(C, SUG, S)
+
+    dist = np.full((len(C), len(C)), len(S), dtype=np.int64)
+    for j in range(len(careers)):
+        in_career = np.flatnonzero(valid[:, j])
+        s = semester[in_career, j]
+        block = np.abs(s[:, None] - s[None, :])
+        dist[np.ix_(in_career, in_career)] = np.minimum(
+            dist[np.ix_(in_career, in_career)], block
+        )
+
+    return dist
+
+
+def get_case_hash(dir_name):
+    """
+    Calcula un hash del contenido de los archivos CSV del caso.
+
+    Raises:
+        FileNotFoundError: Si falta alguno de los archivos del caso
+    """
+    digest = hashlib.sha256(f"v{COMPILED_CACHE_VERSION}".encode("utf-8"))
+
+    for name in CASE_FILES:
+        file_path = os.path.join(dir_name, f"{name}.csv")
+
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"No se encontró el archivo {file_path}")
+
+        digest.update(name.encode("utf-8"))
+        with open(file_path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+
+    return digest.hexdigest()
+
+
+def compile_case(dir_name):
+    """
+    Lee los archivos CSV del caso y los compila a arreglos de NumPy, ya filtrados
+    a las unidades curriculares de C.
 
     Args:
-        directorio_datos (str): Ruta al directorio que contiene los archivos CSV
+        dir_name (str): Ruta al directorio que contiene los archivos CSV
 
     Returns:
-        dict: Diccionario con todos los conjuntos y parámetros del modelo
+        dict: Diccionario de arreglos a partir del cual se construyen los datos
+        del modelo con build_model_data
     """
 
-    def load_csv(name):
+    def load_csv(name, codes=()):
         file_path = os.path.join(dir_name, f"{name}.csv")
 
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"No se encontró el archivo {file_path}")
 
-        return pd.read_csv(file_path)
+        # Las columnas con códigos de UC se leen siempre como texto, para que
+        # coincidan con los códigos de C aunque sean todos numéricos.
+        return pd.read_csv(file_path, dtype={column: str for column in codes})
+
+    def codes(column):
+        return np.array(column.tolist(), dtype=str)
+
+    def ids(column):
+        return column.to_numpy(dtype=np.int64)
+
+    def values(column):
+        return pd.to_numeric(column).to_numpy()
+
+    # Días del calendario
+    D = np.sort(ids(load_csv("dias")["id"]))
+
+    # Unidades curriculares
+    C = load_csv("unidades_curriculares", codes=["codigo"])["codigo"]
+
+    # Inscriptos por UC. Los cursos sin valores de inscripción se eliminan antes
+    # de construir los conjuntos, para que ningún par o restricción los referencie.
+    ins_df = load_csv("inscriptos", codes=["uc"])
+    invalid_courses = ins_df["inscriptos"].isna()
+    C = C[~C.isin(ins_df.loc[invalid_courses, "uc"])]
+    ins_df = ins_df[~invalid_courses]
+
+    def in_C(column):
+        return column.isin(C)
+
+    # Turnos
+    T = np.sort(ids(load_csv("turnos")["id"]))
+
+    # Profesores coincidentes (solo si ambos cursos existen en C)
+    cop_df = load_csv("profesores", codes=["uc_1", "uc_2"])
+    cop_df = cop_df[in_C(cop_df["uc_1"]) & in_C(cop_df["uc_2"])]
+
+    # Turnos disponibles por día (primera columna día, segunda turno), sin
+    # duplicados y ordenados
+    turnos_dia_df = load_csv("turnos_dias")
+    turnos_dia_df = turnos_dia_df.iloc[:, :2].set_axis(["dia", "turno"], axis=1)
+    turnos_dia_df = (
+        turnos_dia_df[turnos_dia_df["dia"].isin(D)]
+        .drop_duplicates()
+        .sort_values(["dia", "turno"])
+    )
+
+    # Sugerencias de UCs (solo si la UC existe en C)
+    sug_df = load_csv("trayectoria_sugerida", codes=["unidad_curricular"])
+    sug_df = sug_df[in_C(sug_df["unidad_curricular"])]
+
+    # Unidades curriculares del mismo semestre. El merge conserva el orden de
+    # SUG, por lo que los pares quedan en el mismo orden que el recorrido
+    # anidado sobre SUG.
+    sug_pairs = sug_df.merge(sug_df, on=["semestre", "carrera"])
+    sug_pairs = sug_pairs[
+        sug_pairs["unidad_curricular_x"] != sug_pairs["unidad_curricular_y"]
+    ].drop_duplicates(["unidad_curricular_x", "unidad_curricular_y"])
+
+    # Pre-asignaciones (solo si la UC existe en C)
+    pa_df = load_csv("preasignaciones", codes=["unidad_curricular"])
+    pa_df = pa_df[in_C(pa_df["unidad_curricular"])]
+
+    # Previaturas (solo entre UCs distintas que existen en C)
+    prev_df = load_csv("previas", codes=["uc", "uc_requerida"])
+    prev_df = prev_df[
+        in_C(prev_df["uc"])
+        & in_C(prev_df["uc_requerida"])
+        & (prev_df["uc"] != prev_df["uc_requerida"])
+    ]
+
+    # Capacidad por día y turno
+    cap_df = load_csv("capacidad")
+
+    # Factor de capacidad
+    datos = load_csv("datos")
+
+    # Inscriptos simultáneos
+    co_df = load_csv("coincidencia", codes=["uc_1", "uc_2"])
+
+    # Semestres
+    S = ids(load_csv("semestres")["id"])
+
+    SUG = list(
+        zip(
+            sug_df["unidad_curricular"].tolist(),
+            sug_df["semestre"].tolist(),
+            sug_df["carrera"].tolist(),
+        )
+    )
+
+    return {
+        "D": D,
+        "C": codes(C),
+        "T": T,
+        "td_dia": ids(turnos_dia_df["dia"]),
+        "td_turno": ids(turnos_dia_df["turno"]),
+        "S": S,
+        "K": codes(load_csv("carreras")["codigo"]),
+        "sug_uc": codes(sug_df["unidad_curricular"]),
+        "sug_semestre": ids(sug_df["semestre"]),
+        "sug_carrera": codes(sug_df["carrera"]),
+        "pa_uc": codes(pa_df["unidad_curricular"]),
+        "pa_dia": ids(pa_df["dia"]),
+        "pa_turno": ids(pa_df["turno"]),
+        "p_uc": codes(prev_df["uc"]),
+        "p_uc_requerida": codes(prev_df["uc_requerida"]),
+        "cop_1": codes(cop_df["uc_1"]),
+        "cop_2": codes(cop_df["uc_2"]),
+        "mismo_semestre_1": codes(sug_pairs["unidad_curricular_x"]),
+        "mismo_semestre_2": codes(sug_pairs["unidad_curricular_y"]),
+        "cp_dia": ids(cap_df["id_dia"]),
+        "cp_turno": ids(cap_df["id_turno"]),
+        "cp": values(cap_df["capacidad"]),
+        "fac_cp": np.float64(datos["fac_cp"].iloc[0]),
+        "alta_co": np.float64(datos["alta_co"].iloc[0]),
+        "ins_uc": codes(ins_df["uc"]),
+        "ins": values(ins_df["inscriptos"]),
+        "co_1": codes(co_df["uc_1"]),
+        "co_2": codes(co_df["uc_2"]),
+        "co": values(co_df["coincidencia"]),
+        "dist_sem": compute_dist_sem_matrix(C.tolist(), SUG, S.tolist()),
+    }
+
+
+def load_compiled_case(dir_name, case_hash):
+    """
+    Carga el snapshot compilado del caso. Devuelve None si no existe o si fue
+    generado a partir de otros archivos CSV.
+    """
+    file_path = os.path.join(dir_name, COMPILED_CACHE_FILE)
+
+    if not os.path.exists(file_path):
+        return None
+
+    try:
+        with np.load(file_path) as snapshot:
+            if str(snapshot["hash"]) != case_hash:
+                return None
+
+            return {name: snapshot[name] for name in snapshot.files if name != "hash"}
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        # Snapshot corrupto (por ejemplo, truncado) o de un formato anterior: se
+        # vuelve a compilar
+        return None
 
+
+def save_compiled_case(dir_name, case_hash, compiled):
+    """
+    Guarda el snapshot compilado del caso en su directorio.
+    """
+    file_path = os.path.join(dir_name, COMPILED_CACHE_FILE)
+
+    # Se escribe a un archivo temporal y se renombra, para que un proceso
+    # concurrente nunca lea un snapshot a medio escribir.
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
     try:
-        # ==== CONJUNTOS ====
-
-        # Días del calendario
-        D = sorted(list(load_csv("dias")["id"]))
-
-        # Unidades curriculares
-        C = list(load_csv("unidades_curriculares")["codigo"])
-
-        # Turnos
-        T = sorted(list(load_csv("turnos")["id"]))
-
-        # Profesores coincidentes
-        cop_df = load_csv("profesores")
-        COP = [
-            (str(row["uc_1"]), str(row["uc_2"]))
-            for _, row in cop_df.iterrows()
-            if str(row["uc_1"]) in C and str(row["uc_2"]) in C
-        ]  # Only include if both courses exist in C
-
-        # Turnos disponibles por día
-        turnos_dia_df = load_csv("turnos_dias")
-        Td = {d: [] for d in D}  # Inicializar diccionario vacío para cada día
-
-        # Llenar Td basado en los datos del CSV
-        for _, row in turnos_dia_df.iterrows():
-            # Intentar diferentes nombres de columnas posibles
-            dia = row[turnos_dia_df.columns[0]]  # Primera columna
-            turno = row[turnos_dia_df.columns[1]]  # Segunda columna
-
-            if dia in Td:  # Solo agregar si el día está en D
-                Td[dia].append(turno)
-
-        # Ordenar los turnos para cada día
-        for d in Td:
-            Td[d] = sorted(list(set(Td[d])))  # Eliminar duplicados y ordenar
-
-        # Ordenar los turnos para cada día
-        for d in Td:
-            Td[d].sort()
-
-        # Semestres
-        S = list(load_csv("semestres")["id"])
-
-        # Carreras
-        K = list(load_csv("carreras")["codigo"])
-
-        # Sugerencias de UCs
-        sug_df = load_csv("trayectoria_sugerida")
-        SUG = [
-            (row["unidad_curricular"], row["semestre"], row["carrera"])
-            for _, row in sug_df.iterrows()
-            if str(row["unidad_curricular"]) in C  # Solo incluir si la UC existe en C
-        ]
-
-        # Pre-asignaciones
-        pa_df = load_csv("preasignaciones")
-        PA = {}
-        for _, row in pa_df.iterrows():
-            unidad_curricular = str(row["unidad_curricular"])
-            if unidad_curricular in C:  # Solo incluir si la UC existe en C
-                if unidad_curricular not in PA:
-                    PA[unidad_curricular] = []
-
-                PA[unidad_curricular].append((row["dia"], row["turno"]))
-
-        # Previaturas
-        prev_df = load_csv("previas")
-        P = [
-            (str(row["uc"]), str(row["uc_requerida"]))  # Convertir a string
-            for _, row in prev_df.iterrows()
-            if str(row["uc"]) in C
-            and str(row["uc_requerida"]) in C  # Convertir a string para comparación
-            and str(row["uc"]) != str(row["uc_requerida"])
-        ]
-
-        # Pares frecuentes
-        PARES_UC = list(combinations(C, 2))
-
-        # Unidades curriculares del mismo semestre
-        UC_MISMO_SEMESTRE = {
-            (c1, c2): True
-            for (c1, s1, k1) in SUG
-            for (c2, s2, k2) in SUG
-            if c1 != c2 and s1 == s2 and k1 == k2
-        }
-
-        # ==== PARÁMETROS ====
-
-        # Capacidad por día y turno
-        cap_df = load_csv("capacidad")
-        cp = {
-            (row["id_dia"], row["id_turno"]): row["capacidad"]
-            for _, row in cap_df.iterrows()
-        }
-
-        # Factor de capacidad
-        datos = load_csv("datos")
-        fac_cp = float(datos["fac_cp"].iloc[0])
-        alta_co = float(datos["alta_co"].iloc[0])
-
-        # Inscriptos por UC
-        ins_df = load_csv("inscriptos")
-        ins = {row["uc"]: row["inscriptos"] for _, row in ins_df.iterrows()}
-
-        # Inscriptos simultáneos
-        co_df = load_csv("coincidencia")
-        co = {
-            (row["uc_1"], row["uc_2"]): row["coincidencia"]
-            for _, row in co_df.iterrows()
-        }
-
-        # Completar co para todos los pares de UCs
-        co.update({(c1, c2): 0 for (c1, c2) in PARES_UC if (c1, c2) not in co})
-        co.update({(c2, c1): v for (c1, c2), v in co.items()})
-        co.update({(c, c): ins[c] for c in C})
-
-        # Distancia en semestres (pre-calculada)
-        def get_dist_sem(c1, c2):
-            careers_in_common = [
-                k
-                for (_, _, k) in SUG
-                if any((c1, s1, k) in SUG for s1 in S)
-                and any((c2, s2, k) in SUG for s2 in S)
-            ]
-
-            if careers_in_common:
-                distances = []
-                for k in careers_in_common:
-                    semester_c1 = [s for c, s, kk in SUG if c == c1 and kk == k][0]
-                    semester_c2 = [s for c, s, kk in SUG if c == c2 and kk == k][0]
-                    distances.append(abs(semester_c1 - semester_c2))
-                return min(distances)
-            else:
-                return len(S)
-
-        dist_sem = {(c1, c2): get_dist_sem(c1, c2) for c1, c2 in PARES_UC}
-        dist_sem.update({(c2, c1): v for (c1, c2), v in dist_sem.items()})
-
-        # Determinar el máximo número de turnos
-        max_turns = max(len(Td[d]) for d in D)
-
-        # Crear un diccionario para mapear cada par (día, turno) a un valor de tiempo
-        time_value = {}
-        for d in D:
-            sorted_turns = sorted(Td[d])
-            for index, t in enumerate(sorted_turns):
-                # Mapear el día a un entero y el turno a una fracción
-                time_value[(d, t)] = d + index / (max_turns + 1)
-
-        def get_ds_from_time(time_value):
-            differences = set()
-            for d1, t1 in time_value:
-                for d2, t2 in time_value:
-                    differences.add(abs(time_value[(d1, t1)] - time_value[(d2, t2)]))
-            return sorted(list(differences))
-
-        DS = get_ds_from_time(time_value)
-        M = max(DS)
-        dist_peso = {ds: 1 / math.exp(0.2 * ds) for ds in DS}
-
-        # Eliminar cursos sin valores de inscripción
-        invalid_courses = [c for c, v in ins.items() if pd.isna(v)]
-        if invalid_courses:
-            for c in invalid_courses:
-                del ins[c]
-                if c in C:
-                    C.remove(c)
-
-        return {
-            # Conjuntos
-            "D": D,
-            "C": C,
-            "T": T,
-            "Td": Td,
-            "S": S,
-            "K": K,
-            "SUG": SUG,
-            "PA": PA,
-            "P": P,
-            "COP": COP,
-            "PARES_UC": PARES_UC,
-            "UC_MISMO_SEMESTRE": UC_MISMO_SEMESTRE,
-            "DS": DS,
-            # Parámetros
-            "cp": cp,
-            "fac_cp": fac_cp,
-            "alta_co": alta_co,
-            "ins": ins,
-            "co": co,
-            "dist_sem": dist_sem,
-            "dist_peso": dist_peso,
-            "time_value": time_value,
-            # Constantes
-            "M": M,
-        }
+        with open(tmp_path, "wb") as f:
+            np.savez(f, hash=case_hash, **compiled)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        # Si la escritura se interrumpe, no queda el temporal a medio escribir
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def build_model_data(compiled):
+    """
+    Construye los conjuntos y parámetros del modelo a partir de un caso compilado.
+
+    Args:
+        compiled (dict): Arreglos generados por compile_case
+
+    Returns:
+        dict: Diccionario con todos los conjuntos y parámetros del modelo
+    """
+    # ==== CONJUNTOS ====
+
+    # Días del calendario
+    D = compiled["D"].tolist()
+
+    # Unidades curriculares
+    C = compiled["C"].tolist()
+
+    # Turnos
+    T = compiled["T"].tolist()
+
+    # Profesores coincidentes
+    COP = list(zip(compiled["cop_1"].tolist(), compiled["cop_2"].tolist()))
+
+    # Turnos disponibles por día
+    Td = {d: [] for d in D}
+    for d, t in zip(compiled["td_dia"].tolist(), compiled["td_turno"].tolist()):
+        Td[d].append(t)
+
+    # Semestres
+    S = compiled["S"].tolist()
+
+    # Carreras
+    K = compiled["K"].tolist()
+
+    # Sugerencias de UCs
+    SUG = list(
+        zip(
+            compiled["sug_uc"].tolist(),
+            compiled["sug_semestre"].tolist(),
+            compiled["sug_carrera"].tolist(),
+        )
+    )
+
+    # Pre-asignaciones
+    PA = {}
+    for c, d, t in zip(
+        compiled["pa_uc"].tolist(),
+        compiled["pa_dia"].tolist(),
+        compiled["pa_turno"].tolist(),
+    ):
+        PA.setdefault(c, []).append((d, t))
+
+    # Previaturas
+    P = list(zip(compiled["p_uc"].tolist(), compiled["p_uc_requerida"].tolist()))
+
+    # Pares frecuentes
+    PARES_UC = list(combinations(C, 2))
+
+    # Unidades curriculares del mismo semestre
+    UC_MISMO_SEMESTRE = dict.fromkeys(
+        zip(
+            compiled["mismo_semestre_1"].tolist(),
+            compiled["mismo_semestre_2"].tolist(),
+        ),
+        True,
+    )
+
+    # ==== PARÁMETROS ====
+
+    # Capacidad por día y turno
+    cp = dict(
+        zip(
+            zip(compiled["cp_dia"].tolist(), compiled["cp_turno"].tolist()),
+            compiled["cp"].tolist(),
+        )
+    )
+
+    # Factor de capacidad
+    fac_cp = float(compiled["fac_cp"])
+    alta_co = float(compiled["alta_co"])
+
+    # Inscriptos por UC
+    ins = dict(zip(compiled["ins_uc"].tolist(), compiled["ins"].tolist()))
+
+    # Inscriptos simultáneos. Se conservan también los pares con UCs fuera de C,
+    # ya que intervienen en la normalización del modelo.
+    uc_1 = compiled["co_1"].tolist()
+    uc_2 = compiled["co_2"].tolist()
+    coincidencia = compiled["co"].tolist()
+
+    # Completar co para todos los pares de UCs: una matriz indexada por UC marca
+    # los pares de C que ya tienen coincidencia (en cualquier orientación) y el
+    # resto se completa con 0.
+    uc_index = pd.Index(C)
+    n = len(C)
+    i_1 = uc_index.get_indexer(compiled["co_1"])
+    i_2 = uc_index.get_indexer(compiled["co_2"])
+    in_both = (i_1 >= 0) & (i_2 >= 0)
+    known = np.zeros((n, n), dtype=bool)
+    known[i_1[in_both], i_2[in_both]] = True
+    known |= known.T
+    rows, cols = np.triu_indices(n, k=1)
+    missing = ~known[rows, cols]
+    missing_pairs = [(C[i], C[j]) for i, j in zip(rows[missing], cols[missing])]
+
+    co = dict(zip(zip(uc_1, uc_2), coincidencia))
+    co.update(dict.fromkeys(missing_pairs, 0))
+    co.update(zip(zip(uc_2, uc_1), coincidencia))
+    co.update(((c2, c1), 0) for c1, c2 in missing_pairs)
+    co.update(((c, c), ins[c]) for c in C)
+
+    # Distancia en semestres (pre-calculada como matriz densa entre UCs)
+    distances = compiled["dist_sem"][rows, cols].tolist()
+    dist_sem = dict(zip(PARES_UC, distances))
+    dist_sem.update(zip(((c2, c1) for c1, c2 in PARES_UC), distances))
+
+    # Determinar el máximo número de turnos
+    max_turns = max(len(Td[d]) for d in D)
+
+    # Crear un diccionario para mapear cada par (día, turno) a un valor de tiempo
+    time_value = {}
+    for d in D:
+        sorted_turns = sorted(Td[d])
+        for index, t in enumerate(sorted_turns):
+            # Mapear el día a un entero y el turno a una fracción
+            time_value[(d, t)] = d + index / (max_turns + 1)
+
+    def get_ds_from_time(time_value):
+        differences = set()
+        for d1, t1 in time_value:
+            for d2, t2 in time_value:
+                differences.add(abs(time_value[(d1, t1)] - time_value[(d2, t2)]))
+        return sorted(list(differences))
+
+    DS = get_ds_from_time(time_value)
+    M = max(DS)
+    dist_peso = {ds: 1 / math.exp(0.2 * ds) for ds in DS}
+
+    return {
+        # Conjuntos
+        "D": D,
+        "C": C,
+        "T": T,
+        "Td": Td,
+        "S": S,
+        "K": K,
+        "SUG": SUG,
+        "PA": PA,
+        "P": P,
+        "COP": COP,
+        "PARES_UC": PARES_UC,
+        "UC_MISMO_SEMESTRE": UC_MISMO_SEMESTRE,
+        "DS": DS,
+        # Parámetros
+        "cp": cp,
+        "fac_cp": fac_cp,
+        "alta_co": alta_co,
+        "ins": ins,
+        "co": co,
+        "dist_sem": dist_sem,
+        "dist_peso": dist_peso,
+        "time_value": time_value,
+        # Constantes
+        "M": M,
+    }
+
+
+def filter_domains(datos):
+    """
+    Calcula los días y turnos posibles de cada UC, para crear solo esas
+    variables x en el modelo.
+
+    Un día y turno es posible si los inscriptos de la UC entran en su capacidad
+    (con el factor de capacidad) y, si la UC está pre-asignada, si es uno de los
+    de su pre-asignación. Para cada par de UCs se calculan además las
+    distancias que sus días y turnos posibles pueden producir, de modo que la
+    formulación completa solo crea esas variables w.
+
+    Args:
+        datos (dict): Conjuntos y parámetros devueltos por build_model_data
+
+    Returns:
+        dict: Copia de datos con los días y turnos posibles de cada UC en
+        DOMINIO, las distancias posibles de cada par en DS_PAR y un resumen de lo
+        descartado en FILTRO_DOMINIOS
+    """
+    C, D, Td = datos["C"], datos["D"], datos["Td"]
+    PA, COP = datos["PA"], datos["COP"]
+    cp, fac_cp, ins = datos["cp"], datos["fac_cp"], datos["ins"]
+    time_value = datos["time_value"]
+    DS = datos["DS"]
+
+    slots = [(d, t) for d in D for t in Td[d]]
+    capacity = np.array([cp[s] * fac_cp for s in slots])
+
+    allowed = np.array([ins[c] <= capacity for c in C]).reshape(len(C), len(slots))
+    slot_index = {s: k for k, s in enumerate(slots)}
+    for k, c in enumerate(C):
+        if c in PA:
+            pre_assigned = np.zeros(len(slots), dtype=bool)
+            pre_assigned[[slot_index[s] for s in PA[c]]] = True
+            allowed[k] &= pre_assigned
+
+    empty = [c for c, row in zip(C, allowed) if not row.any()]
+    if empty:
+        raise ValueError(f"UCs sin ningún día y turno posible: {', '.join(empty)}")
+
+    DOMINIO = {c: [s for s, ok in zip(slots, row) if ok] for c, row in zip(C, allowed)}
+
+    # Distancias entre los días y turnos posibles de cada par. Con ambos
+    # dominios completos se producen todas las de DS.
+    tau = np.array([time_value[s] for s in slots])
+    ds_index = {ds: k for k, ds in enumerate(DS)}
+    uc_index = {c: k for k, c in enumerate(C)}
+    full = allowed.all(axis=1)
+    DS_PAR = {}
+    dropped_w = 0
+    for c1, c2 in datos["PARES_UC"]:
+        k1, k2 = uc_index[c1], uc_index[c2]
+        if full[k1] and full[k2]:
+            continue
+        distances = np.unique(np.abs(tau[allowed[k1]][:, None] - tau[allowed[k2]][None, :]))
+        DS_PAR[c1, c2] = [DS[ds_index[ds]] for ds in distances.tolist()]
+        dropped_w += len(DS) - len(DS_PAR[c1, c2])
+
+    # Filas que quedan sin variables: las de un día y turno que no admite
+    # ninguna UC (máximo de evaluaciones y capacidad), las de profesores
+    # coincidentes en un día y turno que ninguna UC del par o clique admite, y
+    # las de UCs del mismo semestre en un día que ninguna admite
+    slot_day = np.array([d for d, _ in slots])
+    day_allowed = np.stack([allowed[:, slot_day == d].any(axis=1) for d in D], axis=1)
+    cop_groups = datos.get("CLIQUES_COP", COP)
+    ms_groups = datos.get("CLIQUES_MISMO_SEMESTRE", datos["UC_MISMO_SEMESTRE"])
+    dropped_rows = (
+        2 * int((~allowed.any(axis=0)).sum())
+        + sum(
+            int((~allowed[[uc_index[c] for c in group]].any(axis=0)).sum())
+            for group in cop_groups
+        )
+        + sum(
+            int((~day_allowed[[uc_index[c] for c in group]].any(axis=0)).sum())
+            for group in ms_groups
+        )
+    )
+
+    return {
+        **datos,
+        "DOMINIO": DOMINIO,
+        "DS_PAR": DS_PAR,
+        "FILTRO_DOMINIOS": {
+            "x": allowed.size,
+            "x_descartadas": int((~allowed).sum()),
+            "w": len(datos["PARES_UC"]) * len(DS),
+            "w_descartadas": dropped_w,
+            "filas_descartadas": dropped_rows,
+        },
+    }
+
+
+@dataclass(frozen=True)
+class PairPruning:
+    """
+    Umbrales para descartar pares de UCs del bloque de distancias del modelo.
+
+    Un par se descarta si su coincidencia es menor a min_co y su distancia en
+    semestres es mayor a max_dist_sem. Los pares de previas y los de alta
+    coincidencia se conservan siempre, ya que tienen términos o restricciones
+    propias en el modelo.
+    """
+
+    min_co: float = 1
+    max_dist_sem: int = 2
+
+
+def prune_pairs(datos, pruning):
+    """
+    Filtra PARES_UC según los umbrales de pruning.
+
+    Las variables de distancia (w, z, z_plus, z_minus, y) y las restricciones de
+    cada par descartado desaparecen del modelo, junto con su término del
+    objetivo. Los pares descartados son los de baja coincidencia entre UCs de
+    semestres lejanos, cuyo aporte al objetivo es casi constante.
+
+    Args:
+        datos (dict): Conjuntos y parámetros devueltos por build_model_data
+        pruning (PairPruning): Umbrales de la poda
+
+    Returns:
+        dict: Copia de datos con PARES_UC filtrado y un resumen de lo descartado
+        en PODA_PARES
+    """
+    PARES_UC = datos["PARES_UC"]
+    co = datos["co"]
+    dist_sem = datos["dist_sem"]
+    alta_co = datos["alta_co"]
+
+    # Pares de previas, en cualquier orientación
+    prev_pairs = set(datos["P"])
+    prev_pairs.update((c2, c1) for c1, c2 in datos["P"])
+
+    co_pair = np.array([co[p] for p in PARES_UC], dtype=float)
+    dist_sem_pair = np.array([dist_sem[p] for p in PARES_UC], dtype=float)
+    in_prev = np.array([p in prev_pairs for p in PARES_UC], dtype=bool)
+
+    keep = (
+        (co_pair >= pruning.min_co)
+        | (dist_sem_pair <= pruning.max_dist_sem)
+        | (co_pair >= alta_co)
+        | in_prev
+    )
+
+    # Aporte máximo de cada par al objetivo (peso de distancia 1), separado en
+    # el término de coincidencia y el de semestres: el aporte total para un
+    # alpha dado es masa_co + alpha * masa_dist_sem.
+    max_co = max(co[c1, c2] for c1, c2 in co if c1 != c2) + 1
+    mass_co = co_pair / max_co
+    mass_dist_sem = 1 / (dist_sem_pair + 1)
+
+    dropped = int((~keep).sum())
+
+    return {
+        **datos,
+        "PARES_UC": [p for p, k in zip(PARES_UC, keep.tolist()) if k],
+        "PODA_PARES": {
+            "pares": len(PARES_UC),
+            "pares_descartados": dropped,
+            # w por cada distancia, más z, z_plus, z_minus e y
+            "variables_descartadas": dropped * (len(datos["DS"]) + 4),
+            "masa_co": float(mass_co.sum()),
+            "masa_co_descartada": float(mass_co[~keep].sum()),
+            "masa_dist_sem": float(mass_dist_sem.sum()),
+            "masa_dist_sem_descartada": float(mass_dist_sem[~keep].sum()),
+        },
+    }
+
+
+def load_calendar_data(
+    dir_name,
+    use_cache=True,
+    pair_pruning=None,
+    domains=False,
+    cliques=False,
+    symmetry=False,
+):
+    """
+    Carga los conjuntos y parámetros desde archivos CSV para el modelo de calendario
+    de evaluaciones.
+
+    El caso se compila a un snapshot (modelo_compilado.npz) dentro de su directorio,
+    identificado por un hash del contenido de los CSV. Mientras ningún CSV cambie,
+    las siguientes cargas leen el snapshot y no vuelven a procesar los CSV.
+
+    Args:
+        directorio_datos (str): Ruta al directorio que contiene los archivos CSV
+        use_cache (bool): Si es False, se ignora el snapshot y no se escribe uno nuevo
+        pair_pruning (PairPruning): Si se indica, se descartan los pares de UCs que
+            no alcanzan sus umbrales (ver prune_pairs)
+        domains (bool): Calcular los días y turnos posibles de cada UC, para no
+            crear variables que no pueden valer 1 (ver filter_domains). Cambia
+            el tamaño del modelo, así que no se hace por defecto.
+        cliques (bool): Agrupar los pares de profesores coincidentes y de UCs
+            del mismo semestre en cliques, con una restricción por clique en
+            lugar de una por par (ver conflict_graph.aggregate_conflicts). En
+            benchmark_cliques.py no mejora la cota, así que no se hace por
+            defecto.
+        symmetry (bool): Buscar simetrías entre días y turnos y agregar una
+            restricción que las rompa (ver symmetry.break_symmetry)
+
+    Returns:
+        dict: Diccionario con todos los conjuntos y parámetros del modelo
+    """
+    try:
+        compiled = None
+
+        if use_cache:
+            case_hash = get_case_hash(dir_name)
+            compiled = load_compiled_case(dir_name, case_hash)
+
+        if compiled is None:
+            compiled = compile_case(dir_name)
+
+            if use_cache:
+                save_compiled_case(dir_name, case_hash, compiled)
+
+        datos = build_model_data(compiled)
+
+        if pair_pruning is not None:
+            datos = prune_pairs(datos, pair_pruning)
+
+        if cliques:
+            datos = aggregate_conflicts(datos)
+
+        if symmetry:
+            datos = break_symmetry(datos)
+
+        if domains:
+            datos = filter_domains(datos)
+
+        return datos
 
     except Exception as e:
         raise Exception(f"Error al cargar los datos desde {dir_name}: {str(e)}")
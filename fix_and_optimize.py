@@ -0,0 +1,222 @@
+import subprocess
+from timeit import default_timer as timer
+
+import numpy as np
+import pulp as pl
+
+from constants import (
+    Solver,
+    Formulation,
+    AbsoluteValue,
+    Decomposition,
+    MINUTES,
+    FEASIBLE,
+)
+from csv_data_to_model_data import load_calendar_data
+from heuristic import run_heuristic
+from matrix_model import build_matrix_model, solve_matrix_model
+from solve import get_solver
+from symmetry import canonical_assignment
+from warm_start import load_assignment, start_values
+
+# Mejora mínima del objetivo para aceptar la solución de un subproblema
+IMPROVEMENT_TOLERANCE = 1e-6
+
+# Tolerancia para considerar entero el valor de una variable x
+INTEGRALITY_TOLERANCE = 1e-6
+
+
+def course_windows(datos, assignment, decomposition, window_size):
+    """
+    UCs que se liberan en cada subproblema.
+
+    Args:
+        datos (dict): Conjuntos y parámetros devueltos por load_calendar_data
+        assignment (dict): Asignación actual {uc: (dia, turno)}
+        decomposition (Decomposition): Forma de agrupar las UCs
+        window_size (int): Días de cada ventana (DAYS) o UCs de cada grupo
+            (CLUSTERS)
+
+    Returns:
+        list: Listas de UCs, una por subproblema
+    """
+    C, D, co = datos["C"], datos["D"], datos["co"]
+
+    match decomposition:
+        case Decomposition.DAYS:
+            # Ventanas de días consecutivos que avanzan de a un día
+            windows = []
+            for k in range(max(1, len(D) - window_size + 1)):
+                days = set(D[k : k + window_size])
+                windows.append([c for c in C if assignment[c][0] in days])
+        case Decomposition.CLUSTERS:
+            # Cada UC, empezando por las de más coincidencia, junto a las UCs con
+            # las que más coincide
+            def coincidence(c1, c2):
+                return co.get((c1, c2), 0)
+
+            total = {c1: sum(coincidence(c1, c2) for c2 in C if c2 != c1) for c1 in C}
+            windows, seen = [], set()
+            for c1 in sorted(C, key=total.get, reverse=True):
+                partners = sorted(
+                    (c2 for c2 in C if c2 != c1),
+                    key=lambda c2: coincidence(c1, c2),
+                    reverse=True,
+                )
+                cluster = [c1] + partners[: window_size - 1]
+                if frozenset(cluster) not in seen:
+                    seen.add(frozenset(cluster))
+                    windows.append(cluster)
+        case _:
+            raise ValueError(f"Descomposición {decomposition} no soportada")
+
+    return [window for window in windows if window]
+
+
+def fix_and_optimize(
+    datos: dict,
+    solver_name: Solver,
+    alpha: float,
+    beta: float,
+    decomposition: Decomposition = Decomposition.CLUSTERS,
+    window_size: int = 5,
+    sub_time_limit_seconds: float = 10,
+    time_limit_minutes=60,
+    formulation: Formulation = Formulation.PIECEWISE,
+    absolute_value: AbsoluteValue = AbsoluteValue.BIG_M,
+    warm_start: str | dict | None = None,
+    threads: int | None = None,
+):
+    """
+    Mejora un calendario resolviendo subproblemas: en cada uno se liberan las
+    variables de un grupo de UCs y las demás quedan fijas en la mejor solución
+    encontrada. Los grupos se recorren hasta que ninguno mejora el objetivo o se
+    termina el tiempo.
+
+    El modelo completo se construye una sola vez; cada subproblema es el
+    submodelo de MatrixModel.restrict, con solo las columnas de las UCs libres.
+    Por defecto se usa la formulación por tramos y grupos de 5 UCs, con los que
+    CBC resuelve cada subproblema en pocos segundos; con la formulación completa
+    o con ventanas de días los subproblemas son bastante más grandes.
+
+    Args:
+        datos (dict): Conjuntos y parámetros devueltos por load_calendar_data
+        solver_name (Solver): Solver de los subproblemas
+        alpha (float): Peso de la distancia en semestres en el objetivo
+        beta (float): Peso de la distancia entre previas en el objetivo
+        decomposition (Decomposition): Forma de elegir las UCs de cada
+            subproblema
+        window_size (int): Días de cada ventana o UCs de cada grupo
+        sub_time_limit_seconds (float): Tiempo límite de cada subproblema
+        time_limit_minutes (float): Tiempo límite total
+        warm_start (str | dict): Calendario inicial, como en solve_model. Por
+            defecto se genera con la heurística.
+
+    Returns:
+        tuple: Valor objetivo, tiempo, estado (FEASIBLE), variables y
+        asignación, como solve_model, y la historia de la búsqueda: lista de
+        (tiempo, objetivo) con cada mejora
+    """
+    start_time = timer()
+    time_limit = time_limit_minutes * MINUTES
+
+    model = build_matrix_model(datos, alpha, beta, formulation, absolute_value)
+    courses = model.x_index[0]
+    course_index = {c: k for k, c in enumerate(courses)}
+
+    solver = get_solver(solver_name, sub_time_limit_seconds / MINUTES, threads)
+    # La salida de cada subproblema no aporta; se informa cada mejora
+    solver.msg = False
+
+    if warm_start is None:
+        assignment, _ = run_heuristic(datos, alpha, beta)
+        if assignment is None:
+            return None, timer() - start_time, "Not Solved", [], {}, []
+    else:
+        assignment = canonical_assignment(datos, load_assignment(warm_start))
+
+    start = start_values(datos, assignment, formulation, absolute_value)
+    values = np.array([start.get(name, 0.0) for name in model.col_names])
+    best = model.objective_value(values)
+
+    history = [(timer() - start_time, best)]
+    print(f"Inicial: objetivo {best:.4f} ({history[-1][0]:.1f} segundos)")
+
+    improved = True
+    while improved and timer() - start_time < time_limit:
+        improved = False
+
+        for window in course_windows(datos, assignment, decomposition, window_size):
+            if timer() - start_time >= time_limit:
+                break
+
+            # Columnas de las UCs del grupo, y las que no dependen de ninguna UC
+            free_courses = [course_index[c] for c in window]
+            col_courses = model.col_courses
+            free = np.isin(col_courses, free_courses).any(axis=1) | (
+                col_courses == -1
+            ).all(axis=1)
+
+            sub_model = model.restrict(free, values)
+            sub_start = dict(zip(sub_model.col_names, values[free].tolist()))
+            # Si el solver falla en un subproblema, se sigue con el próximo y se
+            # conserva la mejor solución
+            try:
+                status, sub_values = solve_matrix_model(sub_model, solver, sub_start)
+            except (subprocess.CalledProcessError, pl.PulpSolverError) as e:
+                print(f"Error del solver en un subproblema: {e}")
+                continue
+
+            # Solo se acepta una solución entera del subproblema
+            if sub_values is None or status != pl.LpStatus[pl.LpStatusOptimal]:
+                continue
+            sub_x = np.char.startswith(np.array(sub_model.col_names), "x_")
+            x_values = sub_values[sub_x]
+            if np.any(np.abs(x_values - np.round(x_values)) > INTEGRALITY_TOLERANCE):
+                continue
+
+            candidate = values.copy()
+            candidate[free] = sub_values
+            objective = model.objective_value(candidate)
+
+            if objective < best - IMPROVEMENT_TOLERANCE:
+                values, best = candidate, objective
+                assignment = model.assignment(values)
+                improved = True
+
+                history.append((timer() - start_time, best))
+                print(
+                    f"Mejora: objetivo {best:.4f} ({history[-1][0]:.1f} segundos),"
+                    f" {len(window)} UCs libres, {sub_model.num_cols} columnas"
+                )
+
+    return (
+        best,
+        timer() - start_time,
+        FEASIBLE,
+        model.variables(values),
+        assignment,
+        history,
+    )
+
+
+if __name__ == "__main__":
+    # Mejora un calendario con grupos de UCs, y guarda la evolución del
+    # objetivo para compararla con la resolución del modelo completo
+    import pandas as pd
+
+    from constants import Case
+    from generate_schedule import write_schedule_csv
+
+    datos = load_calendar_data(Case.large_2s2p)
+    value, time, status, _, assignment, history = fix_and_optimize(
+        datos, Solver.PULP_CBC_CMD, 0.5, 0.5, time_limit_minutes=30
+    )
+
+    print(f"Valor de la función objetivo: {value}")
+    print(f"Tiempo de ejecución: {time:.2f} segundos")
+
+    pd.DataFrame(history, columns=["tiempo", "objetivo"]).to_csv(
+        "fix_and_optimize_2s2p.csv", index=False
+    )
+    write_schedule_csv(assignment, "schedule_2s2p_fix_and_optimize.csv")
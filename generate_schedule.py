@@ -1,46 +1,51 @@
 import csv
+from functools import lru_cache
 
 
-def generate_schedule_csv(variables, csv_name="schedule.csv"):
-    # Nos quedamos solo con las variables x que valen 1.
-    schedule_vars = {}
-    for v in variables:
-        if v.name.startswith("x_") and v.value() == 1.0:
-            schedule_vars[v.name] = v.value()
-
-    # Extraemos los días y turnos máximos de las variables
-    max_day = 1
-    max_turn = 1
-    for var_name in schedule_vars:
-        # Las variables tienen la forma x_<uc>_<dia>_<turno>
-        parts = var_name.split("_")
-        _, _, day, turn = parts
-        max_day = max(max_day, int(day))
-        max_turn = max(max_turn, int(turn))
-
-    # Creamos un diccionario con la estructura de la tabla.
-    schedule = {
-        i: {j: [] for j in range(1, max_turn + 1)} for i in range(1, max_day + 1)
-    }
+@lru_cache
+def load_uc_descriptions(file_name="data/unidades_curriculares.csv"):
+    """
+    Descripción de cada UC para los calendarios, con la forma
+    "<descripcion> (<codigo>)". Se lee una sola vez por archivo.
 
-    # Cargamos las descripciones de las unidades curriculares.
+    Returns:
+        dict: {codigo: descripcion}
+    """
     uc_descriptions = {}
-    with open("data/unidades_curriculares.csv", "r") as f:
+    with open(file_name, "r") as f:
         reader = csv.DictReader(f)
         for row in reader:
             uc_descriptions[row["codigo"]] = row["descripcion"] + " (" + row["codigo"] + ")"
 
-    # Procesamos cada una de las variables para agregarlas al schedule.
-    for var_name in schedule_vars:
-        parts = var_name.split("_")
-        _, uc, day, turn = parts
+    return uc_descriptions
 
-        # Buscamos la descripción de la UC. Fallback al código si no se encuentra.
-        uc_description = uc_descriptions.get(uc, uc)
 
-        day = int(day)
-        turn = int(turn)
-        schedule[day][turn].append(uc_description)
+def write_schedule_csv(assignment, csv_name="schedule.csv", descriptions=None):
+    """
+    Escribe el calendario de una asignación, con un día por fila y un turno por
+    columna.
+
+    Args:
+        assignment (dict): {uc: (dia, turno)}, como la que devuelve solve_model
+        csv_name (str): Archivo de salida
+        descriptions (dict): {codigo: descripcion} de las UCs (por defecto, las
+            de load_uc_descriptions)
+    """
+    if descriptions is None:
+        descriptions = load_uc_descriptions()
+
+    # Extraemos los días y turnos máximos de la asignación
+    max_day = max([1] + [int(day) for day, _ in assignment.values()])
+    max_turn = max([1] + [int(turn) for _, turn in assignment.values()])
+
+    # Creamos un diccionario con la estructura de la tabla.
+    schedule = {
+        i: {j: [] for j in range(1, max_turn + 1)} for i in range(1, max_day + 1)
+    }
+
+    for uc, (day, turn) in assignment.items():
+        # Buscamos la descripción de la UC. Fallback al código si no se encuentra.
+        schedule[int(day)][int(turn)].append(descriptions.get(uc, uc))
 
     # Escribimos el archivo CSV.
     with open(csv_name, "w", newline="") as csvfile:
@@ -60,3 +65,20 @@ def generate_schedule_csv(variables, csv_name="schedule.csv"):
                 row.append(cell)
 
             writer.writerow(row)
+
+
+def generate_schedule_csv(variables, csv_name="schedule.csv"):
+    """
+    Escribe el calendario a partir de las variables de una solución, leyendo la
+    UC, el día y el turno del nombre de cada x. Con la asignación de solve_model
+    es preferible write_schedule_csv.
+    """
+    assignment = {}
+    for v in variables:
+        # Nos quedamos solo con las variables x que valen 1, de la forma
+        # x_<uc>_<dia>_<turno>
+        if v.name.startswith("x_") and v.value() == 1.0:
+            uc, day, turn = v.name[2:].rsplit("_", 2)
+            assignment[uc] = (int(day), int(turn))
+
+    write_schedule_csv(assignment, csv_name)
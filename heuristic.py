@@ -0,0 +1,395 @@
+import math
+from timeit import default_timer as timer
+
+import numpy as np
+
+from constants import FEASIBLE
+from csv_data_to_model_data import load_calendar_data
+from matrix_model import Variable
+
+# Máximo de evaluaciones en un mismo turno, como en el modelo
+MAX_EVALUACIONES_TURNO = 6
+
+# Separación mínima entre las evaluaciones de UCs con alta coincidencia
+SEPARACION_MINIMA = 2
+
+
+class HeuristicScheduler:
+    """
+    Heurística de construcción y búsqueda local para el calendario de evaluaciones.
+
+    Usa las mismas restricciones y la misma función objetivo que el modelo de
+    solve.build_pulp_model, sobre arreglos indexados por UC y por día y turno
+    (slot). El costo de mover una UC se evalúa de forma incremental: solo cambian
+    los términos de los pares en los que participa esa UC.
+    """
+
+    def __init__(self, datos, alpha, beta, seed=0):
+        D = datos.get("D")
+        C = datos.get("C")
+        Td = datos.get("Td")
+        PA = datos.get("PA")
+        COP = datos.get("COP")
+        P = datos.get("P")
+        PARES_UC = datos.get("PARES_UC")
+        UC_MISMO_SEMESTRE = datos.get("UC_MISMO_SEMESTRE")
+        cp = datos.get("cp")
+        fac_cp = datos.get("fac_cp")
+        alta_co = datos.get("alta_co")
+        ins = datos.get("ins")
+        co = datos.get("co")
+        dist_sem = datos.get("dist_sem")
+        dist_peso = datos.get("dist_peso")
+        time_value = datos.get("time_value")
+
+        self.C = C
+        self.slots = [(d, t) for d in D for t in Td[d]]
+        self.rng = np.random.default_rng(seed)
+
+        uc_index = {c: i for i, c in enumerate(C)}
+        slot_index = {s: k for k, s in enumerate(self.slots)}
+        n_c, n_s = len(C), len(self.slots)
+
+        def pair_matrix(pairs):
+            matrix = np.zeros((n_c, n_c), dtype=bool)
+            for c1, c2 in pairs:
+                matrix[uc_index[c1], uc_index[c2]] = True
+            return matrix | matrix.T
+
+        # Días y turnos permitidos para cada UC (las pre-asignadas solo en los suyos)
+        self.allowed = np.ones((n_c, n_s), dtype=bool)
+        for c, allowed_slots in PA.items():
+            self.allowed[uc_index[c]] = False
+            self.allowed[uc_index[c], [slot_index[s] for s in allowed_slots]] = True
+
+        self.ins = np.array([ins[c] for c in C], dtype=float)
+        self.capacity = np.array([cp[s] * fac_cp for s in self.slots], dtype=float)
+        self.slot_day = np.array([d for d, _ in self.slots])
+        self.day_index = np.unique(self.slot_day, return_inverse=True)[1]
+        self.n_days = self.day_index.max() + 1
+
+        # Pares que no pueden compartir turno, día o estar a menos de 2 de distancia
+        self.cop = pair_matrix(COP)
+        self.same_semester = pair_matrix(UC_MISMO_SEMESTRE)
+        self.alta = pair_matrix(p for p in PARES_UC if co[p] >= alta_co)
+
+        tau = np.array([time_value[s] for s in self.slots])
+        distance = np.abs(tau[:, None] - tau[None, :])
+        self.near = distance < SEPARACION_MINIMA
+
+        # Peso de la distancia entre cada par de slots, para el término de pares y
+        # para el de previas. Las distancias coinciden con las de DS.
+        peso = np.vectorize(lambda ds: dist_peso[ds])(distance)
+        previa = np.minimum(1, distance / 5)
+
+        # Coeficiente de cada par de UCs en el objetivo, en ambas orientaciones
+        max_co = max(co[c1, c2] for c1, c2 in co if c1 != c2) + 1
+        pair_weight = np.zeros((n_c, n_c))
+        for c1, c2 in PARES_UC:
+            coef = co[c1, c2] / max_co + alpha * (1 / (dist_sem[c1, c2] + 1))
+            pair_weight[uc_index[c1], uc_index[c2]] = coef
+            pair_weight[uc_index[c2], uc_index[c1]] = coef
+
+        prev_weight = np.zeros((n_c, n_c))
+        for c1, c2 in P:
+            prev_weight[uc_index[c1], uc_index[c2]] += beta
+            prev_weight[uc_index[c2], uc_index[c1]] += beta
+
+        self.peso = peso
+        self.previa = previa
+        self.pair_weight = pair_weight
+        self.prev_weight = prev_weight
+
+        # Estado de la búsqueda: slot de cada UC (-1 si no está asignada), cantidad
+        # de evaluaciones e inscriptos por slot
+        self.assign = np.full(n_c, -1, dtype=np.int64)
+        self.count = np.zeros(n_s, dtype=np.int64)
+        self.load = np.zeros(n_s)
+
+    # region ESTADO
+
+    def place(self, i, s):
+        self.assign[i] = s
+        self.count[s] += 1
+        self.load[s] += self.ins[i]
+
+    def remove(self, i):
+        s = self.assign[i]
+        self.assign[i] = -1
+        self.count[s] -= 1
+        self.load[s] -= self.ins[i]
+        return s
+
+    def objective(self):
+        placed = np.flatnonzero(self.assign >= 0)
+        s = self.assign[placed]
+        w = self.pair_weight[np.ix_(placed, placed)]
+        p = self.prev_weight[np.ix_(placed, placed)]
+        cost = (w * self.peso[np.ix_(s, s)]).sum() + (p * self.previa[np.ix_(s, s)]).sum()
+        return float(cost / 2)
+
+    # endregion
+
+    # region EVALUACIÓN DE MOVIMIENTOS
+
+    def slot_costs(self, i):
+        """
+        Costo de los pares de la UC i con las demás UCs asignadas, para cada slot
+        posible de i.
+        """
+        placed = np.flatnonzero(self.assign >= 0)
+        s = self.assign[placed]
+        return self.peso[:, s] @ self.pair_weight[i, placed] + (
+            self.previa[:, s] @ self.prev_weight[i, placed]
+        )
+
+    def feasible_slots(self, i):
+        """
+        Slots en los que se puede asignar la UC i, que no debe estar asignada,
+        sin violar ninguna restricción.
+        """
+        feasible = self.allowed[i].copy()
+        feasible &= self.count < MAX_EVALUACIONES_TURNO
+        feasible &= self.load + self.ins[i] <= self.capacity
+
+        placed = self.assign >= 0
+
+        # Profesores coincidentes: ningún otro curso del profesor en el turno
+        conflict = self.assign[placed & self.cop[i]]
+        feasible[conflict] = False
+
+        # Mismo semestre: ningún otro curso del semestre en el día
+        busy_days = self.day_index[self.assign[placed & self.same_semester[i]]]
+        feasible &= ~np.isin(self.day_index, busy_days)
+
+        # Alta coincidencia: al menos 2 de distancia con los demás cursos
+        near = self.assign[placed & self.alta[i]]
+        if len(near):
+            feasible &= ~self.near[:, near].any(axis=1)
+
+        return feasible
+
+    # endregion
+
+    # region CONSTRUCCIÓN
+
+    def construct(self, noise=0.0):
+        """
+        Asigna las UCs una a una, en orden de más a menos restringidas, al slot
+        factible de menor costo. Devuelve False si alguna UC quedó sin slot.
+        """
+        self.assign[:] = -1
+        self.count[:] = 0
+        self.load[:] = 0
+
+        # Primero las que tienen menos slots posibles (por pre-asignación o por
+        # capacidad), y luego las que tienen más restricciones y peso
+        options = (self.allowed & (self.ins[:, None] <= self.capacity[None, :])).sum(
+            axis=1
+        )
+        restrictions = (
+            self.cop.sum(axis=1)
+            + self.same_semester.sum(axis=1)
+            + self.alta.sum(axis=1)
+            + (len(self.slots) - options) * len(self.C)
+        )
+        weight = self.pair_weight.sum(axis=1) + self.prev_weight.sum(axis=1)
+        priority = restrictions + weight / (weight.max() or 1)
+        priority = priority * (1 + noise * self.rng.random(len(self.C)))
+
+        for i in np.argsort(-priority, kind="stable"):
+            feasible = self.feasible_slots(i)
+            if not feasible.any():
+                return False
+
+            costs = self.slot_costs(i)
+            costs[~feasible] = np.inf
+            self.place(i, int(np.argmin(costs)))
+
+        return True
+
+    # endregion
+
+    # region BÚSQUEDA LOCAL
+
+    def relocate(self, i, temperature):
+        a = self.remove(i)
+        feasible = self.feasible_slots(i)
+        feasible[a] = False
+
+        candidates = np.flatnonzero(feasible)
+        if not len(candidates):
+            self.place(i, a)
+            return 0.0
+
+        b = int(self.rng.choice(candidates))
+        costs = self.slot_costs(i)
+        delta = costs[b] - costs[a]
+
+        if self.accept(delta, temperature):
+            self.place(i, b)
+            return delta
+
+        self.place(i, a)
+        return 0.0
+
+    def swap(self, i, j, temperature):
+        a, b = self.assign[i], self.assign[j]
+        if a == b:
+            return 0.0
+
+        # La distancia entre i y j no cambia al intercambiarlas, así que el
+        # costo se evalúa con ambas fuera del calendario.
+        self.remove(i)
+        self.remove(j)
+        costs_i = self.slot_costs(i)
+        costs_j = self.slot_costs(j)
+        delta = costs_i[b] - costs_i[a] + costs_j[a] - costs_j[b]
+
+        if self.accept(delta, temperature) and self.feasible_slots(i)[b]:
+            self.place(i, b)
+            if self.feasible_slots(j)[a]:
+                self.place(j, a)
+                return delta
+            self.remove(i)
+
+        self.place(i, a)
+        self.place(j, b)
+        return 0.0
+
+    def accept(self, delta, temperature):
+        if delta <= 0:
+            return True
+        if temperature <= 0:
+            return False
+        return self.rng.random() < math.exp(-delta / temperature)
+
+    def anneal(self, time_limit_seconds, initial_temperature=None, final_temperature=1e-4):
+        """
+        Recocido simulado sobre movimientos (cambiar una UC de slot) e
+        intercambios (dos UCs intercambian sus slots), manteniendo siempre la
+        factibilidad. Devuelve la mejor asignación encontrada y su costo.
+        """
+        n_c = len(self.C)
+        cost = self.objective()
+        best_cost, best_assign = cost, self.assign.copy()
+
+        if initial_temperature is None:
+            # Del orden del costo de un par típico, para aceptar al principio
+            # buena parte de los movimientos que empeoran
+            initial_temperature = max(cost / max(n_c, 1), final_temperature)
+
+        start_time = timer()
+        temperature = initial_temperature
+        iteration = 0
+
+        while True:
+            if iteration % 100 == 0:
+                elapsed = timer() - start_time
+                if elapsed >= time_limit_seconds:
+                    break
+                # Enfriamiento geométrico en función del tiempo transcurrido
+                progress = elapsed / time_limit_seconds
+                temperature = initial_temperature * (
+                    final_temperature / initial_temperature
+                ) ** progress
+
+            i = int(self.rng.integers(n_c))
+            if self.rng.random() < 0.5:
+                cost += self.relocate(i, temperature)
+            else:
+                cost += self.swap(i, int(self.rng.integers(n_c)), temperature)
+
+            if cost < best_cost - 1e-12:
+                best_cost, best_assign = cost, self.assign.copy()
+
+            iteration += 1
+
+        # Se vuelve a la mejor asignación encontrada
+        self.assign[:] = -1
+        self.count[:] = 0
+        self.load[:] = 0
+        for i, s in enumerate(best_assign.tolist()):
+            self.place(i, s)
+
+        return self.objective()
+
+    # endregion
+
+    def assignment(self):
+        return {c: self.slots[s] for c, s in zip(self.C, self.assign.tolist())}
+
+
+def run_heuristic(
+    datos, alpha, beta, time_limit_seconds=30, seed=0, construction_attempts=50
+):
+    """
+    Genera un calendario con la heurística de construcción y recocido simulado.
+
+    Args:
+        datos (dict): Conjuntos y parámetros devueltos por load_calendar_data
+        alpha (float): Peso de la distancia en semestres en el objetivo
+        beta (float): Peso de la distancia entre previas en el objetivo
+        time_limit_seconds (float): Tiempo para la búsqueda local
+        seed (int): Semilla de los números aleatorios
+        construction_attempts (int): Intentos de construcción, con orden
+            perturbado, antes de declarar que no se encontró un calendario factible
+
+    Returns:
+        tuple: Asignación {uc: (dia, turno)} y su valor de la función objetivo, o
+        (None, None) si no se encontró un calendario factible
+    """
+    scheduler = HeuristicScheduler(datos, alpha, beta, seed)
+
+    for attempt in range(construction_attempts):
+        if scheduler.construct(noise=0.0 if attempt == 0 else 0.5):
+            break
+    else:
+        return None, None
+
+    objective = scheduler.anneal(time_limit_seconds)
+    return scheduler.assignment(), objective
+
+
+def solve_heuristic(
+    dir_name, alpha, beta, time_limit_seconds=30, seed=0, pair_pruning=None
+):
+    """
+    Resuelve el caso con la heurística, con la misma salida que solve.solve_model:
+    valor objetivo, tiempo, estado, variables x con valor y asignación
+    {uc: (dia, turno)} (para write_schedule_csv). El estado es FEASIBLE si se
+    encontró un calendario, y "Not Solved" si no.
+    """
+    datos = load_calendar_data(dir_name, pair_pruning=pair_pruning)
+
+    start_time = timer()
+    assignment, objective = run_heuristic(datos, alpha, beta, time_limit_seconds, seed)
+    end_time = timer()
+
+    if assignment is None:
+        return None, end_time - start_time, "Not Solved", [], {}
+
+    variables = [
+        Variable(f"x_{c}_{d}_{t}", 1.0 if assignment[c] == (d, t) else 0.0)
+        for c in datos["C"]
+        for d in datos["D"]
+        for t in datos["Td"][d]
+    ]
+
+    return objective, end_time - start_time, FEASIBLE, variables, assignment
+
+
+if __name__ == "__main__":
+    # Genera un calendario con la heurística, que puede usarse como resultado o
+    # como solución inicial del modelo (warm_start en solve_model)
+    from constants import Case
+    from generate_schedule import write_schedule_csv
+
+    value, time, status, _, assignment = solve_heuristic(Case.large_2s2p, 0.5, 0.5, 30)
+
+    print("Status:", status)
+    print(f"Valor de la función objetivo: {value}")
+    print(f"Tiempo de ejecución: {time:.2f} segundos")
+
+    if assignment:
+        write_schedule_csv(assignment, "schedule_2s2p_heuristica.csv")
@@ -1,10 +1,10 @@
 from solve import solve_model
 from constants import Solver, Case
-from generate_schedule import generate_schedule_csv
+from generate_schedule import write_schedule_csv
 from datetime import datetime
 
 if __name__ == "__main__":
-    value, time, status, variables = solve_model(
+    value, time, status, variables, assignment = solve_model(
         Case.large_1s1p, Solver.GUROBI_CMD, 0.5, 0.5, 180
     )
 
@@ -21,4 +21,4 @@ if __name__ == "__main__":
     print(f"Tiempo de ejecución: {time:.2f} segundos")
     print(f"                     {time/60:.2f} minutos")
 
-    generate_schedule_csv(variables, f"schedule_1s1p_corregido.csv")
+    write_schedule_csv(assignment, f"schedule_1s1p_corregido.csv")
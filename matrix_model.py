@@ -0,0 +1,1118 @@
+import os
+import subprocess
+import tempfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+import pulp as pl
+
+from constants import Formulation, AbsoluteValue
+
+
+class Variable:
+    """
+    Valor de una variable del modelo matricial luego de resolverlo. Expone la misma
+    interfaz de lectura que pl.LpVariable (name, varValue y value()).
+    """
+
+    def __init__(self, name, value):
+        self.name = name
+        self.varValue = value
+
+    def value(self):
+        return self.varValue
+
+
+@dataclass
+class MatrixModel:
+    """
+    Modelo MIP en forma matricial: columnas (variables), filas (restricciones) y
+    la matriz de coeficientes en formato COO, ya consolidada (sin entradas
+    repetidas ni nulas).
+    """
+
+    name: str
+    col_names: list
+    col_lb: np.ndarray
+    col_ub: np.ndarray
+    col_integer: np.ndarray
+    obj: np.ndarray
+    row_names: list
+    row_sense: np.ndarray
+    row_rhs: np.ndarray
+    a_row: np.ndarray
+    a_col: np.ndarray
+    a_val: np.ndarray
+    # Función que recalcula obj para otros pesos (alpha, beta) del objetivo
+    weights_objective: Callable | None = None
+    # UCs, días y turnos, y matriz (UCs x días y turnos) con la columna de cada x
+    # (-1 para las que no se crearon)
+    x_index: tuple | None = None
+    # UCs (índices en x_index) de las que depende cada columna, una o dos por
+    # columna, con -1 en las posiciones que no se usan
+    col_courses: np.ndarray | None = None
+    # Secciones del MPS que no dependen del objetivo, formateadas en la primera
+    # escritura y reutilizadas en las siguientes
+    _mps_cache: dict | None = field(default=None, init=False, repr=False)
+
+    @property
+    def num_cols(self):
+        return len(self.col_names)
+
+    @property
+    def num_rows(self):
+        return len(self.row_names)
+
+    @property
+    def nnz(self):
+        return len(self.a_val)
+
+    def objective_value(self, values):
+        return float(self.obj @ values)
+
+    def variables(self, values):
+        return [Variable(name, v) for name, v in zip(self.col_names, values.tolist())]
+
+    def assignment(self, values):
+        """
+        Día y turno asignado a cada UC, leído de las columnas x sin pasar por sus
+        nombres. Las UCs sin ninguna x en 1 no aparecen.
+
+        Returns:
+            dict: {uc: (dia, turno)}
+        """
+        courses, slots, x_cols = self.x_index
+        x = np.where(x_cols >= 0, values[x_cols], 0)
+        chosen = x.argmax(axis=1)
+        assigned = x[np.arange(len(courses)), chosen] > 0.5
+        return {
+            c: slots[k]
+            for c, k, ok in zip(courses, chosen.tolist(), assigned.tolist())
+            if ok
+        }
+
+    def restrict(self, free, values):
+        """
+        Submodelo con solo las columnas libres, y el resto fijas en values. Los
+        coeficientes de las columnas fijas pasan al lado derecho, y las filas que
+        quedan sin columnas libres se descartan (values ya las cumple).
+
+        Args:
+            free (np.ndarray): Máscara de las columnas libres
+            values (np.ndarray): Valor de cada columna, del que se toman las fijas
+
+        Returns:
+            MatrixModel: Submodelo, con las columnas libres en el mismo orden
+        """
+        fixed_entries = ~free[self.a_col]
+        fixed_activity = np.bincount(
+            self.a_row[fixed_entries],
+            weights=self.a_val[fixed_entries] * values[self.a_col[fixed_entries]],
+            minlength=self.num_rows,
+        )
+
+        # Filas que conservan alguna columna libre, y nuevos índices de filas y
+        # columnas del submodelo
+        kept_rows = np.zeros(self.num_rows, dtype=bool)
+        kept_rows[self.a_row[~fixed_entries]] = True
+        row_position = np.cumsum(kept_rows) - 1
+        col_position = np.cumsum(free) - 1
+        free_cols = np.flatnonzero(free)
+
+        return MatrixModel(
+            name=self.name,
+            col_names=[self.col_names[c] for c in free_cols.tolist()],
+            col_lb=self.col_lb[free],
+            col_ub=self.col_ub[free],
+            col_integer=self.col_integer[free],
+            obj=self.obj[free],
+            row_names=[self.row_names[r] for r in np.flatnonzero(kept_rows).tolist()],
+            row_sense=self.row_sense[kept_rows],
+            row_rhs=(self.row_rhs - fixed_activity)[kept_rows],
+            a_row=row_position[self.a_row[~fixed_entries]],
+            a_col=col_position[self.a_col[~fixed_entries]],
+            a_val=self.a_val[~fixed_entries],
+        )
+
+    def set_weights(self, alpha, beta):
+        """
+        Cambia los pesos alpha y beta del objetivo. Las columnas y filas no
+        cambian, por lo que las próximas escrituras del MPS solo vuelven a
+        formatear los coeficientes del objetivo.
+        """
+        if self.weights_objective is None:
+            raise ValueError("El modelo no permite cambiar los pesos del objetivo")
+
+        self.obj = self.weights_objective(alpha, beta)
+
+    def write_mps(self, file_path):
+        """
+        Escribe el modelo en formato MPS libre, con los mismos nombres de variables
+        y restricciones que el modelo de PuLP.
+        """
+        cache = self._mps_sections()
+        col_names = self.col_names
+        col_position = cache["col_position"]
+
+        # El objetivo se escribe como una fila más en la sección COLUMNS, antes de
+        # los coeficientes de cada columna. Las columnas sin coeficientes se
+        # declaran con objetivo 0.
+        obj_cols = np.flatnonzero((self.obj != 0) | ~cache["in_matrix"])
+        obj_cols = obj_cols[np.argsort(col_position[obj_cols])]
+        obj_lines = [
+            "    %-8s  OBJ       % .12e\n" % (col_names[c], v)
+            for c, v in zip(obj_cols.tolist(), self.obj[obj_cols].tolist())
+        ]
+
+        # Intercalar las líneas del objetivo con las de la matriz, ya ordenadas
+        # por posición de la columna
+        matrix_lines = cache["matrix_lines"]
+        positions = np.concatenate([cache["matrix_positions"], col_position[obj_cols]])
+        is_matrix = np.concatenate(
+            [np.ones(len(matrix_lines), dtype=np.int8), np.zeros(len(obj_lines), dtype=np.int8)]
+        )
+        order = np.lexsort((is_matrix, positions))
+        lines = matrix_lines + obj_lines
+        lines = [lines[k] for k in order.tolist()]
+        bounds = np.searchsorted(positions[order], cache["run_bounds"]).tolist()
+
+        with open(file_path, "w") as f:
+            f.write(cache["header"])
+
+            f.write("COLUMNS\n")
+            for (lo, hi), integer in zip(zip(bounds[:-1], bounds[1:]), cache["run_integer"]):
+                if integer:
+                    f.write("    MARK      'MARKER'                 'INTORG'\n")
+                f.writelines(lines[lo:hi])
+                if integer:
+                    f.write("    MARK      'MARKER'                 'INTEND'\n")
+
+            f.write(cache["footer"])
+
+    def _mps_sections(self):
+        """
+        Formatea las partes del MPS que no dependen del objetivo: las filas, los
+        coeficientes de la matriz, el lado derecho y las cotas.
+        """
+        if self._mps_cache is not None:
+            return self._mps_cache
+
+        in_matrix = np.zeros(self.num_cols, dtype=bool)
+        in_matrix[self.a_col] = True
+
+        # Las columnas se escriben ordenadas por nombre, como lo hace PuLP, para
+        # que el solver reciba el modelo en el mismo orden con ambos builders.
+        col_names = self.col_names
+        col_order = np.array(
+            sorted(range(self.num_cols), key=col_names.__getitem__), dtype=np.int64
+        )
+        col_position = np.empty_like(col_order)
+        col_position[col_order] = np.arange(self.num_cols)
+
+        positions = col_position[self.a_col]
+        order = np.lexsort((self.a_row, positions))
+        positions, cols, rows, vals = (
+            positions[order],
+            self.a_col[order],
+            self.a_row[order],
+            self.a_val[order],
+        )
+
+        row_names = self.row_names
+        matrix_lines = [
+            "    %-8s  %-8s  % .12e\n" % (col_names[c], row_names[r], v)
+            for c, r, v in zip(cols.tolist(), rows.tolist(), vals.tolist())
+        ]
+
+        # Tramos consecutivos de columnas enteras o continuas
+        integer = self.col_integer[col_order]
+        breaks = np.flatnonzero(np.diff(integer.astype(np.int8))) + 1
+        run_bounds = np.concatenate([[0], breaks, [self.num_cols]])
+
+        header = ["*SENSE:Minimize\n", f"NAME          {self.name}\n", "ROWS\n", " N  OBJ\n"]
+        header += [
+            f" {sense}  {name}\n"
+            for sense, name in zip(self.row_sense.tolist(), self.row_names)
+        ]
+
+        footer = ["RHS\n"]
+        rhs_rows = np.flatnonzero(self.row_rhs != 0)
+        footer += [
+            "    RHS       %-8s  % .12e\n" % (self.row_names[r], v)
+            for r, v in zip(rhs_rows.tolist(), self.row_rhs[rhs_rows].tolist())
+        ]
+
+        footer.append("BOUNDS\n")
+        lb, ub = self.col_lb, self.col_ub
+        binary = self.col_integer & (lb == 0) & (ub == 1)
+        for c in col_order[binary[col_order]].tolist():
+            footer.append(" BV BND       %-8s\n" % col_names[c])
+        for c in col_order[~binary[col_order] & (lb[col_order] != 0)].tolist():
+            footer.append(" LO BND       %-8s  % .12e\n" % (col_names[c], lb[c]))
+        for c in col_order[~binary[col_order] & np.isfinite(ub[col_order])].tolist():
+            footer.append(" UP BND       %-8s  % .12e\n" % (col_names[c], ub[c]))
+        footer.append("ENDATA\n")
+
+        self._mps_cache = {
+            "in_matrix": in_matrix,
+            "col_position": col_position,
+            "matrix_lines": matrix_lines,
+            "matrix_positions": positions,
+            "run_bounds": run_bounds,
+            "run_integer": integer[run_bounds[:-1]].tolist(),
+            "header": "".join(header),
+            "footer": "".join(footer),
+        }
+        return self._mps_cache
+
+
+class _ModelBuilder:
+    """
+    Acumula bloques de columnas y filas del modelo a medida que se generan.
+    """
+
+    def __init__(self):
+        self.col_names = []
+        self.col_lb = []
+        self.col_ub = []
+        self.col_integer = []
+        self.row_names = []
+        self.row_sense = []
+        self.row_rhs = []
+        self.row_order = []
+        self.row_dropped = []
+        self.a_row = []
+        self.a_col = []
+        self.a_val = []
+        self.num_cols = 0
+        self.num_rows = 0
+
+    def add_columns(self, names, lb=0.0, ub=np.inf, integer=False):
+        """
+        Agrega un bloque de columnas y devuelve sus índices.
+        """
+        n = len(names)
+        self.col_names.extend(pl.LpElement.expression.sub("_", name) for name in names)
+        self.col_lb.append(np.full(n, lb, dtype=float))
+        self.col_ub.append(np.full(n, ub, dtype=float))
+        self.col_integer.append(np.full(n, integer, dtype=bool))
+
+        indices = np.arange(self.num_cols, self.num_cols + n)
+        self.num_cols += n
+        return indices
+
+    def add_binary_columns(self, names):
+        return self.add_columns(names, lb=0.0, ub=1.0, integer=True)
+
+    def add_rows(self, names, sense, rhs, rows, cols, vals, order=None):
+        """
+        Agrega un bloque de filas. rows son índices locales al bloque (0 a
+        len(names) - 1) y cada terna (rows, cols, vals) es un coeficiente.
+
+        order permite intercalar filas de distintos bloques: las filas del modelo
+        final se ordenan por esta clave, que por defecto es el orden de inserción.
+
+        Los coeficientes de columnas que no se crearon (índice -1, por el filtro
+        de dominios) se descartan, y las filas que se quedan sin ninguno no
+        llegan al modelo.
+        """
+        n = len(names)
+        if order is None:
+            order = np.arange(self.num_rows, self.num_rows + n)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        vals = np.broadcast_to(np.asarray(vals, dtype=float), (len(rows),))
+
+        exists = cols >= 0
+        dropped = np.zeros(n, dtype=bool)
+        if not exists.all():
+            dropped = (np.bincount(rows, minlength=n) > 0) & (
+                np.bincount(rows[exists], minlength=n) == 0
+            )
+            rows, cols, vals = rows[exists], cols[exists], vals[exists]
+
+        self.row_order.append(np.asarray(order, dtype=float))
+        self.row_dropped.append(dropped)
+        self.row_names.extend(pl.LpElement.expression.sub("_", name) for name in names)
+        self.row_sense.append(np.full(n, sense))
+        self.row_rhs.append(np.broadcast_to(np.asarray(rhs, dtype=float), (n,)))
+        self.a_row.append(rows + self.num_rows)
+        self.a_col.append(cols)
+        self.a_val.append(vals)
+        self.num_rows += n
+
+    def build(self, name, obj):
+        # Posición final de cada fila según su clave de orden, sin las filas que
+        # quedaron vacías
+        kept = np.flatnonzero(~np.concatenate(self.row_dropped))
+        order = np.concatenate(self.row_order)[kept]
+        permutation = kept[np.argsort(order, kind="stable")]
+        position = np.full(self.num_rows, -1, dtype=np.int64)
+        position[permutation] = np.arange(len(permutation))
+
+        a_row = position[np.concatenate(self.a_row)]
+        a_col = np.concatenate(self.a_col)
+        a_val = np.concatenate(self.a_val)
+
+        # Consolidar coeficientes repetidos de una misma variable en una fila y
+        # eliminar los nulos
+        keys, inverse = np.unique(a_row * self.num_cols + a_col, return_inverse=True)
+        a_val = np.bincount(inverse, weights=a_val, minlength=len(keys))
+        nonzero = a_val != 0
+        keys, a_val = keys[nonzero], a_val[nonzero]
+
+        return MatrixModel(
+            name=name,
+            col_names=self.col_names,
+            col_lb=np.concatenate(self.col_lb),
+            col_ub=np.concatenate(self.col_ub),
+            col_integer=np.concatenate(self.col_integer),
+            obj=obj,
+            row_names=[self.row_names[r] for r in permutation.tolist()],
+            row_sense=np.concatenate(self.row_sense)[permutation],
+            row_rhs=np.concatenate(self.row_rhs)[permutation],
+            a_row=keys // self.num_cols,
+            a_col=keys % self.num_cols,
+            a_val=a_val,
+        )
+
+
+def distance_segments(DS, dist_peso):
+    """
+    Tramos de la aproximación lineal por tramos del peso de la distancia.
+
+    Los puntos de quiebre son las distancias enteras (días completos) de DS y la
+    distancia máxima. Como el peso es convexo y decreciente, la interpolación
+    entre puntos consecutivos es el máximo de las rectas de cada tramo: coincide
+    con dist_peso en los puntos de quiebre y lo sobreestima levemente entre ellos.
+
+    Args:
+        DS (list): Distancias posibles entre evaluaciones
+        dist_peso (dict): Peso de cada distancia de DS
+
+    Returns:
+        tuple: Arreglos con el término independiente y la pendiente de la recta
+        de cada tramo
+    """
+    breakpoints = sorted({ds for ds in DS if float(ds).is_integer()} | {max(DS)})
+    b = np.array(breakpoints, dtype=float)
+    f = np.array([dist_peso[ds] for ds in breakpoints])
+
+    slope = np.diff(f) / np.diff(b)
+    intercept = f[:-1] - slope * b[:-1]
+    return intercept, slope
+
+
+def build_matrix_model(
+    datos,
+    alpha,
+    beta,
+    formulation=Formulation.FULL,
+    absolute_value=AbsoluteValue.BIG_M,
+):
+    """
+    Construye el modelo de calendario de evaluaciones en forma matricial.
+
+    Genera exactamente las mismas variables, restricciones y función objetivo que
+    el modelo de PuLP de solve.build_pulp_model, pero cada familia de
+    restricciones se arma con operaciones vectorizadas sobre índices enteros.
+
+    Args:
+        datos (dict): Conjuntos y parámetros devueltos por load_calendar_data
+        alpha (float): Peso de la distancia en semestres en el objetivo
+        beta (float): Peso de la distancia entre previas en el objetivo
+        formulation (Formulation): Formulación de la distancia entre pares de UCs
+        absolute_value (AbsoluteValue): Forma de modelar la distancia z de cada
+            par como valor absoluto de la diferencia de tiempos
+
+    Returns:
+        MatrixModel: Modelo listo para escribirse en MPS o resolverse
+    """
+    D = datos.get("D")
+    C = datos.get("C")
+    Td = datos.get("Td")
+    PA = datos.get("PA")
+    COP = datos.get("COP")
+    P = datos.get("P")
+    PARES_UC = datos.get("PARES_UC")
+    UC_MISMO_SEMESTRE = datos.get("UC_MISMO_SEMESTRE")
+    CLIQUES_COP = datos.get("CLIQUES_COP")
+    CLIQUES_MISMO_SEMESTRE = datos.get("CLIQUES_MISMO_SEMESTRE")
+    cp = datos.get("cp")
+    fac_cp = datos.get("fac_cp")
+    alta_co = datos.get("alta_co")
+    ins = datos.get("ins")
+    co = datos.get("co")
+    dist_sem = datos.get("dist_sem")
+    DS = datos.get("DS")
+    M = datos.get("M")
+    dist_peso = datos.get("dist_peso")
+    time_value = datos.get("time_value")
+    DOMINIO = datos.get("DOMINIO")
+    DS_PAR = datos.get("DS_PAR", {})
+
+    if formulation not in (Formulation.FULL, Formulation.PIECEWISE):
+        raise ValueError(f"Formulación {formulation} no soportada")
+
+    if absolute_value not in (AbsoluteValue.BIG_M, AbsoluteValue.SLOTS):
+        raise ValueError(f"Valor absoluto {absolute_value} no soportado")
+
+    uc_index = {c: i for i, c in enumerate(C)}
+    slots = [(d, t) for d in D for t in Td[d]]
+    slot_index = {s: k for k, s in enumerate(slots)}
+    tau = np.array([time_value[s] for s in slots])
+    ds = np.array(DS)
+
+    n_c, n_s, n_p, n_ds = len(C), len(slots), len(PARES_UC), len(DS)
+    pair_1 = np.array([uc_index[c1] for c1, _ in PARES_UC], dtype=np.int64)
+    pair_2 = np.array([uc_index[c2] for _, c2 in PARES_UC], dtype=np.int64)
+    pair_names = [f"{c1}_{c2}" for c1, c2 in PARES_UC]
+
+    # Los pares de previas se refieren al par de PARES_UC, en la orientación en
+    # que aparezca
+    pair_index = {p: k for k, p in enumerate(PARES_UC)}
+    prev_pairs = [
+        pair_index[(c1, c2)] if (c1, c2) in pair_index else pair_index[(c2, c1)]
+        for c1, c2 in P
+    ]
+
+    builder = _ModelBuilder()
+
+    # region DEFINICIÓN DE VARIABLES
+
+    # x[c, s]: la UC c se asigna al día y turno del slot s. Con el filtro de
+    # dominios, solo se crean las de los días y turnos posibles de cada UC, y
+    # las demás quedan con índice -1.
+    x_allowed = np.ones((n_c, n_s), dtype=bool)
+    if DOMINIO is not None:
+        for i, c in enumerate(C):
+            x_allowed[i] = False
+            x_allowed[i, [slot_index[s] for s in DOMINIO[c]]] = True
+    x = np.full((n_c, n_s), -1, dtype=np.int64)
+    x[x_allowed] = builder.add_binary_columns(
+        [
+            f"x_{c}_{d}_{t}"
+            for i, c in enumerate(C)
+            for k, (d, t) in enumerate(slots)
+            if x_allowed[i, k]
+        ]
+    )
+
+    if formulation == Formulation.FULL:
+        # w[p, k]: la distancia entre las evaluaciones del par p es DS[k]. Solo
+        # se crean las de las distancias que los dominios del par pueden producir.
+        ds_index = {v: k for k, v in enumerate(DS)}
+        w_allowed = np.ones((n_p, n_ds), dtype=bool)
+        for k, p in enumerate(PARES_UC):
+            if p in DS_PAR:
+                w_allowed[k] = False
+                w_allowed[k, [ds_index[v] for v in DS_PAR[p]]] = True
+        w = np.full((n_p, n_ds), -1, dtype=np.int64)
+        w[w_allowed] = builder.add_binary_columns(
+            [
+                f"w_{p}_{v}"
+                for k, p in enumerate(pair_names)
+                for j, v in enumerate(DS)
+                if w_allowed[k, j]
+            ]
+        )
+
+    z = builder.add_columns([f"z_{p}" for p in pair_names])
+    if absolute_value == AbsoluteValue.BIG_M:
+        z_plus = builder.add_columns([f"z_plus_{p}" for p in pair_names])
+        z_minus = builder.add_columns([f"z_minus_{p}" for p in pair_names])
+        y = builder.add_binary_columns([f"y_{p}" for p in pair_names])
+
+    # tiempo[c]: tiempo (día y turno, según time_value) asignado a la UC c
+    tiempo = builder.add_columns([f"tiempo_{c}" for c in C])
+
+    if absolute_value == AbsoluteValue.SLOTS:
+        # distancia[c, s]: distancia entre el tiempo de la UC c y el del slot s
+        distancia = builder.add_columns(
+            [f"distancia_{c}_{d}_{t}" for c in C for d, t in slots]
+        ).reshape(n_c, n_s)
+
+    if formulation == Formulation.PIECEWISE:
+        intercept, slope = distance_segments(DS, dist_peso)
+        n_seg = len(slope)
+
+        # peso[p]: peso de la distancia del par p, acotado por los tramos
+        peso_z = builder.add_columns([f"peso_{p}" for p in pair_names])
+
+        # previa[q] = min(1, z / 5) para cada par de previas, con lejana[q] = 1
+        # si la distancia es de al menos 5
+        prev_unique = list(dict.fromkeys(prev_pairs))
+        previa = builder.add_columns([f"previa_{pair_names[k]}" for k in prev_unique])
+        lejana = builder.add_binary_columns(
+            [f"previa_lejana_{pair_names[k]}" for k in prev_unique]
+        )
+
+    # UCs de cada columna, para fijar las de algunas UCs y resolver el resto
+    # (ver MatrixModel.restrict)
+    pair_courses = np.column_stack([pair_1, pair_2])
+    col_courses = np.full((builder.num_cols, 2), -1, dtype=np.int64)
+    col_courses[x[x_allowed], 0] = np.nonzero(x_allowed)[0]
+    col_courses[tiempo, 0] = np.arange(n_c)
+    col_courses[z] = pair_courses
+    if formulation == Formulation.FULL:
+        col_courses[w[w_allowed]] = pair_courses[np.nonzero(w_allowed)[0]]
+    if absolute_value == AbsoluteValue.BIG_M:
+        col_courses[z_plus] = col_courses[z_minus] = col_courses[y] = pair_courses
+    if absolute_value == AbsoluteValue.SLOTS:
+        col_courses[distancia.ravel(), 0] = np.repeat(np.arange(n_c), n_s)
+    if formulation == Formulation.PIECEWISE:
+        col_courses[peso_z] = pair_courses
+        col_courses[previa] = col_courses[lejana] = pair_courses[prev_unique]
+    # endregion
+
+    # region DEFINICIÓN DE LA FUNCIÓN OBJETIVO
+    max_co = max(co[c1, c2] for c1, c2 in co if c1 != c2) + 1
+    co_pair = np.array([co[p] for p in PARES_UC], dtype=float)
+    dist_sem_pair = np.array([dist_sem[p] for p in PARES_UC], dtype=float)
+    n_cols = builder.num_cols
+
+    if formulation == Formulation.FULL:
+        peso = np.array([dist_peso[v] for v in DS])
+    else:
+        prev_position = {k: q for q, k in enumerate(prev_unique)}
+
+    # alpha y beta solo aparecen en el objetivo: el modelo guarda esta función
+    # para cambiarlos sin volver a construir las restricciones
+    def objective(alpha, beta):
+        pair_coef = co_pair / max_co + alpha * (1 / (dist_sem_pair + 1))
+        obj = np.zeros(n_cols)
+
+        if formulation == Formulation.FULL:
+            obj[w[w_allowed]] = (peso[None, :] * pair_coef[:, None])[w_allowed]
+
+            prev_coef = beta * np.minimum(1, ds / 5)
+            for k in prev_pairs:
+                obj[w[k, w_allowed[k]]] += prev_coef[w_allowed[k]]
+        else:
+            obj[peso_z] = pair_coef
+
+            for k in prev_pairs:
+                obj[previa[prev_position[k]]] += beta
+
+        return obj
+
+    # endregion
+
+    # region DEFINICIÓN DE LAS RESTRICCIONES
+
+    # UCs de cada clique de conflictos, como índice de la clique y de la UC
+    def clique_members(cliques):
+        clique = np.array([k for k, group in enumerate(cliques) for _ in group])
+        members = np.array([uc_index[c] for group in cliques for c in group])
+        return clique.astype(np.int64), members.astype(np.int64)
+
+    # Los cursos que tengan profesores coincidentes no pueden ser asignados el mismo turno
+    if CLIQUES_COP is not None:
+        # Una fila por clique de profesores coincidentes y por día y turno
+        clique, members = clique_members(CLIQUES_COP)
+        n_cl = len(CLIQUES_COP)
+        builder.add_rows(
+            [
+                f"No_Solapamiento_COP_Clique_{k}_Dia_{d}_Turno_{t}"
+                for d, t in slots
+                for k in range(n_cl)
+            ],
+            "L",
+            1,
+            (np.arange(n_s)[:, None] * n_cl + clique[None, :]).ravel(),
+            x[members].T.ravel(),
+            1,
+        )
+    else:
+        cop_1 = np.array([uc_index[c1] for c1, _ in COP], dtype=np.int64)
+        cop_2 = np.array([uc_index[c2] for _, c2 in COP], dtype=np.int64)
+        n_cop = len(COP)
+        rows = np.arange(n_s * n_cop)
+        builder.add_rows(
+            [
+                f"No_Solapamiento_COP_{c1}_{c2}_Dia_{d}_Turno_{t}"
+                for d, t in slots
+                for c1, c2 in COP
+            ],
+            "L",
+            1,
+            np.concatenate([rows, rows]),
+            np.concatenate([x[cop_1].T.ravel(), x[cop_2].T.ravel()]),
+            1,
+        )
+
+    # La evaluación de una UC se asigna a único día y turno
+    builder.add_rows(
+        [f"AsignacionUnica_{c}" for c in C],
+        "E",
+        1,
+        np.repeat(np.arange(n_c), n_s),
+        x.ravel(),
+        1,
+    )
+
+    # En un turno no pueden haber mas de 6 evaluaciones
+    builder.add_rows(
+        [f"MaximaEvaluacionesTurno_{d}_{t}" for d, t in slots],
+        "L",
+        6,
+        np.tile(np.arange(n_s), n_c),
+        x.ravel(),
+        1,
+    )
+
+    # Si dos UC están sugeridas en el mismo semestre para la misma carrera, se asignan a días distintos
+    slot_day = np.array([d for d, _ in slots])
+    if CLIQUES_MISMO_SEMESTRE is not None:
+        # Una fila por clique de UCs del mismo semestre y por día
+        clique, members = clique_members(CLIQUES_MISMO_SEMESTRE)
+        n_cl = len(CLIQUES_MISMO_SEMESTRE)
+        for d in D:
+            day_slots = np.flatnonzero(slot_day == d)
+            builder.add_rows(
+                [f"Dias_Distintos_Clique_{k}_Dia_{d}" for k in range(n_cl)],
+                "L",
+                1,
+                np.repeat(clique, len(day_slots)),
+                x[members][:, day_slots].ravel(),
+                1,
+            )
+    else:
+        ms_1 = np.array([uc_index[c1] for c1, _ in UC_MISMO_SEMESTRE], dtype=np.int64)
+        ms_2 = np.array([uc_index[c2] for _, c2 in UC_MISMO_SEMESTRE], dtype=np.int64)
+        n_ms = len(UC_MISMO_SEMESTRE)
+        for d in D:
+            day_slots = np.flatnonzero(slot_day == d)
+            rows = np.repeat(np.arange(n_ms), len(day_slots))
+            builder.add_rows(
+                [f"Dias_Distintos_{c1}_{c2}_Dia_{d}" for c1, c2 in UC_MISMO_SEMESTRE],
+                "L",
+                1,
+                np.concatenate([rows, rows]),
+                np.concatenate(
+                    [x[ms_1][:, day_slots].ravel(), x[ms_2][:, day_slots].ravel()]
+                ),
+                1,
+            )
+
+    # No se puede superar la capacidad disponible de los salones, teniendo en cuenta el factor de capacidad, para cada día y turno
+    ins_c = np.array([ins[c] for c in C], dtype=float)
+    builder.add_rows(
+        [f"Capacidad_{d}_{t}" for d, t in slots],
+        "L",
+        np.array([cp[s] * fac_cp for s in slots]),
+        np.tile(np.arange(n_s), n_c),
+        x.ravel(),
+        np.repeat(ins_c, n_s),
+    )
+
+    # Las evaluaciones que se pre-asignan a un conjunto de días y turnos, se asignan en alguno de ellos, y solo en uno.
+    pa_rows = [k for k, c in enumerate(PA) for _ in PA[c]]
+    pa_cols = [x[uc_index[c], slot_index[s]] for c in PA for s in PA[c]]
+    builder.add_rows(
+        [f"PreAsignacion_{c}" for c in PA], "E", 1, pa_rows, pa_cols, 1
+    )
+
+    # El tiempo de cada UC es el valor del día y turno en que se asigna
+    builder.add_rows(
+        [f"Tiempo_Asignado_{c}" for c in C],
+        "E",
+        0,
+        np.concatenate([np.arange(n_c), np.repeat(np.arange(n_c), n_s)]),
+        np.concatenate([tiempo, x.ravel()]),
+        np.concatenate([np.ones(n_c), -np.tile(tau, n_c)]),
+    )
+
+    if absolute_value == AbsoluteValue.SLOTS:
+        # Distancia de cada UC a cada slot. Como x es una asignación única, la
+        # suma vale exactamente |tiempo[c] - tau[s]|.
+        slot_distance = np.abs(tau[:, None] - tau[None, :])
+        rows = np.arange(n_c * n_s)
+        builder.add_rows(
+            [f"Distancia_Turno_{c}_{d}_{t}" for c in C for d, t in slots],
+            "E",
+            0,
+            np.concatenate([rows, np.repeat(rows, n_s)]),
+            np.concatenate([distancia.ravel(), np.repeat(x, n_s, axis=0).ravel()]),
+            np.concatenate([np.ones(n_c * n_s), -np.tile(slot_distance.ravel(), n_c)]),
+        )
+
+    # Las restricciones de cada par quedan intercaladas par a par, en el mismo
+    # orden en que las agrega el modelo de PuLP. position indica el lugar de
+    # cada familia dentro del bloque de un par.
+    pair_families = []
+    if absolute_value == AbsoluteValue.BIG_M:
+        pair_families += [("diferencia", 1), ("absoluta", 1)]
+    else:
+        pair_families += [("distancia_minima", 2)]
+    if formulation == Formulation.FULL:
+        pair_families += [("w", 2)]
+    if absolute_value == AbsoluteValue.BIG_M:
+        pair_families += [("control", 2)]
+    else:
+        pair_families += [("distancia_maxima", n_s)]
+    pair_families += [("separacion", 1)]
+    if formulation == Formulation.PIECEWISE:
+        pair_families += [("tramos", n_seg), ("previa", 2)]
+
+    position = {}
+    stride = 0
+    for family, n_rows in pair_families:
+        position[family] = stride
+        stride += n_rows
+    base = builder.num_rows
+
+    def pair_order(offset, pairs=slice(None)):
+        return base + np.arange(n_p)[pairs] * stride + offset
+
+    rows = np.arange(n_p)
+    if absolute_value == AbsoluteValue.BIG_M:
+        # Diferencia entre los tiempos asignados a c1 y c2: z_plus - z_minus
+        builder.add_rows(
+            [f"Diferencia_Dias_{p}" for p in pair_names],
+            "E",
+            0,
+            np.concatenate([rows, rows, rows, rows]),
+            np.concatenate([tiempo[pair_1], tiempo[pair_2], z_plus, z_minus]),
+            np.concatenate(
+                [np.ones(n_p), -np.ones(n_p), -np.ones(n_p), np.ones(n_p)]
+            ),
+            order=pair_order(position["diferencia"]),
+        )
+
+        # z vale la diferencia absoluta
+        builder.add_rows(
+            [f"Distancia_Absoluta_{p}" for p in pair_names],
+            "E",
+            0,
+            np.concatenate([rows, rows, rows]),
+            np.concatenate([z, z_plus, z_minus]),
+            np.concatenate([np.ones(n_p), -np.ones(n_p), -np.ones(n_p)]),
+            order=pair_order(position["absoluta"]),
+        )
+    else:
+        # z es al menos la diferencia entre los tiempos, en ambos sentidos
+        for j, sign in enumerate([1, -1]):
+            builder.add_rows(
+                [f"Distancia_Minima_{p}_{j + 1}" for p in pair_names],
+                "G",
+                0,
+                np.concatenate([rows, rows, rows]),
+                np.concatenate([z, tiempo[pair_1], tiempo[pair_2]]),
+                np.concatenate(
+                    [np.ones(n_p), np.full(n_p, -sign), np.full(n_p, sign)]
+                ),
+                order=pair_order(position["distancia_minima"] + j),
+            )
+
+    if formulation == Formulation.FULL:
+        # Una única distancia por par, y z es la distancia seleccionada. PuLP
+        # nombra estas restricciones _C1, _C2, ... en el orden en que se agregan.
+        builder.add_rows(
+            [f"_C{2 * k + 1}" for k in range(n_p)],
+            "E",
+            1,
+            np.repeat(np.arange(n_p), n_ds),
+            w.ravel(),
+            1,
+            order=pair_order(position["w"]),
+        )
+        builder.add_rows(
+            [f"_C{2 * k + 2}" for k in range(n_p)],
+            "E",
+            0,
+            np.concatenate([rows, np.repeat(rows, n_ds)]),
+            np.concatenate([z, w.ravel()]),
+            np.concatenate([np.ones(n_p), -np.tile(ds, n_p)]),
+            order=pair_order(position["w"] + 1),
+        )
+
+    if absolute_value == AbsoluteValue.BIG_M:
+        # Usar y para controlar qué parte de z_plus o z_minus está activa
+        builder.add_rows(
+            [f"Control_z_plus_{p}" for p in pair_names],
+            "L",
+            0,
+            np.concatenate([rows, rows]),
+            np.concatenate([z_plus, y]),
+            np.concatenate([np.ones(n_p), np.full(n_p, -M)]),
+            order=pair_order(position["control"]),
+        )
+        builder.add_rows(
+            [f"Control_z_minus_{p}" for p in pair_names],
+            "L",
+            M,
+            np.concatenate([rows, rows]),
+            np.concatenate([z_minus, y]),
+            np.concatenate([np.ones(n_p), np.full(n_p, M)]),
+            order=pair_order(position["control"] + 1),
+        )
+    else:
+        # z no supera la distancia de c1 a cualquier slot más la de c2 a ese
+        # slot. En el slot asignado a c1 la primera es 0, por lo que z queda
+        # acotado por la diferencia absoluta, sin binarias ni big-M.
+        for k, (d, t) in enumerate(slots):
+            builder.add_rows(
+                [f"Distancia_Maxima_{p}_Dia_{d}_Turno_{t}" for p in pair_names],
+                "L",
+                0,
+                np.concatenate([rows, rows, rows]),
+                np.concatenate([z, distancia[pair_1, k], distancia[pair_2, k]]),
+                np.concatenate([np.ones(n_p), -np.ones(n_p), -np.ones(n_p)]),
+                order=pair_order(position["distancia_maxima"] + k),
+            )
+
+    # Si dos cursos tienen alta coincidencia, deben asignarse al menos con una separacion de 2 dias.
+    alta = np.flatnonzero(co_pair >= alta_co)
+    builder.add_rows(
+        [f"Separacion_Minima_{pair_names[k]}" for k in alta],
+        "G",
+        2,
+        np.arange(len(alta)),
+        z[alta],
+        1,
+        order=pair_order(position["separacion"], alta),
+    )
+
+    if formulation == Formulation.PIECEWISE:
+        # El peso del par está por encima de la recta de cada tramo, evaluada en z
+        for j in range(n_seg):
+            builder.add_rows(
+                [f"Peso_Distancia_{p}_Tramo_{j}" for p in pair_names],
+                "G",
+                intercept[j],
+                np.concatenate([rows, rows]),
+                np.concatenate([peso_z, z]),
+                np.concatenate([np.ones(n_p), np.full(n_p, -slope[j])]),
+                order=pair_order(position["tramos"] + j),
+            )
+
+        # previa >= min(1, z / 5): si lejana vale 1, previa >= 1, y si no,
+        # previa >= z / 5. Como z <= M, con lejana en 1 alcanza con restar M / 5 - 1.
+        prev_k = np.array(prev_unique, dtype=np.int64)
+        n_prev = len(prev_unique)
+        prev_rows = np.arange(n_prev)
+        builder.add_rows(
+            [f"Previa_Cercana_{pair_names[k]}" for k in prev_unique],
+            "G",
+            0,
+            np.concatenate([prev_rows, prev_rows, prev_rows]),
+            np.concatenate([previa, z[prev_k], lejana]),
+            np.concatenate(
+                [np.ones(n_prev), np.full(n_prev, -1 / 5), np.full(n_prev, max(M / 5 - 1, 0))]
+            ),
+            order=pair_order(position["previa"], prev_k),
+        )
+        builder.add_rows(
+            [f"Previa_Lejana_{pair_names[k]}" for k in prev_unique],
+            "G",
+            0,
+            np.concatenate([prev_rows, prev_rows]),
+            np.concatenate([previa, lejana]),
+            np.concatenate([np.ones(n_prev), -np.ones(n_prev)]),
+            order=pair_order(position["previa"] + 1, prev_k),
+        )
+    # endregion
+
+    model = builder.build("Optimizacion_Calendario", objective(alpha, beta))
+    model.weights_objective = objective
+    model.x_index = (list(C), slots, x)
+    model.col_courses = col_courses
+    return model
+
+
+def solve_matrix_model(
+    model, solver, start=None, pool_dir=None, pool_size=10, profile=None
+):
+    """
+    Resuelve un MatrixModel con uno de los solvers por línea de comandos de PuLP,
+    escribiendo el MPS directamente, sin construir un pl.LpProblem.
+
+    Args:
+        model (MatrixModel): Modelo a resolver
+        solver: Instancia de pl.PULP_CBC_CMD, pl.GUROBI_CMD o pl.CPLEX_CMD, de la
+            que se toman la ruta del ejecutable y las opciones
+        start (dict): Valores iniciales por nombre de variable. Se le pasan al
+            solver como solución inicial, igual que con warmStart en PuLP.
+        pool_dir (str): Directorio donde el solver deja, como archivos .sol, las
+            soluciones que encuentra: cada incumbente con Gurobi (SolFiles), y
+            el pool al terminar con CBC (maxSaved) y CPLEX
+        pool_size (int): Cantidad de soluciones del pool con CBC
+        profile (SolveProfile): Si se indica, se registran como etapas la
+            escritura del modelo, el solver y la lectura de la solución
+
+    Returns:
+        tuple: Estado de la solución (como en pl.LpStatus) y arreglo con el valor
+        de cada columna, o None si el solver no encontró una solución entera
+    """
+    if not solver.executable(solver.path):
+        raise pl.PulpSolverError(f"No se puede ejecutar {solver.path}")
+
+    def stage(name):
+        if profile is not None:
+            profile.start(name)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_mps = os.path.join(tmp_dir, "modelo.mps")
+        tmp_sol = os.path.join(tmp_dir, "modelo.sol")
+        tmp_mst = os.path.join(tmp_dir, "modelo.mst")
+        stage("escritura")
+        model.write_mps(tmp_mps)
+
+        # Solución inicial, con la interfaz de variables que esperan los
+        # writesol de PuLP
+        col_names = set(model.col_names)
+        start_vars = [
+            Variable(name, value)
+            for name, value in (start or {}).items()
+            if name in col_names
+        ]
+
+        pipe = None if solver.msg else subprocess.DEVNULL
+
+        if isinstance(solver, pl.COIN_CMD):
+            # Como en PuLP, logPath redirige la salida de CBC a ese archivo
+            log_path = solver.optionsDict.get("logPath")
+            args = [solver.path, tmp_mps]
+            if start_vars:
+                names = {v.name: v.name for v in start_vars}
+                solver.writesol(tmp_mst, None, start_vars, names, None)
+                args += ["-mips", tmp_mst]
+            if solver.timeLimit is not None:
+                args += ["-sec", str(solver.timeLimit)]
+            for option in solver.options + solver.getOptions():
+                args += ("-" + option).split()
+            if pool_dir is not None:
+                args += ["-maxSaved", str(pool_size)]
+            args += ["-branch", "-printingOptions", "all", "-solution", tmp_sol]
+            if pool_dir is not None:
+                # Cada nextBest escribe la siguiente mejor solución guardada
+                for k in range(1, pool_size):
+                    args += ["-nextBest", os.path.join(pool_dir, f"solution_{k}.sol")]
+
+            stage("solver")
+            if log_path:
+                with open(log_path, "w") as log:
+                    subprocess.run(args, stdout=log, stderr=log, check=True)
+            else:
+                subprocess.run(args, stdout=pipe, stderr=pipe, check=True)
+
+            stage("lectura")
+            status, _ = solver.get_status(tmp_sol)
+            values = _read_cbc_values(tmp_sol)
+
+        elif isinstance(solver, pl.GUROBI_CMD):
+            options = solver.options + solver.getOptions()
+            if solver.timeLimit is not None:
+                options.append(("TimeLimit", solver.timeLimit))
+            args = [solver.path]
+            args += [f"{key}={value}" for key, value in options]
+            if start_vars:
+                solver.writesol(filename=tmp_mst, vs=start_vars)
+                args.append(f"InputFile={tmp_mst}")
+            if pool_dir is not None:
+                args.append(f"SolFiles={os.path.join(pool_dir, 'solution')}")
+            args += [f"ResultFile={tmp_sol}", tmp_mps]
+
+            stage("solver")
+            subprocess.run(args, stdout=pipe, stderr=pipe, check=True)
+
+            stage("lectura")
+            if not os.path.exists(tmp_sol):
+                status, values = pl.LpStatusNotSolved, None
+            else:
+                status, values, _, _, _ = solver.readsol(tmp_sol)
+
+        elif isinstance(solver, pl.CPLEX_CMD):
+            commands = f"read {tmp_mps}\n"
+            if start_vars:
+                solver.writesol(filename=tmp_mst, vs=start_vars)
+                commands += f"read {tmp_mst}\nset advance 1\n"
+            if solver.timeLimit is not None:
+                commands += f"set timelimit {solver.timeLimit}\n"
+            for option in solver.options + solver.getOptions():
+                commands += option + "\n"
+            commands += "mipopt\n"
+            if pool_dir is not None:
+                commands += f"write {os.path.join(tmp_dir, 'pool.sol')} all\n"
+            commands += "change problem fixed\noptimize\n"
+            commands += f"write {tmp_sol}\nquit\n"
+
+            stage("solver")
+            subprocess.run(
+                [solver.path],
+                input=commands.encode("utf-8"),
+                stdout=pipe,
+                stderr=pipe,
+                check=True,
+            )
+
+            stage("lectura")
+            if not os.path.exists(tmp_sol):
+                status, values = pl.LpStatusInfeasible, None
+            else:
+                status, values, _, _, _, _ = solver.readsol(tmp_sol)
+
+            tmp_pool = os.path.join(tmp_dir, "pool.sol")
+            if pool_dir is not None and os.path.exists(tmp_pool):
+                _split_cplex_pool(tmp_pool, pool_dir)
+
+        else:
+            raise ValueError(f"Solver {solver.name} no soportado por el modelo matricial")
+
+    # Sin solución entera (Not Solved, Infeasible o detenido sin incumbente),
+    # los valores que deja el solver son los de la relajación lineal y no se
+    # devuelven. PuLP informa como Optimal también las soluciones enteras
+    # factibles encontradas antes del tiempo límite.
+    if status != pl.LpStatusOptimal or not values:
+        if profile is not None:
+            profile.stop()
+        return pl.LpStatus[status], None
+
+    col_index = {name: k for k, name in enumerate(model.col_names)}
+    solution = np.zeros(model.num_cols)
+    for name, value in values.items():
+        if name in col_index:
+            solution[col_index[name]] = value
+
+    if profile is not None:
+        profile.stop()
+
+    return pl.LpStatus[status], solution
+
+
+def _split_cplex_pool(file_path, pool_dir):
+    """
+    Separa el pool que escribe CPLEX (un XML con varias CPLEXSolution) en un
+    archivo .sol por solución, con sus variables x y su valor objetivo.
+    """
+    for k, solution in enumerate(ET.parse(file_path).getroot().iter("CPLEXSolution")):
+        objective = solution.find("header").get("objectiveValue")
+
+        with open(os.path.join(pool_dir, f"solution_{k}.sol"), "w") as f:
+            f.write(f"# Objective value = {objective}\n")
+            for variable in solution.iter("variable"):
+                name = variable.get("name")
+                if name.startswith("x_"):
+                    f.write(f"{name} {variable.get('value')}\n")
+
+
+def _read_cbc_values(file_path):
+    """
+    Lee los valores de un archivo de solución de CBC (índice, nombre, valor, costo
+    reducido por línea, luego de la línea de estado).
+    """
+    values = {}
+    with open(file_path) as f:
+        next(f)
+        for line in f:
+            parts = line.split()
+            if len(parts) < 3:
+                break
+            # En soluciones infactibles CBC marca las líneas con "**"
+            if parts[0] == "**":
+                parts = parts[1:]
+            values[parts[1]] = float(parts[2])
+    return values
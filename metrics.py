@@ -3,6 +3,8 @@ import csv
 import re
 from itertools import combinations
 
+import numpy as np
+
 ALPHA = 0.5
 
 
@@ -92,6 +94,47 @@ def load_calendar(filename):
     return uc_day
 
 
+def load_calendar_slots(filename):
+    """
+    Igual que load_calendar, pero conserva también el turno: devuelve el día y
+    turno (dia, turno) de cada UC, con el turno tomado del encabezado de la
+    columna ("Turno t").
+    """
+    uc_slot = {}
+
+    with open(filename, mode="r", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        turns = [int(column.strip().split(" ")[-1]) for column in header[1:]]
+
+        for row in reader:
+            if not row:
+                continue
+
+            day = int(row[0].strip().split(" ")[-1])
+
+            for turn, cell in zip(turns, row[1:]):
+                if cell.strip():
+                    for uc in cell.split(" & "):
+                        match = re.match(r"^(.+) \((.+)\)$", uc)
+                        if not match:
+                            raise ValueError(
+                                "Calendario invalido. No es posible generar métricas"
+                            )
+
+                        uc_slot[match.group(2)] = (day, turn)
+
+    return uc_slot
+
+
+def calendar_times(uc_slot, time_value):
+    """
+    Tiempo de cada UC según el time_value de load_calendar_data (el día más una
+    fracción por turno), para calcular las métricas con resolución de turno.
+    """
+    return {uc: time_value[slot] for uc, slot in uc_slot.items()}
+
+
 # endregion
 
 
@@ -100,8 +143,20 @@ def generate_metrics(
     coincidences_csv_name,
     previatures_csv_name,
     suggested_csv_name,
+    time_value=None,
 ):
-    uc_day = load_calendar(calendar_csv_name)
+    """
+    Calcula las métricas de un calendario. Por defecto las distancias son en días
+    completos. Con el time_value de load_calendar_data, se usa el día y turno de
+    cada UC, con las mismas distancias que optimiza el modelo, y se agregan los
+    estudiantes afectados por evaluaciones en el mismo turno
+    (m_estudiantes_turno) y en el mismo día (m_estudiantes_dia).
+    """
+    if time_value is None:
+        uc_day = load_calendar(calendar_csv_name)
+    else:
+        uc_day = calendar_times(load_calendar_slots(calendar_csv_name), time_value)
+
     coincidences = load_coincidences(coincidences_csv_name)
     previatures = load_previatures(previatures_csv_name)
     suggested_uc = load_suggested_courses(suggested_csv_name)
@@ -124,6 +179,11 @@ def generate_metrics(
         previatures=previatures,
     )
 
+    if time_value is not None:
+        same_turn, same_day = compute_conflicts(uc_day=uc_day, coincidences=coincidences)
+        metrics["m_estudiantes_turno"] = same_turn
+        metrics["m_estudiantes_dia"] = same_day
+
     return metrics
 
 
@@ -166,6 +226,27 @@ def compute_m_estudiantes(uc_day, coincidences):
     return total_conflicts_sum
 
 
+def compute_conflicts(uc_day, coincidences):
+    """
+    Estudiantes en común de los pares de UCs evaluadas en el mismo turno y en el
+    mismo día, con los tiempos de calendar_times.
+    """
+    PARES_CURSOS = list(combinations(uc_day.keys(), 2))
+
+    same_turn_sum = sum(
+        coincidences.get((c1, c2), 0.0)
+        for c1, c2 in PARES_CURSOS
+        if uc_day[c1] == uc_day[c2]
+    )
+    same_day_sum = sum(
+        coincidences.get((c1, c2), 0.0)
+        for c1, c2 in PARES_CURSOS
+        if math.floor(uc_day[c1]) == math.floor(uc_day[c2])
+    )
+
+    return same_turn_sum, same_day_sum
+
+
 def compute_m_curricula(uc_day, suggested_uc):
     distances = []
 
@@ -224,3 +305,315 @@ def compute_m_previas(uc_day, previatures):
     )
 
     return m_previas
+
+
+# region MOTOR VECTORIZADO
+
+
+class MetricsEngine:
+    """
+    Calcula las cuatro métricas de generate_metrics sobre arreglos de NumPy.
+
+    Las UCs se indexan una sola vez, y las coincidencias, las previas y los pares
+    de UCs sugeridas en el mismo semestre y carrera se guardan como listas de
+    pares de índices. Un calendario es un vector con el día de cada UC (nan si la
+    UC no está en el calendario), y una matriz con un calendario por fila se
+    evalúa en una sola pasada.
+
+    Las sumas se acumulan de forma secuencial, como sum(), recorriendo los pares
+    en el orden de courses. Si courses tiene el orden del calendario (como las
+    claves de load_calendar), los valores son exactamente los de las funciones
+    compute_m_*; con otro orden difieren solo en el redondeo. Donde esas
+    funciones dividen por cero, el resultado es nan.
+    """
+
+    def __init__(self, courses, coincidences, previatures, suggested_uc):
+        self.courses = list(dict.fromkeys(courses))
+        self.index = {c: i for i, c in enumerate(self.courses)}
+        n = len(self.courses)
+
+        # Pares con coincidencia no nula (los pares sin coincidencia no aportan a
+        # ninguna de las sumas), una vez por par
+        co = np.zeros((n, n))
+        for (c1, c2), value in coincidences.items():
+            if c1 in self.index and c2 in self.index:
+                co[self.index[c1], self.index[c2]] = value
+        co_1, co_2 = np.nonzero(np.triu(co, 1))
+        self.co_1, self.co_2 = co_1, co_2
+        self.co_weight = co[co_1, co_2]
+
+        # Pares de previas, con sus repeticiones, como compute_m_previas
+        previas = [
+            (self.index[c1], self.index[c2])
+            for c1, c2 in previatures
+            if c1 != c2 and c1 in self.index and c2 in self.index
+        ]
+        self.prev_1, self.prev_2 = self._pair_arrays(previas)
+
+        # Pares de UCs sugeridas en el mismo semestre y carrera, un par por cada
+        # grupo en el que coinciden, como compute_m_curricula
+        semester_groups = {}
+        for c, s, k in suggested_uc:
+            if c in self.index:
+                semester_groups.setdefault((s, k), []).append(self.index[c])
+        curricula = [
+            pair for group in semester_groups.values() for pair in combinations(group, 2)
+        ]
+        self.cur_1, self.cur_2 = self._pair_arrays(curricula)
+
+    @staticmethod
+    def _pair_arrays(pairs):
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1]
+
+    @classmethod
+    def from_files(
+        cls, courses, coincidences_csv_name, previatures_csv_name, suggested_csv_name
+    ):
+        return cls(
+            courses,
+            load_coincidences(coincidences_csv_name),
+            load_previatures(previatures_csv_name),
+            load_suggested_courses(suggested_csv_name),
+        )
+
+    def day_vector(self, uc_day):
+        """
+        Vector con el día de cada UC del motor a partir de un diccionario
+        {uc: dia}, con nan para las UCs que no están en el calendario.
+        """
+        days = np.full(len(self.courses), np.nan)
+        for c, day in uc_day.items():
+            days[self.index[c]] = day
+        return days
+
+    def evaluate(self, days, conflicts=False):
+        """
+        Métricas de un calendario, dado como vector de días o como diccionario
+        {uc: dia}.
+
+        Returns:
+            dict: m_curricula, m_coincidencia, m_estudiantes y m_previas
+        """
+        if isinstance(days, dict):
+            days = self.day_vector(days)
+
+        batch = self.evaluate_batch(np.asarray(days, dtype=float)[None, :], conflicts)
+        return {name: float(values[0]) for name, values in batch.items()}
+
+    def evaluate_batch(self, days, conflicts=False):
+        """
+        Métricas de varios calendarios a la vez.
+
+        Args:
+            days (np.ndarray): Matriz (calendarios x UCs) con el día de cada UC, o
+                con su tiempo según calendar_times
+            conflicts (bool): Agregar m_estudiantes_turno y m_estudiantes_dia,
+                como generate_metrics con time_value
+
+        Returns:
+            dict: Arreglo con el valor de cada métrica para cada calendario
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distance, present = self._distances(days, self.co_1, self.co_2)
+            weight = self.co_weight * present
+
+            total_coincidences_sum = _sequential_sum(weight)
+            z_bar = _sequential_sum(weight * distance) / total_coincidences_sum
+            sigma = np.sqrt(
+                _sequential_sum(weight * (distance - z_bar[:, None]) ** 2)
+                / total_coincidences_sum
+            )
+            m_coincidencia = z_bar * (1 - ALPHA * (sigma / z_bar))
+
+            m_estudiantes = _sequential_sum(weight * (distance <= 1))
+
+            z, sigma, count = self._distance_stats(days, self.cur_1, self.cur_2)
+            m_curricula = np.where(count == 0, 0.0, z * (1 - ALPHA * (sigma / z)))
+
+            z, sigma, count = self._distance_stats(days, self.prev_1, self.prev_2)
+            m_previas = np.where(
+                (count == 0) | (z == 0), 0.0, z * (1 + ALPHA * (sigma / z))
+            )
+
+        metrics = {
+            "m_curricula": m_curricula,
+            "m_coincidencia": m_coincidencia,
+            "m_estudiantes": m_estudiantes,
+            "m_previas": m_previas,
+        }
+
+        if conflicts:
+            same_day = np.floor(days[:, self.co_1]) == np.floor(days[:, self.co_2])
+            metrics["m_estudiantes_turno"] = _sequential_sum(weight * (distance == 0))
+            metrics["m_estudiantes_dia"] = _sequential_sum(weight * same_day)
+
+        return metrics
+
+    @staticmethod
+    def _distances(days, pair_1, pair_2):
+        """
+        Distancia en días de cada par en cada calendario (0 si falta alguna de
+        las UCs) y máscara de los pares con ambas UCs en el calendario.
+        """
+        distance = np.abs(days[:, pair_1] - days[:, pair_2])
+        present = ~np.isnan(distance)
+        return np.where(present, distance, 0.0), present
+
+    def _distance_stats(self, days, pair_1, pair_2):
+        """
+        Media y desvío poblacional de la distancia de los pares presentes en cada
+        calendario, y cantidad de pares presentes.
+        """
+        distance, present = self._distances(days, pair_1, pair_2)
+        count = present.sum(axis=1)
+        mean = _sequential_sum(distance) / count
+        variance = _sequential_sum(present * (distance - mean[:, None]) ** 2) / count
+        return mean, np.sqrt(variance), count
+
+
+def _sequential_sum(values):
+    """
+    Suma por filas acumulando de izquierda a derecha, como sum() de Python, en
+    lugar de la suma por bloques de np.sum, para que el redondeo sea el mismo.
+    """
+    if values.shape[1] == 0:
+        return np.zeros(values.shape[0])
+    return np.cumsum(values, axis=1)[:, -1]
+
+
+class IncrementalMetrics:
+    """
+    Métricas de un calendario que se actualizan al mover una UC de día, sin
+    recorrer todos los pares.
+
+    Para cada métrica se mantienen las sumas de las que dependen la media y el
+    desvío: el peso total, la suma de las distancias y la de sus cuadrados (el
+    numerador de sigma es sum(w * d^2) - sum(w * d)^2 / sum(w)). Mover una UC solo
+    cambia los términos de sus pares, por lo que cada movimiento cuesta
+    O(cantidad de pares de la UC).
+
+    Los valores coinciden con generate_metrics salvo por redondeo. Luego de
+    muchos movimientos, recompute() vuelve a calcular las sumas desde cero.
+    """
+
+    def __init__(self, engine, uc_day):
+        self.engine = engine
+        self.days = engine.day_vector(uc_day)
+        present = ~np.isnan(self.days)
+
+        def neighbors(pair_1, pair_2, weight=None):
+            # Vecinos de cada UC (con repeticiones) y su peso, solo entre UCs
+            # del calendario
+            if weight is None:
+                weight = np.ones(len(pair_1))
+            keep = present[pair_1] & present[pair_2]
+            source = np.concatenate([pair_1[keep], pair_2[keep]])
+            target = np.concatenate([pair_2[keep], pair_1[keep]])
+            w = np.concatenate([weight[keep], weight[keep]])
+            order = np.argsort(source, kind="stable")
+            bounds = np.searchsorted(source[order], np.arange(len(self.days) + 1))
+            return [
+                (target[order[lo:hi]], w[order[lo:hi]])
+                for lo, hi in zip(bounds[:-1], bounds[1:])
+            ]
+
+        self._co = neighbors(engine.co_1, engine.co_2, engine.co_weight)
+        self._cur = neighbors(engine.cur_1, engine.cur_2)
+        self._prev = neighbors(engine.prev_1, engine.prev_2)
+
+        self.recompute()
+
+    def recompute(self):
+        """
+        Calcula las sumas de todas las métricas recorriendo todos los pares.
+        """
+        sums = {}
+        for name, adjacency in (("co", self._co), ("cur", self._cur), ("prev", self._prev)):
+            total = np.zeros(4)
+            for i, (target, w) in enumerate(adjacency):
+                if not len(target):
+                    continue
+                total += self._pair_sums(self.days[i], self.days[target], w)
+            # Cada par aparece en las listas de sus dos UCs
+            sums[name] = total / 2
+        self.sums = sums
+
+    @staticmethod
+    def _pair_sums(day, other_days, w):
+        """
+        Peso total, suma de distancias, suma de sus cuadrados y peso de los
+        pares a distancia de a lo sumo 1 día, para los pares de una UC.
+        """
+        d = np.abs(day - other_days)
+        return np.array([w.sum(), (w * d).sum(), (w * d * d).sum(), w[d <= 1].sum()])
+
+    def _move_sums(self, i, day):
+        """
+        Sumas de cada métrica luego de mover la UC i al día day.
+        """
+        sums = {}
+        for name, adjacency in (("co", self._co), ("cur", self._cur), ("prev", self._prev)):
+            target, w = adjacency[i]
+            sums[name] = self.sums[name]
+            if len(target):
+                other_days = self.days[target]
+                sums[name] = (
+                    sums[name]
+                    + self._pair_sums(day, other_days, w)
+                    - self._pair_sums(self.days[i], other_days, w)
+                )
+        return sums
+
+    def move_delta(self, uc, day):
+        """
+        Métricas que tendría el calendario si la UC uc se moviera al día day,
+        sin aplicar el movimiento.
+        """
+        return self._metrics(self._move_sums(self.engine.index[uc], day))
+
+    def move(self, uc, day):
+        """
+        Mueve la UC uc al día day y devuelve las nuevas métricas.
+        """
+        i = self.engine.index[uc]
+        if np.isnan(self.days[i]):
+            raise ValueError(f"La UC {uc} no está en el calendario")
+
+        self.sums = self._move_sums(i, day)
+        self.days[i] = day
+        return self.metrics()
+
+    def metrics(self):
+        return self._metrics(self.sums)
+
+    @staticmethod
+    def _mean_sigma(sums):
+        total, distance_sum, square_sum, _ = sums
+        mean = distance_sum / total
+        variance = max(square_sum / total - mean**2, 0.0)
+        return mean, math.sqrt(variance)
+
+    def _metrics(self, sums):
+        metrics = {}
+
+        if sums["cur"][0] == 0:
+            metrics["m_curricula"] = 0.0
+        else:
+            z, sigma = self._mean_sigma(sums["cur"])
+            metrics["m_curricula"] = z * (1 - ALPHA * (sigma / z))
+
+        z, sigma = self._mean_sigma(sums["co"])
+        metrics["m_coincidencia"] = z * (1 - ALPHA * (sigma / z))
+        metrics["m_estudiantes"] = float(sums["co"][3])
+
+        if sums["prev"][0] == 0:
+            metrics["m_previas"] = 0.0
+        else:
+            z, sigma = self._mean_sigma(sums["prev"])
+            metrics["m_previas"] = z * (1 + ALPHA * (sigma / z)) if z > 0 else 0.0
+
+        return {name: float(value) for name, value in metrics.items()}
+
+
+# endregion
@@ -0,0 +1,257 @@
+import json
+import resource
+import sys
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from timeit import default_timer as timer
+
+# Familia de cada restricción según el prefijo de su nombre. Las de la
+# formulación completa que PuLP nombra _C1, _C2, ... son las de las variables w.
+ROW_FAMILIES = {
+    "No_Solapamiento_COP": "cop",
+    "AsignacionUnica": "asignacion",
+    "MaximaEvaluacionesTurno": "maximo_por_turno",
+    "Dias_Distintos": "mismo_semestre",
+    "Capacidad": "capacidad",
+    "PreAsignacion": "preasignacion",
+    "Tiempo_Asignado": "tiempo",
+    "Distancia_Turno": "distancia",
+    "Diferencia_Dias": "distancia",
+    "Distancia_Absoluta": "distancia",
+    "Distancia_Minima": "distancia",
+    "Distancia_Maxima": "distancia",
+    "Control_z": "distancia",
+    "_C": "distancia_w",
+    "Separacion_Minima": "separacion",
+    "Peso_Distancia": "peso_por_tramos",
+    "Previa": "previas",
+}
+
+# Familia de cada variable según el prefijo de su nombre
+COL_FAMILIES = {
+    "x_": "x",
+    "w_": "w",
+    "z_plus_": "z_plus",
+    "z_minus_": "z_minus",
+    "z_": "z",
+    "y_": "y",
+    "tiempo_": "tiempo",
+    "distancia_": "distancia",
+    "peso_": "peso",
+    "previa_lejana_": "previa_lejana",
+    "previa_": "previa",
+}
+
+
+def name_family(name, families):
+    """
+    Familia de una variable o restricción, por el prefijo más largo de families
+    con el que empieza su nombre.
+    """
+    for prefix in sorted(families, key=len, reverse=True):
+        if name.startswith(prefix):
+            return families[prefix]
+
+    return "otras"
+
+
+def model_statistics(row_names, col_names, nnz_rows):
+    """
+    Cantidad de variables, restricciones y coeficientes por familia.
+
+    Args:
+        row_names (list): Nombres de las restricciones
+        col_names (list): Nombres de las variables
+        nnz_rows (list): Coeficientes distintos de cero de cada restricción
+
+    Returns:
+        dict: {"variables": {familia: cantidad}, "restricciones": {familia:
+        {"filas": cantidad, "nnz": cantidad}}, y los totales}
+    """
+    row_families = [name_family(name, ROW_FAMILIES) for name in row_names]
+    rows = Counter(row_families)
+    nnz = Counter()
+    for family, count in zip(row_families, nnz_rows):
+        nnz[family] += int(count)
+
+    return {
+        "variables": dict(Counter(name_family(name, COL_FAMILIES) for name in col_names)),
+        "restricciones": {
+            family: {"filas": rows[family], "nnz": nnz[family]} for family in rows
+        },
+        "total_variables": len(col_names),
+        "total_restricciones": len(row_names),
+        "total_nnz": sum(nnz.values()),
+    }
+
+
+def max_rss(who=resource.RUSAGE_SELF):
+    """
+    Máximo de memoria residente del proceso (o de sus hijos, como el solver),
+    en bytes. macOS lo informa en bytes y Linux en kilobytes.
+    """
+    rss = resource.getrusage(who).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+@dataclass
+class Stage:
+    name: str
+    # Segundos de reloj
+    time: float
+    # Pico de memoria durante la etapa, en bytes, por encima de la que había al
+    # empezarla: la de Python con trace_memory, o el aumento del máximo de
+    # memoria residente del proceso si no
+    peak_memory: int
+
+
+@dataclass
+class SolveProfile:
+    """
+    Tiempo y memoria de cada etapa de una resolución, y el tamaño del modelo por
+    familia de variables y restricciones. Se completa pasándolo a solve_model o
+    solve_model_data, como el SolutionPool.
+
+    Por defecto, la memoria de cada etapa es cuánto aumenta el máximo de
+    memoria residente del proceso, que no cambia los tiempos pero solo registra
+    los nuevos máximos. Con trace_memory se mide con tracemalloc, más preciso,
+    pero que hace varias veces más lenta la construcción del modelo de PuLP. La
+    del solver, que corre en otro proceso, es el máximo de memoria residente de
+    los procesos hijos.
+
+    Ejemplo:
+        profile = SolveProfile()
+        solve_model(Case.large_2s2p, Solver.PULP_CBC_CMD, 0.5, 0.5, 10, profile=profile)
+        profile.print_report()
+        profile.write_json("perfil_2s2p.json")
+    """
+
+    stages: list = field(default_factory=list)
+    model: dict = field(default_factory=dict)
+    # Máximo de memoria residente del proceso y de los procesos hijos, en bytes,
+    # al terminar la última etapa
+    max_rss: int | None = None
+    solver_max_rss: int | None = None
+    trace_memory: bool = False
+    _current: tuple | None = field(default=None, init=False, repr=False)
+    _started_tracing: bool = field(default=False, init=False, repr=False)
+
+    def start(self, name):
+        """
+        Termina la etapa en curso, si hay una, y empieza otra.
+        """
+        self.stop()
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        else:
+            start_memory = max_rss()
+
+        self._current = (name, timer(), start_memory)
+
+    def stop(self):
+        """
+        Termina la etapa en curso, si hay una.
+        """
+        if self._current is None:
+            return
+
+        name, start_time, start_memory = self._current
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+        else:
+            peak = max_rss()
+        self.stages.append(Stage(name, timer() - start_time, max(0, peak - start_memory)))
+        self._current = None
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+        self.max_rss = max_rss()
+        self.solver_max_rss = max_rss(resource.RUSAGE_CHILDREN)
+
+    @contextmanager
+    def stage(self, name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def as_dict(self):
+        return {
+            "etapas": [
+                {"etapa": stage.name, "tiempo": stage.time, "memoria_pico": stage.peak_memory}
+                for stage in self.stages
+            ],
+            "tiempo_total": sum(stage.time for stage in self.stages),
+            "max_rss": self.max_rss,
+            "solver_max_rss": self.solver_max_rss,
+            "modelo": self.model,
+        }
+
+    def write_json(self, file_path):
+        with open(file_path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2, ensure_ascii=False)
+
+    def print_report(self):
+        total = sum(stage.time for stage in self.stages) or 1
+        for stage in self.stages:
+            print(
+                f"{stage.name:<14} {stage.time:9.2f} s ({100 * stage.time / total:5.1f}%)"
+                f" {stage.peak_memory / 2**20:9.1f} MB"
+            )
+
+        if self.model:
+            print(
+                f"Modelo: {self.model['total_variables']} variables,"
+                f" {self.model['total_restricciones']} restricciones,"
+                f" {self.model['total_nnz']} coeficientes"
+            )
+            for family, counts in sorted(self.model["restricciones"].items()):
+                print(f"  {family:<20} {counts['filas']:8} filas {counts['nnz']:9} nnz")
+
+
+def profile_stage(profile, name):
+    """
+    Contexto que mide una etapa si hay un SolveProfile, y no hace nada si no.
+    """
+    return profile.stage(name) if profile is not None else nullcontext()
+
+
+def profile_pulp_io(profile, problem, solver):
+    """
+    Separa la resolución de un pl.LpProblem en escritura del archivo del modelo,
+    solver y lectura de la solución, que PuLP hace juntas dentro de solve. Se
+    envuelven, solo en estas instancias, los métodos que usan los solvers por
+    línea de comandos para escribir el modelo y leer la solución.
+    """
+
+    def after(method, name):
+        def wrapper(*args, **kwargs):
+            result = method(*args, **kwargs)
+            profile.start(name)
+            return result
+
+        return wrapper
+
+    def before(method, name):
+        def wrapper(*args, **kwargs):
+            profile.start(name)
+            return method(*args, **kwargs)
+
+        return wrapper
+
+    for writer in ("writeMPS", "writeLP"):
+        setattr(problem, writer, after(getattr(problem, writer), "solver"))
+    # readsol_LP de CBC llama a readsol_MPS, así que no se envuelve
+    for reader in ("readsol", "readsol_MPS"):
+        if hasattr(solver, reader):
+            setattr(solver, reader, before(getattr(solver, reader), "lectura"))
@@ -0,0 +1,154 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from csv_data_to_model_data import load_calendar_data
+from metrics import (
+    MetricsEngine,
+    calendar_times,
+    load_calendar,
+    load_calendar_slots,
+    load_coincidences,
+    load_previatures,
+    load_suggested_courses,
+)
+from solution_files import is_sol_file, read_sol_assignment
+
+DATA_PATH = "data"
+
+# Sentido de cada métrica: m_estudiantes cuenta estudiantes afectados (menor es
+# mejor) y las demás son distancias promedio (mayor es mejor)
+HIGHER_IS_BETTER = {
+    "m_curricula": True,
+    "m_coincidencia": True,
+    "m_estudiantes": False,
+    "m_previas": True,
+    "m_estudiantes_turno": False,
+    "m_estudiantes_dia": False,
+}
+
+# A partir de esta cantidad de archivos, la lectura se reparte entre procesos
+PARALLEL_MIN_FILES = 200
+
+
+def read_schedule_days(file_path, time_value=None):
+    """
+    Día asignado a cada UC en un calendario CSV (como lo lee load_calendar) o en
+    un archivo .sol (completo o reducido) con las variables x. Con time_value,
+    el tiempo del día y turno de cada UC, como calendar_times.
+    """
+    if is_sol_file(file_path):
+        uc_slot = read_sol_assignment(file_path)
+    elif time_value is not None:
+        uc_slot = load_calendar_slots(file_path)
+    else:
+        return load_calendar(file_path)
+
+    if time_value is None:
+        return {uc: day for uc, (day, _) in uc_slot.items()}
+
+    return calendar_times(uc_slot, time_value)
+
+
+def score_schedules(
+    dir_name,
+    case,
+    sort_by="m_coincidencia",
+    previatures_csv_name=f"{DATA_PATH}/previas.csv",
+    workers=None,
+    shifts=False,
+):
+    """
+    Calcula las métricas de todos los calendarios (.csv) y soluciones (.sol) de
+    un directorio.
+
+    Los datos del caso se leen una sola vez, y los calendarios se evalúan juntos
+    como una matriz (calendarios x UCs) con el MetricsEngine. Con muchos archivos,
+    la lectura se reparte entre varios procesos.
+
+    Args:
+        dir_name (str): Directorio con los calendarios y soluciones
+        case (str): Directorio del caso, con coincidencia.csv y
+            trayectoria_sugerida.csv
+        sort_by (str): Métrica por la que se ordena la tabla, de mejor a peor
+        previatures_csv_name (str): Archivo de previas
+        workers (int): Procesos para leer los archivos (por defecto, todos los
+            núcleos si hay más de PARALLEL_MIN_FILES archivos)
+        shifts (bool): Calcular las métricas con resolución de turno, con el
+            time_value del caso, y agregar los estudiantes afectados en el mismo
+            turno y en el mismo día
+
+    Returns:
+        pd.DataFrame: Una fila por archivo con sus cuatro métricas, ordenada
+    """
+    if sort_by not in HIGHER_IS_BETTER:
+        raise ValueError(f"Métrica {sort_by} no soportada")
+
+    files = sorted(
+        os.path.join(dir_name, file)
+        for file in os.listdir(dir_name)
+        if is_sol_file(file) or file.endswith(".csv")
+    )
+
+    time_value = load_calendar_data(case)["time_value"] if shifts else None
+    read_schedule = partial(read_schedule_days, time_value=time_value)
+
+    if workers is None:
+        workers = os.cpu_count() if len(files) >= PARALLEL_MIN_FILES else 1
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            schedules = list(
+                executor.map(
+                    read_schedule, files, chunksize=max(1, len(files) // workers)
+                )
+            )
+    else:
+        schedules = [read_schedule(file) for file in files]
+
+    # Los archivos vacíos o sin variables x no se evalúan
+    scored = [(f, s) for f, s in zip(files, schedules) if s]
+
+    engine = MetricsEngine(
+        [c for _, uc_day in scored for c in uc_day],
+        load_coincidences(f"{case}/coincidencia.csv"),
+        load_previatures(previatures_csv_name),
+        load_suggested_courses(f"{case}/trayectoria_sugerida.csv"),
+    )
+
+    days = np.full((len(scored), len(engine.courses)), np.nan)
+    for k, (_, uc_day) in enumerate(scored):
+        days[k] = engine.day_vector(uc_day)
+
+    results = pd.DataFrame(
+        {
+            "archivo": [os.path.basename(f) for f, _ in scored],
+            "ucs": [len(uc_day) for _, uc_day in scored],
+            **engine.evaluate_batch(days, conflicts=shifts),
+        }
+    )
+
+    return results.sort_values(
+        sort_by, ascending=not HIGHER_IS_BETTER[sort_by], ignore_index=True
+    )
+
+
+if __name__ == "__main__":
+    # Uso: python score_schedules.py <directorio> <caso> [métrica] [salida.csv] [--turnos]
+    shifts = "--turnos" in sys.argv
+    args = [arg for arg in sys.argv if arg != "--turnos"]
+
+    dir_name = args[1] if len(args) > 1 else "solutions/1s1p-v2"
+    case = args[2] if len(args) > 2 else "casos/caso_1s1p"
+    sort_by = args[3] if len(args) > 3 else "m_coincidencia"
+
+    results = score_schedules(dir_name, case, sort_by, shifts=shifts)
+
+    if len(args) > 4:
+        results.to_csv(args[4], index=False)
+
+    print(results.to_string())
@@ -0,0 +1,211 @@
+import gzip
+import os
+
+import numpy as np
+
+# Extensión de las soluciones reducidas: solo las x en 1, comprimidas
+SLIM_SUFFIX = ".sol.gz"
+
+# Tipo del arreglo con la asignación de una solución: una fila por UC
+ASSIGNMENT_DTYPE = np.dtype([("uc", "U32"), ("dia", "i2"), ("turno", "i2")])
+
+
+def is_sol_file(file_name):
+    return file_name.endswith((".sol", SLIM_SUFFIX))
+
+
+def open_sol(file_path, mode="r"):
+    """
+    Abre un archivo de solución como texto, comprimido o no según su extensión.
+    """
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, mode + "t")
+
+    return open(file_path, mode)
+
+
+# region LECTURA
+
+
+def iter_sol_values(file_path):
+    """
+    Recorre las variables de un archivo de solución línea a línea, sin cargarlo
+    entero. Acepta el formato de Gurobi (nombre valor, con comentarios que
+    empiezan con #) y el de CBC (índice, nombre, valor y costo reducido, luego
+    de la línea de estado).
+
+    Yields:
+        tuple: Nombre y valor de cada variable
+    """
+    with open_sol(file_path) as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            if parts[0] == "**":
+                parts = parts[1:]
+            if len(parts) >= 3 and parts[0].isdigit():
+                parts = parts[1:]
+            if len(parts) < 2:
+                continue
+
+            try:
+                value = float(parts[1])
+            except ValueError:
+                continue
+
+            yield parts[0], value
+
+
+def iter_sol_assignment(file_path):
+    """
+    Recorre las variables x en 1 de un archivo de solución.
+
+    Yields:
+        tuple: UC, día y turno de cada x en 1
+    """
+    for name, value in iter_sol_values(file_path):
+        # Las variables tienen la forma x_<uc>_<dia>_<turno>
+        if name.startswith("x_") and value > 0.5:
+            uc, day, turn = name[2:].rsplit("_", 2)
+            yield uc, int(day), int(turn)
+
+
+def read_sol_assignment(file_path):
+    """
+    Returns:
+        dict: Día y turno asignado a cada UC en un archivo de solución
+    """
+    return {uc: (day, turn) for uc, day, turn in iter_sol_assignment(file_path)}
+
+
+def read_sol_array(file_path):
+    """
+    Returns:
+        np.ndarray: Asignación de un archivo de solución, con una fila
+            (uc, dia, turno) por UC, de tipo ASSIGNMENT_DTYPE
+    """
+    return np.fromiter(iter_sol_assignment(file_path), dtype=ASSIGNMENT_DTYPE)
+
+
+def read_sol_objective(file_path):
+    """
+    Valor objetivo registrado en el encabezado de un archivo de solución, de
+    Gurobi ("# Objective value = v") o de CBC ("... objective value v"). Solo se
+    leen las líneas anteriores a la primera variable.
+
+    Returns:
+        float: Valor objetivo, o None si el archivo no lo registra
+    """
+    with open_sol(file_path) as f:
+        for line in f:
+            text = line.strip()
+            if not text:
+                continue
+
+            if "objective value" in text.lower():
+                try:
+                    return float(text.split()[-1])
+                except ValueError:
+                    return None
+
+            if not text.startswith("#"):
+                return None
+
+    return None
+
+
+# endregion
+
+# region ESCRITURA
+
+
+def write_slim_sol(file_path, assignment, objective=None):
+    """
+    Escribe una solución reducida, en el formato de Gurobi: solo las x en 1 y el
+    valor objetivo como comentario. Con extensión .gz, el archivo se comprime.
+
+    Args:
+        file_path (str): Archivo de salida
+        assignment (dict | np.ndarray): {uc: (dia, turno)} o arreglo de
+            read_sol_array
+        objective (float): Valor objetivo de la solución
+    """
+    if isinstance(assignment, dict):
+        rows = ((uc, day, turn) for uc, (day, turn) in assignment.items())
+    else:
+        rows = ((str(r["uc"]), int(r["dia"]), int(r["turno"])) for r in assignment)
+
+    with open_sol(file_path, "w") as f:
+        if objective is not None:
+            f.write(f"# Objective value = {objective!r}\n")
+        for uc, day, turn in rows:
+            f.write(f"x_{uc}_{day}_{turn} 1\n")
+
+
+def slim_solution(file_path, output_path=None):
+    """
+    Reduce un archivo de solución a sus x en 1. Por defecto, se escribe junto al
+    original con extensión SLIM_SUFFIX, comprimido; si output_path es el mismo
+    archivo, se reemplaza en el lugar.
+
+    Returns:
+        str: Archivo escrito
+    """
+    if output_path is None:
+        output_path = file_path.removesuffix(".sol") + SLIM_SUFFIX
+
+    # La solución se lee entera antes de abrir el archivo de salida
+    assignment = read_sol_array(file_path)
+    objective = read_sol_objective(file_path)
+    write_slim_sol(output_path, assignment, objective)
+
+    return output_path
+
+
+def slim_solutions(dir_name, output_dir=None, compress=False, remove=False):
+    """
+    Reduce todos los archivos .sol de un directorio, de a uno y línea a línea,
+    así que la memoria no depende de la cantidad ni del tamaño de los archivos.
+
+    Args:
+        dir_name (str): Directorio con las soluciones
+        output_dir (str): Directorio de salida (por defecto, el mismo)
+        compress (bool): Escribir cada solución comprimida, con extensión
+            SLIM_SUFFIX. Si no, se escribe como .sol, y sin directorio de salida
+            reemplaza al original.
+        remove (bool): Borrar cada original luego de escribir su versión
+            reducida en otro archivo
+
+    Returns:
+        tuple: Cantidad de archivos, y bytes antes y después de reducirlos
+    """
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    suffix = SLIM_SUFFIX if compress else ".sol"
+    count, size_before, size_after = 0, 0, 0
+
+    with os.scandir(dir_name) as entries:
+        for entry in entries:
+            if not entry.is_file() or not entry.name.endswith(".sol"):
+                continue
+
+            output_path = os.path.join(
+                output_dir if output_dir is not None else dir_name,
+                entry.name.removesuffix(".sol") + suffix,
+            )
+
+            count += 1
+            size_before += os.path.getsize(entry.path)
+
+            slim_solution(entry.path, output_path)
+            size_after += os.path.getsize(output_path)
+
+            if remove and not os.path.samefile(entry.path, output_path):
+                os.remove(entry.path)
+
+    return count, size_before, size_after
+
+
+# endregion
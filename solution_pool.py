@@ -0,0 +1,223 @@
+import csv
+import hashlib
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from metrics import MetricsEngine
+from score_schedules import HIGHER_IS_BETTER
+from solution_files import (
+    ASSIGNMENT_DTYPE,
+    SLIM_SUFFIX,
+    is_sol_file,
+    read_sol_array,
+    read_sol_objective,
+    write_slim_sol,
+)
+
+DATA_PATH = "data"
+
+# Índice de un pool guardado con SolutionPool.save
+POOL_INDEX = "pool.csv"
+
+
+def assignment_array(assignment):
+    """
+    Asignación compacta: arreglo de tipo ASSIGNMENT_DTYPE ordenado por UC, así
+    que dos calendarios iguales dan el mismo arreglo.
+
+    Args:
+        assignment (dict | np.ndarray): {uc: (dia, turno)} o arreglo de
+            read_sol_array
+    """
+    if isinstance(assignment, dict):
+        assignment = np.array(
+            [(uc, day, turn) for uc, (day, turn) in assignment.items()],
+            dtype=ASSIGNMENT_DTYPE,
+        )
+
+    return np.sort(assignment, order="uc")
+
+
+@dataclass
+class PoolEntry:
+    # Asignación compacta, de assignment_array
+    assignment: np.ndarray
+    objective: float | None
+    # Segundos desde el comienzo de la resolución hasta encontrar la solución
+    time: float | None
+    key: str = field(init=False)
+
+    def __post_init__(self):
+        self.key = hashlib.blake2b(self.assignment.tobytes(), digest_size=8).hexdigest()
+
+    def as_dict(self):
+        """
+        Returns:
+            dict: {uc: (dia, turno)}, como la asignación de solve_model
+        """
+        return {
+            str(r["uc"]): (int(r["dia"]), int(r["turno"])) for r in self.assignment
+        }
+
+
+class SolutionPool:
+    """
+    Soluciones encontradas por el solver en una o más resoluciones, sin
+    calendarios repetidos. Cada solución se guarda como su asignación compacta,
+    con su valor objetivo y el momento en que se encontró.
+
+    Ejemplo:
+        pool = SolutionPool()
+        solve_model(Case.large_1s1p, Solver.GUROBI_CMD, 0.5, 0.5, 60, pool=pool)
+        best = pool.best(Case.large_1s1p, "m_estudiantes")
+        write_schedule_csv(best.as_dict(), "schedule.csv")
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._keys = set()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def add(self, assignment, objective=None, time=None):
+        """
+        Agrega una solución al pool, salvo que ya tenga el mismo calendario.
+
+        Args:
+            assignment (dict | np.ndarray): {uc: (dia, turno)} o arreglo de
+                read_sol_array
+            objective (float): Valor objetivo de la solución
+            time (float): Segundos hasta encontrar la solución
+
+        Returns:
+            bool: Si la solución era nueva
+        """
+        entry = PoolEntry(assignment_array(assignment), objective, time)
+        if not len(entry.assignment) or entry.key in self._keys:
+            return False
+
+        self._keys.add(entry.key)
+        self.entries.append(entry)
+        return True
+
+    def add_sol_files(self, dir_name, start_timestamp=None):
+        """
+        Agrega las soluciones de los archivos .sol de un directorio, como los
+        que escribe el solver para cada incumbente. Con start_timestamp, el
+        tiempo de cada solución se toma de la fecha de modificación del archivo.
+
+        Returns:
+            int: Cantidad de soluciones nuevas
+        """
+        added = 0
+
+        files = sorted(
+            (entry for entry in os.scandir(dir_name) if is_sol_file(entry.name)),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in files:
+            time = None
+            if start_timestamp is not None:
+                time = max(0.0, entry.stat().st_mtime - start_timestamp)
+
+            added += self.add(
+                read_sol_array(entry.path), read_sol_objective(entry.path), time
+            )
+
+        return added
+
+    # region PERSISTENCIA
+
+    def save(self, dir_name):
+        """
+        Guarda cada solución como un .sol reducido (ver solution_files) y un
+        índice POOL_INDEX con su valor objetivo y su tiempo.
+        """
+        os.makedirs(dir_name, exist_ok=True)
+
+        with open(os.path.join(dir_name, POOL_INDEX), "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["archivo", "clave", "objetivo", "tiempo"])
+
+            for entry in self.entries:
+                file_name = f"solution_{entry.key}{SLIM_SUFFIX}"
+                write_slim_sol(
+                    os.path.join(dir_name, file_name), entry.assignment, entry.objective
+                )
+                writer.writerow([file_name, entry.key, entry.objective, entry.time])
+
+    @classmethod
+    def load(cls, dir_name):
+        """
+        Lee un pool guardado con save.
+        """
+        pool = cls()
+
+        with open(os.path.join(dir_name, POOL_INDEX), "r", newline="") as f:
+            for row in csv.DictReader(f):
+                pool.add(
+                    read_sol_array(os.path.join(dir_name, row["archivo"])),
+                    float(row["objetivo"]) if row["objetivo"] else None,
+                    float(row["tiempo"]) if row["tiempo"] else None,
+                )
+
+        return pool
+
+    # endregion
+
+    def metrics(self, case, previatures_csv_name=f"{DATA_PATH}/previas.csv"):
+        """
+        Calcula las métricas de todas las soluciones del pool a la vez, con el
+        MetricsEngine.
+
+        Args:
+            case (str): Directorio del caso, con coincidencia.csv y
+                trayectoria_sugerida.csv
+
+        Returns:
+            pd.DataFrame: Una fila por solución, en el orden del pool, con su
+            clave, valor objetivo, tiempo y métricas
+        """
+        engine = MetricsEngine.from_files(
+            sorted({str(uc) for entry in self.entries for uc in entry.assignment["uc"]}),
+            f"{case}/coincidencia.csv",
+            previatures_csv_name,
+            f"{case}/trayectoria_sugerida.csv",
+        )
+
+        days = np.full((len(self.entries), len(engine.courses)), np.nan)
+        for k, entry in enumerate(self.entries):
+            days[k] = engine.day_vector(
+                dict(zip(entry.assignment["uc"].tolist(), entry.assignment["dia"].tolist()))
+            )
+
+        return pd.DataFrame(
+            {
+                "clave": [entry.key for entry in self.entries],
+                "objetivo": [entry.objective for entry in self.entries],
+                "tiempo": [entry.time for entry in self.entries],
+                **engine.evaluate_batch(days),
+            }
+        )
+
+    def best(self, case, metric="m_estudiantes", **kwargs):
+        """
+        Returns:
+            PoolEntry: Mejor solución del pool según una de las métricas de
+            score_schedules, sin volver a resolver el modelo
+        """
+        results = self.metrics(case, **kwargs)
+        if metric not in results or metric not in HIGHER_IS_BETTER:
+            raise ValueError(f"Métrica {metric} no soportada")
+
+        values = results[metric].to_numpy()
+        k = np.argmax(values) if HIGHER_IS_BETTER[metric] else np.argmin(values)
+
+        return self.entries[k]
@@ -1,33 +1,19 @@
-from generate_schedule import generate_schedule_csv
+from generate_schedule import write_schedule_csv
 from metrics import generate_metrics
 import os
-
-
-class Variable:
-    def __init__(self, name, value):
-        self.name = name
-        self._value = float(value)
-
-    def value(self):
-        return self._value
+from solution_files import read_sol_assignment
 
 
 # files = os.listdir("solutions")
-# files = [file for file in files if os.path.isfile(f"solutions/{file}")]
+# files = [file for file in files if is_sol_file(file)]
 
 # best = float("inf")
 # best_file = None
 
 # for file in files:
-#     with open(f"solutions/{file}", "r") as f:
-#         lines = f.readlines()
-#     lines = [line.strip() for line in lines if line.startswith("x")]
-
-#     variables = [
-#         Variable(name, value) for name, value in [line.split(" ") for line in lines]
-#     ]
-
-#     generate_schedule_csv(variables, f"schedule_test.csv")
+#     write_schedule_csv(
+#         read_sol_assignment(f"solutions/{file}"), f"schedule_test.csv"
+#     )
 #     metrics = generate_metrics(
 #         "schedule_test.csv",
 #         "casos/caso_1s1p/coincidencia.csv",
@@ -42,12 +28,6 @@ class Variable:
 # print(best_file)
 # print(best)
 
-with open(f"solutions/test/solution_93.sol", "r") as f:
-    lines = f.readlines()
-lines = [line.strip() for line in lines if line.startswith("x")]
-
-variables = [
-    Variable(name, value) for name, value in [line.split(" ") for line in lines]
-]
-
-generate_schedule_csv(variables, f"schedule_test.csv")
+write_schedule_csv(
+    read_sol_assignment(f"solutions/test/solution_93.sol"), f"schedule_test.csv"
+)
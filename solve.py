@@ -1,19 +1,273 @@
 from timeit import default_timer as timer
 
 import os
+import tempfile
+import time
 import pulp as pl
 import pandas as pd
+import numpy as np
 
-from csv_data_to_model_data import load_calendar_data
-from constants import Solver, MINUTES
+from csv_data_to_model_data import load_calendar_data, PairPruning
+from constants import Solver, Builder, Formulation, AbsoluteValue, MINUTES
+from matrix_model import build_matrix_model, solve_matrix_model, distance_segments
+from profiling import SolveProfile, model_statistics, profile_pulp_io, profile_stage
+from solution_pool import SolutionPool
+from warm_start import load_assignment, start_values
 
 
 def solve_model(
-    dir_name: str, solver_name: Solver, alpha: float, beta: float, time_limit_minutes=15
-) -> tuple[float, float, str, dict]:
-    # region CARGA DE DATOS
-    datos = load_calendar_data(dir_name)
+    dir_name: str,
+    solver_name: Solver,
+    alpha: float,
+    beta: float,
+    time_limit_minutes=15,
+    builder: Builder = Builder.MATRIX,
+    pair_pruning: PairPruning | None = None,
+    formulation: Formulation = Formulation.FULL,
+    absolute_value: AbsoluteValue = AbsoluteValue.BIG_M,
+    warm_start: str | dict | None = None,
+    pool: SolutionPool | None = None,
+    symmetry: bool = False,
+    profile: SolveProfile | None = None,
+    domains: bool = False,
+    cliques: bool = False,
+) -> tuple[float, float, str, list, dict]:
+    """
+    Carga el caso de dir_name y lo resuelve con solve_model_data.
+
+    Returns:
+        tuple: Valor objetivo, tiempo, estado, variables y asignación
+        {uc: (dia, turno)} de cada UC. El estado es uno de pl.LpStatus; las
+        alternativas heurísticas (heuristic.solve_heuristic y
+        fix_and_optimize) devuelven constants.FEASIBLE cuando encuentran un
+        calendario.
+    """
+    with profile_stage(profile, "carga"):
+        datos = load_calendar_data(
+            dir_name,
+            pair_pruning=pair_pruning,
+            domains=domains,
+            cliques=cliques,
+            symmetry=symmetry,
+        )
+    if pair_pruning is not None:
+        print_pruning_report(datos["PODA_PARES"], alpha)
+    if symmetry:
+        print_symmetry_report(datos["SIMETRIA"])
+    if domains:
+        print_domain_report(datos["FILTRO_DOMINIOS"])
+
+    return solve_model_data(
+        datos,
+        solver_name,
+        alpha,
+        beta,
+        time_limit_minutes,
+        builder,
+        formulation,
+        absolute_value,
+        warm_start,
+        pool=pool,
+        profile=profile,
+    )
+
+
+def solve_model_data(
+    datos: dict,
+    solver_name: Solver,
+    alpha: float,
+    beta: float,
+    time_limit_minutes=15,
+    builder: Builder = Builder.MATRIX,
+    formulation: Formulation = Formulation.FULL,
+    absolute_value: AbsoluteValue = AbsoluteValue.BIG_M,
+    warm_start: str | dict | None = None,
+    threads: int | None = None,
+    pool: SolutionPool | None = None,
+    profile: SolveProfile | None = None,
+) -> tuple[float, float, str, list, dict]:
+    """
+    Igual que solve_model, pero con los datos ya cargados por load_calendar_data,
+    para resolver varias veces el mismo caso sin volver a leerlo. threads limita
+    los núcleos que usa el solver (por defecto, todos).
+
+    Con pool, se le agregan las soluciones distintas que encontró el solver, con
+    su valor objetivo. Con Gurobi se guarda cada incumbente con el tiempo en que
+    se encontró; CBC y CPLEX entregan su pool al terminar, sin tiempos. Con el
+    builder de PuLP solo se agrega la solución final.
+
+    Con profile, se registra el tiempo y la memoria de cada etapa (construcción,
+    escritura del modelo, solver, lectura de la solución) y el tamaño del modelo
+    por familia de variables y restricciones.
+
+    Returns:
+        tuple: Valor objetivo, tiempo, estado, variables y asignación
+        {uc: (dia, turno)} de cada UC
+    """
+    # Solución inicial a partir de un calendario CSV, un archivo .sol o un
+    # diccionario {uc: (dia, turno)}
+    start = None
+    if warm_start is not None:
+        with profile_stage(profile, "solucion_inicial"):
+            assignment = load_assignment(warm_start)
+            start = start_values(datos, assignment, formulation, absolute_value)
+        assigned = sum(1 for c in datos["C"] if f"tiempo_{c}" in start)
+        print(f"Solución inicial: {assigned} de {len(datos['C'])} UCs asignadas")
+
+    solver = get_solver(solver_name, time_limit_minutes, threads)
+
+    match builder:
+        case Builder.MATRIX:
+            # El modelo se arma como matrices dispersas y se escribe directamente
+            # en MPS para el solver.
+            with profile_stage(profile, "construccion"):
+                model = build_matrix_model(
+                    datos, alpha, beta, formulation, absolute_value
+                )
+            if profile is not None:
+                profile.model = model_statistics(
+                    model.row_names,
+                    model.col_names,
+                    np.bincount(model.a_row, minlength=model.num_rows),
+                )
+
+            with tempfile.TemporaryDirectory() as pool_dir:
+                start_time = timer()
+                start_timestamp = time.time()
+                status, values = solve_matrix_model(
+                    model,
+                    solver,
+                    start,
+                    pool_dir if pool is not None else None,
+                    profile=profile,
+                )
+                end_time = timer()
+
+                # Gurobi escribe cada incumbente al encontrarlo, así que la fecha
+                # de cada archivo es el momento en que se encontró
+                if pool is not None:
+                    found_timestamp = isinstance(solver, pl.GUROBI_CMD)
+                    pool.add_sol_files(
+                        pool_dir, start_timestamp if found_timestamp else None
+                    )
+
+            if values is None:
+                return None, end_time - start_time, status, [], {}
+
+            with profile_stage(profile, "resultado"):
+                value = model.objective_value(values)
+                assignment = model.assignment(values)
+                if pool is not None:
+                    pool.add(assignment, value)
+
+            return (
+                value,
+                end_time - start_time,
+                status,
+                model.variables(values),
+                assignment,
+            )
+        case Builder.PULP:
+            with profile_stage(profile, "construccion"):
+                problem = build_pulp_model(
+                    datos, alpha, beta, formulation, absolute_value
+                )
+            if profile is not None:
+                constraints = problem.constraints
+                profile.model = model_statistics(
+                    list(constraints),
+                    [v.name for v in problem.variables()],
+                    [len(c) for c in constraints.values()],
+                )
+                # La escritura del modelo y la lectura de la solución se miden
+                # por separado, aunque PuLP las hace dentro de solve
+                profile_pulp_io(profile, problem, solver)
+                profile.start("escritura")
+
+            if start is not None:
+                for v in problem.variables():
+                    if v.name in start:
+                        v.setInitialValue(start[v.name])
+                solver.optionsDict["warmStart"] = True
+
+            start_time = timer()
+            problem.solve(solver)
+            end_time = timer()
+            if profile is not None:
+                profile.stop()
+
+            with profile_stage(profile, "resultado"):
+                value = pl.value(problem.objective)
+                assignment = pulp_assignment(problem, datos)
+                if pool is not None and assignment:
+                    pool.add(assignment, value)
+
+            return (
+                value,
+                end_time - start_time,
+                pl.LpStatus[problem.status],
+                problem.variables(),
+                assignment,
+            )
+        case _:
+            raise ValueError(f"Builder {builder} no soportado")
+
+
+def pulp_assignment(problem: pl.LpProblem, datos: dict) -> dict:
+    """
+    Día y turno asignado a cada UC en la solución del modelo de PuLP. Las
+    variables x se buscan por UC, día y turno, sin recorrer todas las variables
+    del problema.
+    """
+    variables = problem.variablesDict()
+    assignment = {}
+
+    for c in datos["C"]:
+        for d in datos["D"]:
+            for t in datos["Td"][d]:
+                x = variables.get(pl.LpElement.expression.sub("_", f"x_{c}_{d}_{t}"))
+                if x is not None and x.varValue is not None and x.varValue > 0.5:
+                    assignment[c] = (d, t)
+
+    return assignment
+
+
+def print_pruning_report(report: dict, alpha: float):
+    # Aporte máximo al objetivo de los pares, con el alpha del modelo
+    mass = report["masa_co"] + alpha * report["masa_dist_sem"]
+    dropped_mass = report["masa_co_descartada"] + alpha * report["masa_dist_sem_descartada"]
+
+    print(
+        f"Poda de pares: {report['pares_descartados']} de {report['pares']} pares descartados"
+        f" ({report['variables_descartadas']} variables),"
+        f" {dropped_mass:.2f} de {mass:.2f} de masa del objetivo"
+        f" ({100 * dropped_mass / mass if mass else 0:.1f}%)"
+    )
+
+
+def print_domain_report(report: dict):
+    print(
+        f"Filtro de dominios: {report['x_descartadas']} de {report['x']} variables x"
+        f" y {report['w_descartadas']} de {report['w']} variables w descartadas,"
+        f" {report['filas_descartadas']} restricciones sin variables"
+    )
+
+
+def print_symmetry_report(report: dict):
+    print(
+        f"Simetría: {report['orbitas']} órbitas de días y turnos de {report['slots']},"
+        f" UC fijada: {report['uc_fijada']}"
+    )
 
+
+def build_pulp_model(
+    datos: dict,
+    alpha: float,
+    beta: float,
+    formulation: Formulation = Formulation.FULL,
+    absolute_value: AbsoluteValue = AbsoluteValue.BIG_M,
+) -> pl.LpProblem:
+    # region CARGA DE DATOS
     D = datos.get("D")
     C = datos.get("C")
     Td = datos.get("Td")
@@ -22,6 +276,8 @@ def solve_model(
     P = datos.get("P")
     PARES_UC = datos.get("PARES_UC")
     UC_MISMO_SEMESTRE = datos.get("UC_MISMO_SEMESTRE")
+    CLIQUES_COP = datos.get("CLIQUES_COP")
+    CLIQUES_MISMO_SEMESTRE = datos.get("CLIQUES_MISMO_SEMESTRE")
     cp = datos.get("cp")
     fac_cp = datos.get("fac_cp")
     alta_co = datos.get("alta_co")
@@ -32,26 +288,37 @@ def solve_model(
     M = datos.get("M")
     dist_peso = datos.get("dist_peso")
     time_value = datos.get("time_value")
+    DOMINIO = datos.get("DOMINIO")
+    DS_PAR = datos.get("DS_PAR", {})
     # endregion
 
+    if formulation not in (Formulation.FULL, Formulation.PIECEWISE):
+        raise ValueError(f"Formulación {formulation} no soportada")
+
+    if absolute_value not in (AbsoluteValue.BIG_M, AbsoluteValue.SLOTS):
+        raise ValueError(f"Valor absoluto {absolute_value} no soportado")
+
     # region DEFINICIÓN DEL PROBLEMA
     problem = pl.LpProblem("Optimizacion_Calendario", pl.LpMinimize)
     # endregion
 
     # region DEFINICIÓN DE VARIABLES
 
-    # Variable que vale 1 si la UC c se asigna al día d en el turno t
+    # Variable que vale 1 si la UC c se asigna al día d en el turno t. Con el
+    # filtro de dominios, solo se crean las de los días y turnos posibles de c.
     x = {}
     for c in C:
         for d in D:
             for t in Td[d]:
-                x[(c, d, t)] = pl.LpVariable(f"x_{c}_{d}_{t}", cat=pl.LpBinary)
+                if DOMINIO is None or (d, t) in DOMINIO[c]:
+                    x[(c, d, t)] = pl.LpVariable(f"x_{c}_{d}_{t}", cat=pl.LpBinary)
 
     # Variable binaria para identificar si distancia entre las evaluaciones de dos UC es ds
     w = {}
-    for c1, c2 in PARES_UC:
-        for ds in DS:
-            w[(c1, c2, ds)] = pl.LpVariable(f"w_{c1}_{c2}_{ds}", cat=pl.LpBinary)
+    if formulation == Formulation.FULL:
+        for c1, c2 in PARES_UC:
+            for ds in DS_PAR.get((c1, c2), DS):
+                w[(c1, c2, ds)] = pl.LpVariable(f"w_{c1}_{c2}_{ds}", cat=pl.LpBinary)
 
     # Variables para definir la distancia entre las evaluaciones de dos UC
     z = {}  # Valor absoluto de la diferencia entre las evaluaciones de c1 y c2
@@ -61,9 +328,49 @@ def solve_model(
 
     for c1, c2 in PARES_UC:
         z[(c1, c2)] = pl.LpVariable(f"z_{c1}_{c2}", lowBound=0)
-        z_plus[(c1, c2)] = pl.LpVariable(f"z_plus_{c1}_{c2}", lowBound=0)
-        z_minus[(c1, c2)] = pl.LpVariable(f"z_minus_{c1}_{c2}", lowBound=0)
-        y[(c1, c2)] = pl.LpVariable(f"y_{c1}_{c2}", cat=pl.LpBinary)
+        if absolute_value == AbsoluteValue.BIG_M:
+            z_plus[(c1, c2)] = pl.LpVariable(f"z_plus_{c1}_{c2}", lowBound=0)
+            z_minus[(c1, c2)] = pl.LpVariable(f"z_minus_{c1}_{c2}", lowBound=0)
+            y[(c1, c2)] = pl.LpVariable(f"y_{c1}_{c2}", cat=pl.LpBinary)
+
+    # Tiempo (día y turno, según time_value) asignado a la evaluación de cada UC.
+    # Las restricciones de distancia de todos los pares referencian esta variable,
+    # en lugar de repetir la suma sobre x para cada par.
+    tiempo = {}
+    for c in C:
+        tiempo[c] = pl.LpVariable(f"tiempo_{c}", lowBound=0)
+
+    # Distancia entre el tiempo de cada UC y el de cada día y turno. Con ellas, z se
+    # acota por la diferencia absoluta sin z_plus, z_minus ni y.
+    distancia = {}
+    if absolute_value == AbsoluteValue.SLOTS:
+        for c in C:
+            for d in D:
+                for t in Td[d]:
+                    distancia[(c, d, t)] = pl.LpVariable(
+                        f"distancia_{c}_{d}_{t}", lowBound=0
+                    )
+
+    # En la formulación lineal por tramos, el peso de la distancia de cada par se
+    # acota con las rectas de cada tramo, y el término de previas min(1, z / 5)
+    # se modela con una binaria que indica si la distancia es de al menos 5.
+    peso = {}
+    previa = {}
+    previa_lejana = {}
+    if formulation == Formulation.PIECEWISE:
+        intercept, slope = distance_segments(DS, dist_peso)
+
+        for c1, c2 in PARES_UC:
+            peso[(c1, c2)] = pl.LpVariable(f"peso_{c1}_{c2}", lowBound=0)
+
+        pares = set(PARES_UC)
+        for c1, c2 in P:
+            par = (c1, c2) if (c1, c2) in pares else (c2, c1)
+            if par not in previa:
+                previa[par] = pl.LpVariable(f"previa_{par[0]}_{par[1]}", lowBound=0)
+                previa_lejana[par] = pl.LpVariable(
+                    f"previa_lejana_{par[0]}_{par[1]}", cat=pl.LpBinary
+                )
     # endregion
 
     # region DEFINICIÓN DE LA FUNCIÓN OBJETIVO
@@ -71,103 +378,188 @@ def solve_model(
     # Valor máximo de concurrencia entre UC diferentes. Se utiliza para normalizar la concurrencia entre dos UC.
     max_co = max(co[c1, c2] for c1, c2 in co if c1 != c2) + 1
 
-    problem += pl.lpSum(
-        # Para cada par de cursos
-        pl.lpSum(
-            # Multiplicamos el peso de la distancia por la variable binaria correspondiente
-            dist_peso[ds]
-            * (co[c1, c2] / max_co + alpha * (1 / (dist_sem[c1, c2] + 1)))
-            * w[c1, c2, ds]
-            for ds in DS
+    if formulation == Formulation.FULL:
+        problem += pl.lpSum(
+            # Para cada par de cursos
+            pl.lpSum(
+                # Multiplicamos el peso de la distancia por la variable binaria correspondiente
+                dist_peso[ds]
+                * (co[c1, c2] / max_co + alpha * (1 / (dist_sem[c1, c2] + 1)))
+                * w[c1, c2, ds]
+                for ds in DS_PAR.get((c1, c2), DS)
+            )
+            for c1, c2 in PARES_UC
+        ) + pl.lpSum(
+            # Para los pares de previas
+            pl.lpSum(
+                beta
+                * min(1, ds / 5)
+                * w[ds_pair]
+                for ds in DS
+                for ds_pair in [(c1, c2, ds), (c2, c1, ds)]
+                if ds_pair in w
+            )
+            for c1, c2 in P
         )
-        for c1, c2 in PARES_UC
-    ) + pl.lpSum(
-        # Para los pares de previas
-        pl.lpSum(
-            beta
-            * min(1, ds / 5)
-            * (w[c1, c2, ds] if (c1, c2, ds) in w else w[c2, c1, ds])
-            for ds in DS
+    else:
+        problem += pl.lpSum(
+            # Para cada par de cursos, el peso de su distancia
+            (co[c1, c2] / max_co + alpha * (1 / (dist_sem[c1, c2] + 1)))
+            * peso[c1, c2]
+            for c1, c2 in PARES_UC
+        ) + pl.lpSum(
+            # Para los pares de previas
+            beta * (previa[c1, c2] if (c1, c2) in previa else previa[c2, c1])
+            for c1, c2 in P
         )
-        for c1, c2 in P
-    )
     # endregion
 
     # region DEFINICIÓN DE LAS RESTRICCIONES
 
-    # Los cursos que tengan profesores coincidentes no pueden ser asignados el mismo turno
+    # Las restricciones sobre x solo suman las variables que existen, y las que
+    # se quedan sin ninguna por el filtro de dominios no se agregan
+    def x_sum(keys, coef=lambda c, d, t: 1):
+        return pl.lpSum(coef(*k) * x[k] for k in keys if k in x)
+
+    def has_x(keys):
+        return any(k in x for k in keys)
+
+    # Los cursos que tengan profesores coincidentes no pueden ser asignados el
+    # mismo turno. Con cliques, una restricción por clique en lugar de por par.
+    if CLIQUES_COP is not None:
+        cop_groups = {f"Clique_{k}": group for k, group in enumerate(CLIQUES_COP)}
+    else:
+        cop_groups = {f"{c1}_{c2}": (c1, c2) for c1, c2 in COP}
     for d in D:
         for t in Td[d]:
-            for c1, c2 in COP:
-                problem += (
-                    x[c1, d, t] + x[c2, d, t] <= 1,
-                    f"No_Solapamiento_COP_{c1}_{c2}_Dia_{d}_Turno_{t}",
-                )
+            for name, group in cop_groups.items():
+                keys = [(c, d, t) for c in group]
+                if has_x(keys):
+                    problem += (
+                        x_sum(keys) <= 1,
+                        f"No_Solapamiento_COP_{name}_Dia_{d}_Turno_{t}",
+                    )
 
     # La evaluación de una UC se asigna a único día y turno:
     for c in C:
         problem += (
-            pl.lpSum(x[c, d, t] for d in D for t in Td[d]) == 1,
+            x_sum((c, d, t) for d in D for t in Td[d]) == 1,
             f"AsignacionUnica_{c}",
         )
 
     # En un turno no pueden haber mas de 6 evaluaciones
     for d in D:
         for t in Td[d]:
-            problem += (
-                pl.lpSum(x[c, d, t] for c in C) <= 6,
-                f"MaximaEvaluacionesTurno_{d}_{t}",
-            )
+            keys = [(c, d, t) for c in C]
+            if has_x(keys):
+                problem += (
+                    x_sum(keys) <= 6,
+                    f"MaximaEvaluacionesTurno_{d}_{t}",
+                )
 
-    # Si dos UC están sugeridas en el mismo semestre para la misma carrera, se asignan a días distintos
+    # Si dos UC están sugeridas en el mismo semestre para la misma carrera, se
+    # asignan a días distintos. Con cliques, una restricción por clique.
+    if CLIQUES_MISMO_SEMESTRE is not None:
+        ms_groups = {
+            f"Clique_{k}": group for k, group in enumerate(CLIQUES_MISMO_SEMESTRE)
+        }
+    else:
+        ms_groups = {f"{c1}_{c2}": (c1, c2) for c1, c2 in UC_MISMO_SEMESTRE}
     for d in D:
-        for c1, c2 in UC_MISMO_SEMESTRE:
-            problem += (
-                pl.lpSum(x[c1, d, t] + x[c2, d, t] for t in Td[d]) <= 1,
-                f"Dias_Distintos_{c1}_{c2}_Dia_{d}",
-            )
+        for name, group in ms_groups.items():
+            keys = [(c, d, t) for t in Td[d] for c in group]
+            if has_x(keys):
+                problem += (
+                    x_sum(keys) <= 1,
+                    f"Dias_Distintos_{name}_Dia_{d}",
+                )
 
     # No se puede superar la capacidad disponible de los salones, teniendo en cuenta el factor de capacidad, para cada día y turno
     for d in D:
         for t in Td[d]:
-            problem += (
-                pl.lpSum(ins[c] * x[c, d, t] for c in C) <= cp[d, t] * fac_cp,
-                f"Capacidad_{d}_{t}",
-            )
+            keys = [(c, d, t) for c in C]
+            if has_x(keys):
+                problem += (
+                    x_sum(keys, lambda c, d, t: ins[c]) <= cp[d, t] * fac_cp,
+                    f"Capacidad_{d}_{t}",
+                )
 
     # Las evaluaciones que se pre-asignan a un conjunto de días y turnos, se asignan en alguno de ellos, y solo en uno.
     for c in PA.keys():
-        problem += (pl.lpSum(x[c, d, t] for d, t in PA[c]) == 1, f"PreAsignacion_{c}")
+        problem += (x_sum((c, d, t) for d, t in PA[c]) == 1, f"PreAsignacion_{c}")
 
-    for c1, c2 in PARES_UC:
-        # Calcular la diferencia entre los días asignados a c1 y c2
-        day_time_c1 = pl.lpSum(
-            time_value[(d, t)] * x[c1, d, t] for d in D for t in Td[d]
-        )
-        day_time_c2 = pl.lpSum(
-            time_value[(d, t)] * x[c2, d, t] for d in D for t in Td[d]
+    # El tiempo de cada UC es el valor del día y turno en que se asigna
+    for c in C:
+        problem += (
+            tiempo[c]
+            == x_sum(
+                ((c, d, t) for d in D for t in Td[d]),
+                lambda c, d, t: time_value[(d, t)],
+            ),
+            f"Tiempo_Asignado_{c}",
         )
 
+    # La distancia de cada UC a un día y turno es la que hay entre ese día y turno
+    # y el asignado. Como la asignación es única, la suma vale exactamente
+    # |tiempo[c] - time_value[d, t]|.
+    if absolute_value == AbsoluteValue.SLOTS:
+        for c in C:
+            for d in D:
+                for t in Td[d]:
+                    problem += (
+                        distancia[c, d, t]
+                        == x_sum(
+                            ((c, d2, t2) for d2 in D for t2 in Td[d2]),
+                            lambda c, d2, t2: abs(time_value[(d, t)] - time_value[(d2, t2)]),
+                        ),
+                        f"Distancia_Turno_{c}_{d}_{t}",
+                    )
+
+    for c1, c2 in PARES_UC:
         # Restricciones para hacer que z valga efectivamente la diferencia absoluta
-        problem += (
-            day_time_c1 - day_time_c2 == z_plus[c1, c2] - z_minus[c1, c2],
-            f"Diferencia_Dias_{c1}_{c2}",
-        )
+        if absolute_value == AbsoluteValue.BIG_M:
+            problem += (
+                tiempo[c1] - tiempo[c2] == z_plus[c1, c2] - z_minus[c1, c2],
+                f"Diferencia_Dias_{c1}_{c2}",
+            )
 
-        problem += (
-            z[c1, c2] == z_plus[c1, c2] + z_minus[c1, c2],
-            f"Distancia_Absoluta_{c1}_{c2}",
-        )
+            problem += (
+                z[c1, c2] == z_plus[c1, c2] + z_minus[c1, c2],
+                f"Distancia_Absoluta_{c1}_{c2}",
+            )
+        else:
+            # z es al menos la diferencia entre los tiempos, en ambos sentidos
+            problem += (
+                z[c1, c2] >= tiempo[c1] - tiempo[c2],
+                f"Distancia_Minima_{c1}_{c2}_1",
+            )
+            problem += (
+                z[c1, c2] >= tiempo[c2] - tiempo[c1],
+                f"Distancia_Minima_{c1}_{c2}_2",
+            )
 
-        problem += pl.lpSum(w[c1, c2, ds] for ds in DS) == 1
-        problem += z[c1, c2] == pl.lpSum(ds * w[c1, c2, ds] for ds in DS)
+        if formulation == Formulation.FULL:
+            pair_ds = DS_PAR.get((c1, c2), DS)
+            problem += pl.lpSum(w[c1, c2, ds] for ds in pair_ds) == 1
+            problem += z[c1, c2] == pl.lpSum(ds * w[c1, c2, ds] for ds in pair_ds)
 
-        # Usar y para controlar qué parte de z_plus o z_minus está activa
-        problem += (z_plus[c1, c2] <= M * y[c1, c2], f"Control_z_plus_{c1}_{c2}")
-        problem += (
-            z_minus[c1, c2] <= M * (1 - y[c1, c2]),
-            f"Control_z_minus_{c1}_{c2}",
-        )
+        if absolute_value == AbsoluteValue.BIG_M:
+            # Usar y para controlar qué parte de z_plus o z_minus está activa
+            problem += (z_plus[c1, c2] <= M * y[c1, c2], f"Control_z_plus_{c1}_{c2}")
+            problem += (
+                z_minus[c1, c2] <= M * (1 - y[c1, c2]),
+                f"Control_z_minus_{c1}_{c2}",
+            )
+        else:
+            # z no supera la distancia de c1 a cualquier día y turno más la de c2 a
+            # ese día y turno. En el asignado a c1 la primera es 0, por lo que z
+            # queda acotado por la diferencia absoluta.
+            for d in D:
+                for t in Td[d]:
+                    problem += (
+                        z[c1, c2] <= distancia[c1, d, t] + distancia[c2, d, t],
+                        f"Distancia_Maxima_{c1}_{c2}_Dia_{d}_Turno_{t}",
+                    )
 
         # Si dos cursos tienen alta coincidencia, deben asignarse al menos con una separacion de 2 dias.
         if co[c1, c2] >= alta_co:
@@ -175,12 +567,36 @@ def solve_model(
                 z[c1, c2] >= 2,
                 f"Separacion_Minima_{c1}_{c2}",
             )
+
+        if formulation == Formulation.PIECEWISE:
+            # El peso del par está por encima de la recta de cada tramo, evaluada en z
+            for j in range(len(slope)):
+                problem += (
+                    peso[c1, c2] >= intercept[j] + slope[j] * z[c1, c2],
+                    f"Peso_Distancia_{c1}_{c2}_Tramo_{j}",
+                )
+
+            # previa >= min(1, z / 5): si previa_lejana vale 1, previa >= 1, y si
+            # no, previa >= z / 5
+            if (c1, c2) in previa:
+                problem += (
+                    previa[c1, c2]
+                    >= z[c1, c2] * (1 / 5) - max(M / 5 - 1, 0) * previa_lejana[c1, c2],
+                    f"Previa_Cercana_{c1}_{c2}",
+                )
+                problem += (
+                    previa[c1, c2] >= previa_lejana[c1, c2],
+                    f"Previa_Lejana_{c1}_{c2}",
+                )
     # endregion
 
-    # region SOLUCIÓN DEL PROBLEMA
+    return problem
+
+
+def get_solver(solver_name: Solver, time_limit_minutes=15, threads: int | None = None):
     solver = None
     time_limit = time_limit_minutes * MINUTES
-    cpu_cores = os.cpu_count() or 8
+    cpu_cores = threads or os.cpu_count() or 8
 
     match solver_name:
         case Solver.GUROBI_CMD:
@@ -206,16 +622,4 @@ def solve_model(
         case _:
             raise ValueError(f"Solver {solver_name} no soportado")
 
-    start_time = timer()
-    problem.solve(solver)
-    end_time = timer()
-
-    execution_time = end_time - start_time
-
-    return (
-        pl.value(problem.objective),
-        execution_time,
-        pl.LpStatus[problem.status],
-        problem.variables(),
-    )
-    # endregion
+    return solver
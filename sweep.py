@@ -0,0 +1,251 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+from calendar_model import CalendarModel
+from constants import Solver, Builder, Formulation, AbsoluteValue
+from csv_data_to_model_data import load_calendar_data, PairPruning
+from generate_schedule import write_schedule_csv
+from metrics import generate_metrics
+from solve import solve_model_data, print_pruning_report
+
+# Columnas del archivo de resultados del barrido. Las métricas quedan en "-"
+# para los puntos que no terminan con una solución óptima.
+RESULTS_COLUMNS = [
+    "alpha",
+    "beta",
+    "status",
+    "value",
+    "time",
+    "m_curricula",
+    "m_coincidencia",
+    "m_estudiantes",
+    "m_previas",
+]
+
+# Datos del caso, cargados una sola vez y compartidos con cada proceso al crearlo
+_datos = None
+
+# Modelo construido por cada proceso en su primer punto, que se reutiliza en los
+# siguientes cambiando solo los pesos del objetivo
+_model = None
+
+# Prefijo del estado de los puntos cuya resolución falló, que se vuelven a
+# intentar al retomar el barrido
+ERROR_STATUS = "Error"
+
+
+def _init_worker(datos):
+    global _datos, _model
+    _datos = datos
+    _model = None
+
+# Prefijo del estado de los puntos cuya resolución falló, que se vuelven a
+# intentar al retomar el barrido
+ERROR_STATUS = "Error"
+
+
+# region RESULTADOS
+
+
+def load_completed_points(results_file):
+    """
+    Devuelve los puntos (alpha, beta) que ya tienen una fila en el archivo de
+    resultados, para retomar un barrido interrumpido. Los que fallaron no se
+    cuentan, así que se vuelven a resolver.
+    """
+    if not os.path.exists(results_file):
+        return set()
+
+    with open(results_file, "r", newline="") as f:
+        return {
+            (float(row["alpha"]), float(row["beta"]))
+            for row in csv.DictReader(f)
+            if not row["status"].startswith(ERROR_STATUS)
+        }
+
+
+def record_point(results_file, row):
+    """
+    Agrega la fila de un punto terminado al archivo de resultados, creándolo con
+    su encabezado si no existe. El archivo se cierra luego de cada punto, para
+    que un corte del barrido no pierda los puntos ya resueltos.
+    """
+    new_file = not os.path.exists(results_file)
+
+    with open(results_file, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULTS_COLUMNS, restval="-")
+        if new_file:
+            writer.writeheader()
+        writer.writerow(row)
+
+
+# endregion
+
+
+def solve_point(
+    case,
+    solver_name,
+    alpha,
+    beta,
+    time_limit_minutes,
+    threads,
+    output_dir,
+    solve_options,
+):
+    """
+    Resuelve un punto del barrido con los datos del proceso, y si la solución es
+    óptima escribe su calendario y calcula sus métricas. Con el builder
+    matricial, el modelo del proceso se reutiliza y cada punto parte de la
+    solución del anterior.
+
+    Returns:
+        dict: Fila del punto para el archivo de resultados
+    """
+    global _model
+
+    if solve_options["builder"] == Builder.MATRIX:
+        if _model is None:
+            _model = CalendarModel(
+                _datos,
+                solver_name,
+                time_limit_minutes,
+                solve_options["formulation"],
+                solve_options["absolute_value"],
+                threads,
+            )
+
+        _model.set_weights(alpha, beta)
+        value, time, status, _, assignment = _model.solve()
+    else:
+        value, time, status, _, assignment = solve_model_data(
+            _datos,
+            solver_name,
+            alpha,
+            beta,
+            time_limit_minutes,
+            threads=threads,
+            **solve_options,
+        )
+
+    row = {"alpha": alpha, "beta": beta, "status": status, "value": value, "time": time}
+
+    if status != "Optimal":
+        return row
+
+    case_name = case.split("/")[-1]
+    filename = f"{output_dir}/schedule_caso:{case_name}_alpha:{alpha}_beta:{beta}.csv"
+
+    write_schedule_csv(assignment, filename)
+
+    metrics = generate_metrics(
+        filename,
+        f"{case}/coincidencia.csv",
+        "data/previas.csv",
+        f"{case}/trayectoria_sugerida.csv",
+    )
+
+    return {**row, **metrics}
+
+
+def run_sweep(
+    case: str,
+    solver_name: Solver,
+    alpha_values: list,
+    beta_values: list,
+    time_limit_minutes: int,
+    output_dir: str,
+    results_file: str,
+    workers: int = 1,
+    builder: Builder = Builder.MATRIX,
+    pair_pruning: PairPruning | None = None,
+    formulation: Formulation = Formulation.FULL,
+    absolute_value: AbsoluteValue = AbsoluteValue.BIG_M,
+):
+    """
+    Resuelve el modelo para cada combinación de alpha y beta, con varios
+    procesos resolviendo a la vez.
+
+    Los datos del caso se cargan una sola vez y se comparten con los procesos, y
+    los núcleos se reparten entre las resoluciones simultáneas. Cada punto se
+    registra en results_file al terminar, y los puntos que ya están registrados
+    no se vuelven a resolver.
+
+    Args:
+        case (str): Directorio del caso
+        solver_name (Solver): Solver a utilizar
+        alpha_values (list): Valores de alpha a probar
+        beta_values (list): Valores de beta a probar
+        time_limit_minutes (int): Tiempo límite de cada resolución
+        output_dir (str): Directorio donde se escriben los calendarios
+        results_file (str): Archivo CSV con los resultados de cada punto
+        workers (int): Cantidad de resoluciones simultáneas
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    completed = load_completed_points(results_file)
+    points = [
+        (alpha, beta)
+        for alpha, beta in product(alpha_values, beta_values)
+        if (float(alpha), float(beta)) not in completed
+    ]
+
+    print(
+        f"Barrido: {len(points)} puntos pendientes,"
+        f" {len(alpha_values) * len(beta_values) - len(points)} ya resueltos"
+    )
+    if not points:
+        return
+
+    datos = load_calendar_data(case, pair_pruning=pair_pruning)
+    if pair_pruning is not None:
+        for alpha in alpha_values:
+            print_pruning_report(datos["PODA_PARES"], alpha)
+
+    # Cada resolución simultánea usa una parte de los núcleos
+    workers = max(1, min(workers, len(points)))
+    threads = max(1, (os.cpu_count() or 8) // workers)
+
+    solve_options = {
+        "builder": builder,
+        "formulation": formulation,
+        "absolute_value": absolute_value,
+    }
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(datos,)
+    ) as executor:
+        futures = {
+            executor.submit(
+                solve_point,
+                case,
+                solver_name,
+                alpha,
+                beta,
+                time_limit_minutes,
+                threads,
+                output_dir,
+                solve_options,
+            ): (alpha, beta)
+            for alpha, beta in points
+        }
+
+        for future in as_completed(futures):
+            # Un punto que falla queda registrado con su error, y el barrido
+            # sigue con los demás
+            try:
+                row = future.result()
+            except Exception as e:
+                alpha, beta = futures[future]
+                row = {"alpha": alpha, "beta": beta, "status": f"{ERROR_STATUS}: {e}"}
+                record_point(results_file, row)
+                print(f"alpha: {alpha}, beta: {beta}, {row['status']}")
+                continue
+
+            record_point(results_file, row)
+
+            print(
+                f"alpha: {row['alpha']}, beta: {row['beta']}, status {row['status']},"
+                f" valor {row['value']}, tiempo {row['time']:.2f} segundos"
+            )
@@ -0,0 +1,170 @@
+import numpy as np
+
+# Tolerancia para comparar valores de tiempo
+TIME_TOLERANCE = 1e-9
+
+
+def time_reflection(datos):
+    """
+    Candidata a simetría entre días y turnos: la que invierte el calendario,
+    llevando cada slot al de tiempo min + max - tiempo.
+
+    El objetivo depende de los días y turnos solo a través de las distancias
+    entre sus tiempos, así que una permutación de slots que deja el modelo igual
+    tiene que conservar esas distancias. Las únicas que lo hacen sobre puntos de
+    una recta son la identidad y esta reflexión: dos días o turnos con la misma
+    capacidad no son intercambiables si están a distinta distancia del resto.
+
+    Returns:
+        dict: {(dia, turno): (dia, turno)}, o None si algún tiempo reflejado no
+        corresponde a un slot
+    """
+    time_value = datos["time_value"]
+    slots = list(time_value)
+    tau = np.array([time_value[s] for s in slots])
+    reflected = tau.min() + tau.max() - tau
+
+    # Slot de cada tiempo reflejado, buscándolo entre los tiempos ordenados
+    order = np.argsort(tau)
+    position = np.clip(np.searchsorted(tau[order], reflected), 0, len(tau) - 1)
+    image = order[position]
+    if not np.allclose(tau[image], reflected, atol=TIME_TOLERANCE):
+        return None
+
+    return {s: slots[k] for s, k in zip(slots, image)}
+
+
+def is_model_symmetry(datos, permutation):
+    """
+    Indica si una permutación de slots deja el modelo igual, además de las
+    distancias: misma capacidad, mismas pre-asignaciones y días enteros que se
+    mueven juntos (las restricciones de UCs del mismo semestre son por día).
+    """
+    cp, PA = datos["cp"], datos["PA"]
+
+    if any(cp[s] != cp[image] for s, image in permutation.items()):
+        return False
+
+    if any({permutation[s] for s in slots} != set(slots) for slots in PA.values()):
+        return False
+
+    day_image = {}
+    for (d, _), (image_day, _) in permutation.items():
+        if day_image.setdefault(d, image_day) != image_day:
+            return False
+
+    return len(set(day_image.values())) == len(day_image)
+
+
+def slot_orbits(permutation):
+    """
+    Returns:
+        list: Órbitas de los slots bajo el grupo que genera la permutación, como
+        listas de slots
+    """
+    orbits, seen = [], set()
+    for s in permutation:
+        if s in seen:
+            continue
+        orbit = [s]
+        while permutation[orbit[-1]] != s:
+            orbit.append(permutation[orbit[-1]])
+        seen.update(orbit)
+        orbits.append(orbit)
+
+    return orbits
+
+
+def break_symmetry(datos):
+    """
+    Busca simetrías entre los días y turnos del modelo y, si las hay, agrega una
+    restricción válida que las rompe.
+
+    Con la reflexión del calendario, cada solución tiene una gemela con el mismo
+    valor objetivo. Se elige una UC sin pre-asignación (la de más inscriptos) y
+    se la pre-asigna a los días y turnos de la primera mitad del calendario: de
+    cada par de soluciones gemelas queda al menos una, y el solver no recorre
+    las dos mitades del árbol. Como es una pre-asignación más, si se filtran
+    los dominios se descartan las variables de la otra mitad.
+
+    Args:
+        datos (dict): Conjuntos y parámetros devueltos por build_model_data
+
+    Returns:
+        dict: Copia de datos con la pre-asignación agregada, si corresponde, y un
+        resumen en SIMETRIA: las órbitas de slots de más de un elemento, la
+        permutación y la UC fijada (None si no hay simetría)
+    """
+    permutation = time_reflection(datos)
+    if permutation is not None and not is_model_symmetry(datos, permutation):
+        permutation = None
+
+    report = {
+        "orbitas": 0,
+        "slots": len(datos["time_value"]),
+        "permutacion": None,
+        "uc_fijada": None,
+    }
+    if permutation is None or all(s == image for s, image in permutation.items()):
+        return {**datos, "SIMETRIA": report}
+
+    report["orbitas"] = sum(len(orbit) > 1 for orbit in slot_orbits(permutation))
+    report["permutacion"] = permutation
+
+    # UC a fijar: la de más inscriptos entre las que no están pre-asignadas
+    free = [c for c in datos["C"] if c not in datos["PA"]]
+    if not free:
+        return {**datos, "SIMETRIA": report}
+    anchor = max(free, key=lambda c: datos["ins"][c])
+    report["uc_fijada"] = anchor
+
+    # Primera mitad del calendario, incluyendo los slots que la reflexión deja
+    # fijos (los del medio)
+    time_value = datos["time_value"]
+    half = [s for s in time_value if time_value[s] <= time_value[permutation[s]]]
+
+    return {
+        **datos,
+        "PA": {**datos["PA"], anchor: half},
+        "SIMETRIA": report,
+    }
+
+
+def canonical_assignment(datos, assignment):
+    """
+    Lleva una asignación a su gemela que cumple la restricción de
+    break_symmetry, si hace falta, para usarla como solución inicial.
+
+    Returns:
+        dict: {uc: (dia, turno)}
+    """
+    report = datos.get("SIMETRIA")
+    if report is None or report["uc_fijada"] is None:
+        return assignment
+
+    anchor, permutation = report["uc_fijada"], report["permutacion"]
+    if anchor not in assignment or tuple(assignment[anchor]) in datos["PA"][anchor]:
+        return assignment
+
+    return {
+        c: permutation.get(tuple(slot), tuple(slot)) for c, slot in assignment.items()
+    }
+
+
+if __name__ == "__main__":
+    # Informa las órbitas de días y turnos de cada caso
+    from constants import Case
+    from csv_data_to_model_data import load_calendar_data
+
+    cases = [value for name, value in vars(Case).items() if not name.startswith("_")]
+    for case in cases:
+        try:
+            report = load_calendar_data(case, symmetry=True)["SIMETRIA"]
+        except Exception as e:
+            print(f"{case}: {e}")
+            continue
+
+        print(
+            f"{case}: {report['orbitas']} órbitas de {report['slots']} slots,"
+            f" UC fijada: {report['uc_fijada']}"
+        )
@@ -0,0 +1,147 @@
+import csv
+import os
+import re
+
+import pulp as pl
+
+from constants import Formulation, AbsoluteValue
+from matrix_model import distance_segments
+from solution_files import read_sol_assignment
+from symmetry import canonical_assignment
+
+# Código de la UC al final de cada celda del calendario: "DESCRIPCION (codigo)"
+SCHEDULE_CODE = re.compile(r"\(([^()]*)\)\s*$")
+
+
+def read_schedule_csv(file_path):
+    """
+    Lee un calendario con el formato que escribe generate_schedule_csv: una fila
+    por día ("Día d"), una columna por turno ("Turno t") y en cada celda las UCs
+    separadas por " & ", como "DESCRIPCION (codigo)" o solo el código.
+
+    Returns:
+        dict: Día y turno asignado a cada UC
+    """
+    assignment = {}
+
+    with open(file_path, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        turns = [int(column.split()[-1]) for column in header[1:]]
+
+        for row in reader:
+            day = int(row[0].split()[-1])
+            for turn, cell in zip(turns, row[1:]):
+                for item in cell.split(" & ") if cell else []:
+                    match = SCHEDULE_CODE.search(item)
+                    code = match[1] if match else item.strip()
+                    assignment[code] = (day, turn)
+
+    return assignment
+
+
+def load_assignment(warm_start):
+    """
+    Devuelve la asignación de día y turno de cada UC a partir de un calendario
+    CSV, un archivo .sol o un diccionario {uc: (dia, turno)}.
+    """
+    if isinstance(warm_start, dict):
+        return {str(c): (int(d), int(t)) for c, (d, t) in warm_start.items()}
+
+    if not os.path.exists(warm_start):
+        raise FileNotFoundError(f"No se encontró el archivo {warm_start}")
+
+    if warm_start.endswith(".csv"):
+        return read_schedule_csv(warm_start)
+
+    return read_sol_assignment(warm_start)
+
+
+def start_values(
+    datos,
+    assignment,
+    formulation=Formulation.FULL,
+    absolute_value=AbsoluteValue.BIG_M,
+):
+    """
+    Calcula los valores iniciales de todas las variables del modelo a partir de
+    una asignación de día y turno por UC.
+
+    Las UCs que no están en C y las asignaciones a días y turnos que ya no
+    existen se ignoran, y los pares con alguna UC sin asignar quedan sin valor
+    inicial, para que el solver complete el resto. Si los datos tienen una
+    restricción de simetría que la asignación no cumple, se usa su gemela (ver
+    symmetry.canonical_assignment).
+
+    Args:
+        datos (dict): Conjuntos y parámetros devueltos por load_calendar_data
+        assignment (dict): Día y turno asignado a cada UC
+        formulation (Formulation): Formulación de la distancia entre pares de UCs
+        absolute_value (AbsoluteValue): Forma de modelar el valor absoluto
+
+    Returns:
+        dict: Valor inicial de cada variable, por nombre
+    """
+    D = datos.get("D")
+    C = datos.get("C")
+    Td = datos.get("Td")
+    P = datos.get("P")
+    PARES_UC = datos.get("PARES_UC")
+    DS = datos.get("DS")
+    dist_peso = datos.get("dist_peso")
+    time_value = datos.get("time_value")
+
+    assignment = canonical_assignment(datos, assignment)
+    values = {}
+
+    # Asignación y tiempo de cada UC
+    tiempo = {}
+    for c in C:
+        slot = assignment.get(c)
+        if slot not in time_value:
+            continue
+
+        for d in D:
+            for t in Td[d]:
+                values[f"x_{c}_{d}_{t}"] = 1 if (d, t) == slot else 0
+
+        tiempo[c] = time_value[slot]
+        values[f"tiempo_{c}"] = tiempo[c]
+
+        if absolute_value == AbsoluteValue.SLOTS:
+            for d in D:
+                for t in Td[d]:
+                    values[f"distancia_{c}_{d}_{t}"] = abs(tiempo[c] - time_value[(d, t)])
+
+    if formulation == Formulation.PIECEWISE:
+        intercept, slope = distance_segments(DS, dist_peso)
+        previas = set(P)
+        previas.update((c2, c1) for c1, c2 in P)
+
+    # Distancia entre las evaluaciones de cada par de UCs asignadas
+    for c1, c2 in PARES_UC:
+        if c1 not in tiempo or c2 not in tiempo:
+            continue
+
+        diff = tiempo[c1] - tiempo[c2]
+        z = abs(diff)
+        values[f"z_{c1}_{c2}"] = z
+
+        if absolute_value == AbsoluteValue.BIG_M:
+            values[f"z_plus_{c1}_{c2}"] = max(diff, 0)
+            values[f"z_minus_{c1}_{c2}"] = max(-diff, 0)
+            values[f"y_{c1}_{c2}"] = 1 if diff > 0 else 0
+
+        if formulation == Formulation.FULL:
+            # La distancia de DS más cercana a z (coinciden salvo redondeo)
+            selected = min(DS, key=lambda ds: abs(ds - z))
+            for ds in DS:
+                values[f"w_{c1}_{c2}_{ds}"] = 1 if ds == selected else 0
+        else:
+            values[f"peso_{c1}_{c2}"] = float(max(intercept + slope * z))
+            if (c1, c2) in previas:
+                values[f"previa_{c1}_{c2}"] = min(1, z / 5)
+                values[f"previa_lejana_{c1}_{c2}"] = 1 if z >= 5 else 0
+
+    # Los nombres se normalizan igual que los de las variables de PuLP
+    return {pl.LpElement.expression.sub("_", name): v for name, v in values.items()}